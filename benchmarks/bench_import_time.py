@@ -0,0 +1,59 @@
+"""
+Время импорта модулей irspy по данным python -X importtime. Каждый модуль импортируется в отдельном процессе,
+выводится суммарное время импорта модуля и самые долгие вложенные импорты
+
+Запуск: python -m benchmarks.bench_import_time [модуль ...]
+"""
+from typing import List, Tuple
+from os.path import dirname
+import subprocess
+import sys
+
+
+DEFAULT_MODULES = (
+    "irspy.clb.calibrator_constants",
+    "irspy.clb.clb_dll",
+    "irspy.clb.network_variables",
+    "irspy.dlls.mxsrlib_dll",
+    "irspy.pokrov.pokrov_dll",
+    "irspy.metrology",
+)
+# Количество самых долгих вложенных импортов, выводимых для каждого модуля
+TOP_COUNT = 5
+REPEAT = 5
+
+
+def import_times(a_module: str) -> List[Tuple[str, int, int]]:
+    """
+    :return: Список (модуль, собственное время, суммарное время) в микросекундах в порядке вывода -X importtime
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {a_module}"],
+                            cwd=dirname(dirname(__file__)), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Не удалось импортировать {a_module}:\n{result.stderr}")
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+
+def main(a_modules):
+    for module in a_modules:
+        # Минимум по нескольким запускам, чтобы убрать влияние дискового кэша и планировщика
+        runs = [import_times(module) for _ in range(REPEAT)]
+        best = min(runs, key=lambda times: times[-1][2])
+        total_us = best[-1][2]
+
+        print(f"{module}: {total_us / 1e3:.2f} мс")
+        heaviest = sorted((t for t in best[:-1] if t[0].startswith("irspy") or t[2] > total_us * 0.1),
+                          key=lambda t: t[2], reverse=True)[:TOP_COUNT]
+        for name, self_us, cumulative_us in heaviest:
+            print(f"    {name:<40} {cumulative_us / 1e3:>7.2f} мс (собственное {self_us / 1e3:.2f} мс)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] if len(sys.argv) > 1 else DEFAULT_MODULES)
@@ -0,0 +1,82 @@
+"""
+Пропускная способность и задержки путей опроса сетевых переменных на модели драйвера (SimulatedClbDll):
+чтение по одной переменной, read_snapshot, PollingScheduler с частью переменных и MxDataView
+
+Запуск: python -m benchmarks.bench_polling_throughput [путь к ini-файлу] [задержка обращения, мс]
+"""
+from os.path import dirname, join
+import statistics
+import time
+import sys
+import os
+
+from irspy.clb.network_variables import NetworkVariables, MxDataView
+from irspy.clb.simulated_clb_dll import SimulatedClbDll
+from irspy.clb.polling import PollingScheduler
+from irspy.clb.clb_dll import ClbDrv, UsbDrv
+import irspy.clb.calibrator_constants as clb
+
+
+DEFAULT_INI_PATH = join(dirname(dirname(__file__)), "irspy", "clb", "Calibrator 2.ini")
+# Количество переменных, подписанных в PollingScheduler (примерно столько видно в отфильтрованной таблице)
+SUBSCRIBED_COUNT = 20
+
+
+def measure(a_name: str, a_dll: SimulatedClbDll, a_function, a_duration_s: float = 1.):
+    a_dll.reset_statistics()
+    latencies = []
+    end_time = time.perf_counter() + a_duration_s
+    while True:
+        start = time.perf_counter()
+        a_function()
+        now = time.perf_counter()
+        latencies.append(now - start)
+        if now >= end_time:
+            break
+
+    passes = len(latencies)
+    latencies.sort()
+    p95 = latencies[min(int(passes * 0.95), passes - 1)]
+    print(f"{a_name:<22} {passes / sum(latencies):>9.1f} {statistics.median(latencies) * 1e3:>10.3f} "
+          f"{p95 * 1e3:>10.3f} {a_dll.calls_count / passes:>10.1f} {a_dll.bytes_read / passes:>10.0f}")
+
+
+def main(a_ini_path: str, a_latency_s: float):
+    dll = SimulatedClbDll.from_ini(a_ini_path, a_latency_s=a_latency_s, a_jitter_s=a_latency_s / 2,
+                                   a_byte_time_s=1e-6, a_seed=0)
+    dll.mxdata[:] = os.urandom(dll.get_data_size())
+
+    usb = UsbDrv(dll, dll.get_data_size())
+    usb.tick()
+    calibrator = ClbDrv(dll)
+    calibrator.connect(usb.get_dev_list()[0])
+    calibrator.state = clb.State.STOPPED
+
+    netvars = NetworkVariables(a_ini_path, calibrator)
+    variables_info = netvars.get_variables_info()
+    variables_count = len(variables_info)
+
+    scheduler = PollingScheduler(calibrator, variables_info)
+    # Все подписанные переменные читаются одним блоком
+    one_block_scheduler = PollingScheduler(calibrator, variables_info, a_max_gap=dll.get_data_size())
+    subscribed = range(0, variables_count, max(variables_count // SUBSCRIBED_COUNT, 1))
+    for number in subscribed:
+        # Период 0 не разрешен, очень маленький период - опрос при каждом poll()
+        scheduler.subscribe(number, 1e-9)
+        one_block_scheduler.subscribe(number, 1e-9)
+
+    mxdata_view = MxDataView(calibrator, variables_info, dll.get_data_size())
+
+    print(f"Переменных: {variables_count}, размер области: {dll.get_data_size()} байт, "
+          f"задержка обращения: {a_latency_s * 1e3:.2f} мс (+ до {a_latency_s / 2 * 1e3:.2f} мс), 1 мкс/байт")
+    print(f"{'':<22} {'опрос/с':>9} {'медиана,мс':>10} {'p95,мс':>10} {'вызовов':>10} {'байт':>10}")
+    measure("По одной переменной", dll, lambda: [netvars.read_variable(n) for n in range(variables_count)])
+    measure("read_snapshot", dll, netvars.read_snapshot)
+    measure(f"PollingScheduler ({len(subscribed)})", dll, scheduler.poll)
+    measure("  одним блоком", dll, one_block_scheduler.poll)
+    measure("MxDataView", dll, mxdata_view.read_snapshot)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INI_PATH,
+         float(sys.argv[2]) / 1e3 if len(sys.argv) > 2 else 0.0005)
@@ -0,0 +1,51 @@
+"""
+Сравнение декодирования всей таблицы сетевых переменных по одной переменной (как в
+NetworkVariables.read_variable) и через VariablesDecoder
+
+Запуск: python -m benchmarks.bench_variables_decoder [путь к ini-файлу]
+"""
+from os.path import dirname, join
+import struct
+import timeit
+import sys
+import os
+
+from irspy.clb.network_variables import NetworkVariables, VariablesDecoder
+
+
+DEFAULT_INI_PATH = join(dirname(dirname(__file__)), "irspy", "clb", "Calibrator 2.ini")
+
+
+def decode_per_variable(a_variables_info, a_buffer) -> list:
+    values = []
+    for variable_info in a_variables_info:
+        if variable_info.c_type == 'o':
+            values.append((a_buffer[variable_info.index] >> variable_info.bit_index) & 1)
+        else:
+            _bytes = bytes(a_buffer[variable_info.index:variable_info.index + variable_info.size])
+            values.append(struct.unpack(variable_info.c_type, _bytes)[0])
+    return values
+
+
+def main(a_ini_path: str, a_repeat: int = 2000):
+    variables_info = list(NetworkVariables.get_variables_from_ini(a_ini_path))
+    data_size = variables_info[-1].index + variables_info[-1].size
+    buffer = bytearray(os.urandom(data_size))
+
+    decoder = VariablesDecoder(variables_info)
+    reference = decode_per_variable(variables_info, buffer)
+    decoded = decoder.decode(buffer)
+    assert all(a == b or (a != a and b != b) for a, b in zip(reference, decoded)), "Результаты декодирования различаются"
+
+    per_variable_s = min(timeit.repeat(lambda: decode_per_variable(variables_info, buffer), number=a_repeat,
+                                       repeat=5)) / a_repeat
+    decoder_s = min(timeit.repeat(lambda: decoder.decode(buffer), number=a_repeat, repeat=5)) / a_repeat
+
+    print(f"Переменных: {len(variables_info)}, размер области: {data_size} байт")
+    print(f"Формат: {decoder.format}")
+    print(f"По одной переменной: {per_variable_s * 1e6:.1f} мкс")
+    print(f"VariablesDecoder:    {decoder_s * 1e6:.1f} мкс (x{per_variable_s / decoder_s:.1f})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INI_PATH)
@@ -0,0 +1,34 @@
+"""
+Сравнение холодной (с парсингом) и теплой (из кэша) загрузки таблицы сетевых переменных из ini-файла
+
+Запуск: python -m benchmarks.bench_variables_ini_cache [путь к ini-файлу]
+"""
+from os.path import dirname, join
+import timeit
+import sys
+
+from irspy.clb.network_variables import NetworkVariables
+
+
+DEFAULT_INI_PATH = join(dirname(dirname(__file__)), "irspy", "clb", "Calibrator 2.ini")
+
+
+def cold_load(a_ini_path: str):
+    NetworkVariables.clear_variables_ini_cache()
+    return NetworkVariables.get_variables_from_ini(a_ini_path)
+
+
+def main(a_ini_path: str, a_repeat: int = 200):
+    variables_count = len(cold_load(a_ini_path))
+
+    cold_s = min(timeit.repeat(lambda: cold_load(a_ini_path), number=a_repeat, repeat=5)) / a_repeat
+    warm_s = min(timeit.repeat(lambda: NetworkVariables.get_variables_from_ini(a_ini_path), number=a_repeat,
+                               repeat=5)) / a_repeat
+
+    print(f"Переменных: {variables_count}")
+    print(f"Холодная загрузка: {cold_s * 1e3:.3f} мс")
+    print(f"Теплая загрузка:   {warm_s * 1e3:.3f} мс (x{cold_s / warm_s:.0f})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INI_PATH)
@@ -0,0 +1,105 @@
+"""
+Сверка PyImpulseFilter и PyParamFilter с фильтрами mxsrclib_dll (ImpulseFilter, ParamFilter). Нужна
+mxsrclib_dll, то есть Windows и 32-битный python. Потоки случайные, но воспроизводимые (seed): шум с
+выбросами, целые значения с повторами и большие значения с маленьким разбросом.
+Суммы библиотека считает в x87 с точностью процесса (в Windows - 53 бита), поэтому результаты сравниваются с
+допуском TOLERANCE от наибольшего по модулю значения. Если процесс переключил x87 на 64 бита, импульсный фильтр
+библиотеки может отличаться сильнее: на значениях, которые совпали с точностью до последнего бита, он считает
+количество равных среднему значений
+
+Запуск: python -m benchmarks.check_filters [seed] [путь к mxsrclib_dll]
+"""
+from array import array
+import random
+import time
+import sys
+
+from irspy.metrology import ImpulseFilter, PyImpulseFilter, ParamFilter, PyParamFilter
+from irspy.dlls import mxsrlib_dll
+
+
+IMPULSE_STREAMS_COUNT = 400
+MAX_IMPULSE_SIZE = 120
+PARAM_SIZES = (1, 3, 10)
+PARAM_VALUES_COUNT = 30
+# ParamFilter берет отсчет, когда с прошлого прошло больше sampling_time. С нулевым временем отсчет берется
+# на каждом tick, если между вызовами прошло хоть сколько-то времени
+PARAM_TICK_PAUSE_S = 0.002
+TOLERANCE = 1e-12
+
+
+def make_values(a_random: random.Random, a_kind: int, a_count: int) -> list:
+    if a_kind == 0:
+        return [a_random.gauss(0, 1) if a_random.random() < 0.9 else a_random.uniform(-100, 100)
+                for _ in range(a_count)]
+    elif a_kind == 1:
+        return [float(a_random.randint(-3, 3)) for _ in range(a_count)]
+    else:
+        return [1e6 + a_random.gauss(0, 1e-3) for _ in range(a_count)]
+
+
+def check_impulse_filter(a_random: random.Random) -> float:
+    """
+    :return: Наибольшая разница результатов в долях наибольшего по модулю значения
+    """
+    dll_filter = ImpulseFilter()
+    py_filter = PyImpulseFilter()
+    worst_error = 0.
+    for i in range(IMPULSE_STREAMS_COUNT):
+        values = make_values(a_random, i % 3, a_random.randint(PyImpulseFilter.MIN_SIZE, MAX_IMPULSE_SIZE))
+        dll_filter.assign(array('d', values))
+        py_filter.assign(values)
+        error = abs(dll_filter.get() - py_filter.get()) / (max(map(abs, values)) or 1.)
+        worst_error = max(worst_error, error)
+    return worst_error
+
+
+def check_param_filter(a_random: random.Random, a_size: int) -> float:
+    """
+    Подает одни и те же значения в оба фильтра, между значениями проверяются stop, restart и resize
+    :return: Наибольшая разница get_value в долях наибольшего по модулю значения
+    """
+    filters = (ParamFilter(), PyParamFilter())
+    for param_filter in filters:
+        param_filter.resize(a_size)
+        param_filter.set_sampling_time(0.)
+        param_filter.restart()
+
+    worst_error = 0.
+    values = make_values(a_random, 0, PARAM_VALUES_COUNT)
+    for i, value in enumerate(values):
+        for param_filter in filters:
+            if i == PARAM_VALUES_COUNT // 3:
+                param_filter.stop()
+            elif i == PARAM_VALUES_COUNT // 2:
+                param_filter.restart()
+            elif i == PARAM_VALUES_COUNT * 3 // 4:
+                param_filter.resize(a_size // 2)
+            param_filter.add(value)
+
+        time.sleep(PARAM_TICK_PAUSE_S)
+        for param_filter in filters:
+            param_filter.tick()
+
+        dll_value, py_value = (param_filter.get_value() for param_filter in filters)
+        worst_error = max(worst_error, abs(dll_value - py_value) / max(map(abs, values)))
+    return worst_error
+
+
+def main(a_seed: int = 2024):
+    generator = random.Random(a_seed)
+
+    error = check_impulse_filter(generator)
+    print(f"Импульсный фильтр: наибольшая разница {error:.3g}")
+    assert error <= TOLERANCE, f"PyImpulseFilter не совпадает с ImpulseFilter (seed {a_seed})"
+
+    for size in PARAM_SIZES:
+        error = check_param_filter(generator, size)
+        print(f"Фильтр параметра, окно {size}: наибольшая разница {error:.3g}")
+        assert error <= TOLERANCE, f"PyParamFilter не совпадает с ParamFilter (окно {size}, seed {a_seed})"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        mxsrlib_dll.select_mxsrclib_dll(sys.argv[2])
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2024)
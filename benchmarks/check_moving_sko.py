@@ -0,0 +1,109 @@
+"""
+Проверка точности MovingSKO перебором: после каждого добавленного значения СКО сравнивается с точным
+значением, посчитанным по окну рациональными числами (fractions.Fraction). Потоки случайные, но
+воспроизводимые (seed), на больших значениях с маленьким разбросом и со скачками уровня, которые потом
+уходят из окна.
+Допуск - RELATIVE_TOLERANCE от СКО плюс LEVEL_TOLERANCE от наибольшего по модулю значения окна: на значениях
+порядка 1e6 с разбросом 1e-3 ошибка округления среднего (около 1e-16 от уровня) - это уже 1e-7 от СКО, и
+точнее в double не посчитать. Ошибка, накопленная заменами без пересчета, была порядка 1e-9 от уровня
+
+Запуск: python -m benchmarks.check_moving_sko [seed]
+"""
+from fractions import Fraction
+from math import sqrt
+import random
+import sys
+
+from irspy.metrology import MovingSKO
+
+
+WINDOW_SIZES = (0, 1, 2, 3, 7, 50, 300)
+BASES = (0., 600., 1e6)
+VALUES_COUNT = 2000
+# 0 - по одному значению через add, иначе через update_many порциями такого размера
+CHUNK_SIZES = (0, 1, 37, 701)
+RELATIVE_TOLERANCE = 1e-9
+LEVEL_TOLERANCE = 1e-13
+
+
+class ExactSko:
+    """
+    Точное СКО окна: суммы значений и их квадратов хранятся рациональными числами, поэтому вычитание
+    ушедшего из окна значения не вносит ошибку, а формула D = (S2 - S1^2 / n) / n не теряет точность
+    """
+    def __init__(self, a_window_size: int):
+        self.window_size = a_window_size
+        self.window = []
+        self.sum = Fraction(0)
+        self.sum_of_squares = Fraction(0)
+
+    def add(self, a_value: float):
+        value = Fraction(a_value)
+        self.window.append(a_value)
+        self.sum += value
+        self.sum_of_squares += value * value
+        if self.window_size and len(self.window) > self.window_size:
+            old_value = Fraction(self.window.pop(0))
+            self.sum -= old_value
+            self.sum_of_squares -= old_value * old_value
+
+    def get(self) -> float:
+        count = len(self.window)
+        return sqrt((self.sum_of_squares - self.sum * self.sum / count) / count)
+
+    def tolerance(self) -> float:
+        return RELATIVE_TOLERANCE * self.get() + LEVEL_TOLERANCE * max(map(abs, self.window))
+
+
+def make_stream(a_random: random.Random, a_base: float) -> list:
+    values = []
+    level = a_base
+    for i in range(VALUES_COUNT):
+        # Иногда уровень скачком меняется, чтобы окно содержало и большой, и маленький разброс
+        if i % 500 == 250:
+            level = a_base + a_random.uniform(-1, 1) * max(abs(a_base), 1.)
+        values.append(level + a_random.gauss(0, 1e-3))
+    return values
+
+
+def check(a_window_size: int, a_values: list, a_chunk_size: int) -> float:
+    """
+    Добавляет значения через add (a_chunk_size = 0) или через update_many порциями по a_chunk_size и после
+    каждого шага сравнивает СКО с точным
+    :return: Наибольшая ошибка СКО в долях допуска (больше 1 - проверка не пройдена)
+    """
+    sko = MovingSKO(a_window_size)
+    reference = ExactSko(a_window_size)
+    worst_error = 0.
+    step = a_chunk_size if a_chunk_size else 1
+    for start in range(0, len(a_values), step):
+        chunk = a_values[start:start + step]
+        if a_chunk_size:
+            sko.update_many(iter(chunk))
+        else:
+            sko.add(chunk[0])
+        for value in chunk:
+            reference.add(value)
+        tolerance = reference.tolerance()
+        error = abs(sko.get() - reference.get())
+        worst_error = max(worst_error, error / tolerance if tolerance else error * float("inf"))
+    return worst_error
+
+
+def main(a_seed: int = 2024):
+    generator = random.Random(a_seed)
+    worst = (0., None)
+    for base in BASES:
+        values = make_stream(generator, base)
+        for window_size in WINDOW_SIZES:
+            error = max(check(window_size, values, chunk_size) for chunk_size in CHUNK_SIZES)
+            print(f"База {base:>9g}, окно {window_size:>3}: наибольшая ошибка {error:.3f} допуска")
+            assert error <= 1, f"Ошибка СКО больше допустимой (база {base}, окно {window_size}, seed {a_seed})"
+            if error >= worst[0]:
+                worst = (error, (base, window_size))
+
+    print(f"Наибольшая ошибка: {worst[0]:.3f} допуска (база, окно = {worst[1]}), seed {a_seed}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2024)
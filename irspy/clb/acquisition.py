@@ -0,0 +1,133 @@
+from typing import Callable, List, Optional, NamedTuple, Tuple
+import threading
+import logging
+import time
+
+from irspy.clb.network_variables import NetworkVariables
+from irspy.clb.clb_dll import UsbDrv
+import irspy.utils as utils
+
+
+class Snapshot(NamedTuple):
+    """
+    Значения всех сетевых переменных, прочитанные за один проход потока опроса
+    """
+    # Порядковый номер снимка, увеличивается на 1 с каждым проходом
+    number: int
+    # time.time() момента чтения
+    timestamp: float
+    usb_status: UsbDrv.UsbState
+    # Значения сетевых переменных, индекс соответствует номеру переменной. Пустой, если калибратор не подключен
+    values: Tuple
+
+
+class AcquisitionService:
+    """
+    Опрашивает калибратор в отдельном потоке: с периодом a_period_s вызывает UsbDrv.tick и читает все сетевые
+    переменные через NetworkVariables.read_snapshot.
+    Результат каждого прохода публикуется как неизменяемый Snapshot заменой одной ссылки, поэтому потребители
+    (например, QTimer в GUI) просто берут latest() без блокировок и без обращений к драйверу.
+    Пока сервис запущен, UsbDrv.tick нельзя вызывать из других потоков, а любые другие обращения к драйверу
+    (запись переменных, ClbDrv) нужно делать под driver_lock.
+    driver_lock только рекомендательная: сервис не может заставить других пользователей драйвера ее брать, и
+    код, который обращается к ClbDrv или NetworkVariables напрямую (например, SourceModeWidget), без нее не
+    защищен. Через сервис работают TstlanWidget и TstlanDialog, если им передан a_acquisition
+    """
+    def __init__(self, a_usb_driver: UsbDrv, a_network_variables: NetworkVariables, a_period_s: float = 0.1):
+        """
+        :param a_usb_driver: USB-драйвер калибратора
+        :param a_network_variables: Сетевые переменные калибратора
+        :param a_period_s: Период опроса в секундах
+        """
+        self.__usb_driver = a_usb_driver
+        self.__network_variables = a_network_variables
+        self.period_s = a_period_s
+
+        self.__driver_lock = threading.RLock()
+        self.__stop_event = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+        self.__snapshot: Optional[Snapshot] = None
+        self.__snapshot_number = 0
+        self.__listeners: List[Callable[[Snapshot], None]] = []
+
+    @property
+    def driver_lock(self) -> threading.RLock:
+        """
+        Блокировка, под которой поток опроса обращается к драйверу. Защищает только тех, кто ее берет
+        """
+        return self.__driver_lock
+
+    def add_listener(self, a_listener: Callable[[Snapshot], None]):
+        """
+        Добавляет функцию, которая вызывается из потока опроса после публикации каждого снимка.
+        Для Qt-виджетов это должен быть emit сигнала, подключенного через QueuedConnection
+        """
+        self.__listeners.append(a_listener)
+
+    def remove_listener(self, a_listener: Callable[[Snapshot], None]):
+        self.__listeners.remove(a_listener)
+
+    def start(self):
+        """
+        Запускает поток. Если поток, остановленный stop, еще не завершился, бросает RuntimeError: иначе работали бы
+        оба потока
+        """
+        if self.is_running():
+            if not self.__stop_event.is_set():
+                return
+            raise RuntimeError("Поток опроса калибратора еще не завершился после stop")
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, name="clb_acquisition", daemon=True)
+        self.__thread.start()
+
+    def stop(self, a_timeout_s: Optional[float] = None):
+        """
+        :param a_timeout_s: Время ожидания завершения потока. Если поток не завершился, is_running возвращает
+        True, пока он не завершится
+        """
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join(a_timeout_s)
+            if not self.__thread.is_alive():
+                self.__thread = None
+
+    def is_running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def latest(self) -> Optional[Snapshot]:
+        """
+        Возвращает последний опубликованный снимок или None, если опроса еще не было
+        """
+        return self.__snapshot
+
+    def __run(self):
+        while not self.__stop_event.is_set():
+            start_time = time.perf_counter()
+
+            try:
+                self.__publish(self.__acquire())
+            except Exception as err:
+                logging.error(utils.exception_handler(err))
+
+            elapsed_s = time.perf_counter() - start_time
+            self.__stop_event.wait(max(self.period_s - elapsed_s, 0))
+
+    def __acquire(self) -> Snapshot:
+        with self.__driver_lock:
+            self.__usb_driver.tick()
+            values = tuple(self.__network_variables.read_snapshot()) if self.__network_variables.connected() \
+                else ()
+            usb_status = self.__usb_driver.get_status()
+
+        self.__snapshot_number += 1
+        return Snapshot(number=self.__snapshot_number, timestamp=time.time(), usb_status=usb_status, values=values)
+
+    def __publish(self, a_snapshot: Snapshot):
+        # Замена ссылки атомарна, читатели видят либо старый, либо новый снимок целиком
+        self.__snapshot = a_snapshot
+        for listener in tuple(self.__listeners):
+            try:
+                listener(a_snapshot)
+            except Exception as err:
+                logging.error(utils.exception_handler(err))
@@ -0,0 +1,168 @@
+from typing import Optional
+import asyncio
+import time
+
+from irspy.clb.driver_thread import ClbDriverThread
+import irspy.clb.calibrator_constants as clb
+
+
+class AsyncClbDrv:
+    """
+    Управление калибратором из asyncio. Все обращения к драйверу идут через ClbDriverThread, поэтому ожидание
+    установления сигнала не блокирует цикл событий и другие корутины (в том числе управляющие другими
+    калибраторами).
+    Готовность опрашивается с адаптивным интервалом: сразу после изменения сигнала часто (a_min_poll_s),
+    затем интервал растет в a_backoff раз на каждом опросе до a_max_poll_s.
+    Сразу после изменения сигнала флаг готовности может быть еще от предыдущей точки, поэтому готовность
+    принимается, только если после изменения флаг хотя бы раз был сброшен или прошло a_min_settle_s
+    """
+    def __init__(self, a_driver_thread: ClbDriverThread, a_min_poll_s: float = 0.005, a_max_poll_s: float = 0.2,
+                 a_backoff: float = 1.5, a_min_settle_s: float = 0.5):
+        """
+        :param a_driver_thread: Запущенный поток драйвера калибратора
+        :param a_min_poll_s: Интервал первого опроса после изменения сигнала
+        :param a_max_poll_s: Максимальный интервал опроса
+        :param a_backoff: Множитель интервала опроса
+        :param a_min_settle_s: Время после изменения сигнала, раньше которого готовность принимается, только если
+        флаг готовности после изменения был сброшен
+        """
+        assert 0 < a_min_poll_s <= a_max_poll_s, "Интервалы опроса заданы неверно"
+        assert a_backoff >= 1, "Множитель интервала опроса должен быть не меньше 1"
+        self.__driver_thread = a_driver_thread
+        self.__calibrator = a_driver_thread.calibrator
+        self.min_poll_s = a_min_poll_s
+        self.max_poll_s = a_max_poll_s
+        self.backoff = a_backoff
+        self.min_settle_s = a_min_settle_s
+
+        # Время последнего изменения сигнала и был ли после него сброшен флаг готовности
+        self.__signal_change_time: Optional[float] = None
+        self.__ready_dropped = False
+
+    def __poll_intervals(self):
+        interval_s = self.min_poll_s
+        while True:
+            yield interval_s
+            interval_s = min(interval_s * self.backoff, self.max_poll_s)
+
+    async def __wait_for(self, a_condition, a_timeout_s: Optional[float]) -> bool:
+        """
+        Опрашивает a_condition в потоке драйвера с адаптивным интервалом
+        :return: True, если условие выполнилось, False, если вышло время
+        """
+        deadline = None if a_timeout_s is None else time.perf_counter() + a_timeout_s
+        for interval_s in self.__poll_intervals():
+            if await self.__driver_thread.call_async(a_condition):
+                return True
+            if deadline is not None:
+                remaining_s = deadline - time.perf_counter()
+                if remaining_s <= 0:
+                    return False
+                interval_s = min(interval_s, remaining_s)
+            await asyncio.sleep(interval_s)
+
+    def __apply_signal_type(self, a_signal_type: clb.SignalType) -> bool:
+        """
+        Выполняется в потоке драйвера
+        :return: True, если тип сигнала в калибраторе уже равен a_signal_type
+        """
+        self.__calibrator.signal_type_changed()
+        if self.__calibrator.signal_type == a_signal_type:
+            return True
+
+        # Тип сигнала нельзя поменять при включенном сигнале
+        self.__calibrator.signal_enable_changed()
+        if self.__calibrator.signal_enable:
+            self.__calibrator.signal_enable = False
+        # Сеттер пропускает запись, если предыдущая была меньше секунды назад, поэтому вызывается при каждом опросе
+        self.__calibrator.signal_type = a_signal_type
+        return False
+
+    def __apply_parameters(self, a_signal_type: clb.SignalType, a_amplitude: float, a_frequency: Optional[float],
+                           a_enable: bool):
+        """
+        Выполняется в потоке драйвера
+        """
+        self.__calibrator.amplitude = clb.bound_amplitude(a_amplitude, a_signal_type)
+        if a_frequency is not None and clb.is_ac_signal[a_signal_type]:
+            self.__calibrator.frequency = a_frequency
+        if a_enable:
+            self.__calibrator.signal_enable = True
+        self.__signal_changed()
+
+    def __signal_changed(self):
+        """
+        Выполняется в потоке драйвера
+        """
+        self.__signal_change_time = time.perf_counter()
+        self.__ready_dropped = False
+
+    def __is_ready(self) -> bool:
+        """
+        Выполняется в потоке драйвера
+        :return: True, если сигнал готов и флаг готовности относится к последнему изменению сигнала
+        """
+        if not self.__calibrator.is_signal_ready():
+            self.__ready_dropped = True
+            return False
+        return self.__ready_dropped or self.__signal_change_time is None or \
+            time.perf_counter() - self.__signal_change_time >= self.min_settle_s
+
+    async def set_signal(self, a_signal_type: clb.SignalType, a_amplitude: float,
+                         a_frequency: Optional[float] = None, a_enable: bool = True,
+                         a_timeout_s: Optional[float] = 5.) -> bool:
+        """
+        Устанавливает тип сигнала, амплитуду и частоту. Установления сигнала не ждет, для этого wait_ready
+        :param a_signal_type: Тип сигнала
+        :param a_amplitude: Амплитуда, для постоянного сигнала знак задает полярность
+        :param a_frequency: Частота, для постоянного сигнала игнорируется. None - не менять
+        :param a_enable: Включить сигнал
+        :param a_timeout_s: Время ожидания смены типа сигнала
+        :return: False, если тип сигнала не сменился за a_timeout_s, иначе True
+        """
+        if not await self.__wait_for(lambda: self.__apply_signal_type(a_signal_type), a_timeout_s):
+            return False
+        await self.__driver_thread.call_async(self.__apply_parameters, a_signal_type, a_amplitude, a_frequency,
+                                              a_enable)
+        return True
+
+    async def wait_ready(self, a_timeout_s: Optional[float] = None, a_confirmations: int = 1) -> bool:
+        """
+        Ждет установления сигнала после последнего set_signal или signal_enable (см. min_settle_s)
+        :param a_timeout_s: Время ожидания, None - без ограничения
+        :param a_confirmations: Сколько опросов подряд сигнал должен быть готов, больше 1 - если флаг
+        готовности дребезжит
+        :return: True, если сигнал установился, False, если вышло время
+        """
+        assert a_confirmations >= 1, "Количество подтверждений должно быть не меньше 1"
+        confirmed = 0
+
+        def is_ready_confirmed() -> bool:
+            nonlocal confirmed
+            confirmed = confirmed + 1 if self.__is_ready() else 0
+            return confirmed >= a_confirmations
+
+        return await self.__wait_for(is_ready_confirmed, a_timeout_s)
+
+    async def set_signal_and_wait(self, a_signal_type: clb.SignalType, a_amplitude: float,
+                                  a_frequency: Optional[float] = None, a_timeout_s: Optional[float] = None) -> bool:
+        """
+        set_signal с включением сигнала и wait_ready
+        :param a_timeout_s: Общее время ожидания смены типа и установления сигнала
+        :return: True, если сигнал установился за a_timeout_s
+        """
+        start_time = time.perf_counter()
+        if not await self.set_signal(a_signal_type, a_amplitude, a_frequency, True, a_timeout_s):
+            return False
+        remaining_s = None if a_timeout_s is None else max(a_timeout_s - (time.perf_counter() - start_time), 0)
+        return await self.wait_ready(remaining_s)
+
+    async def signal_enable(self, a_enable: bool):
+        await self.__driver_thread.call_async(self.__set_signal_enable, a_enable)
+
+    def __set_signal_enable(self, a_enable: bool):
+        """
+        Выполняется в потоке драйвера
+        """
+        self.__calibrator.signal_enable = a_enable
+        self.__signal_changed()
@@ -1,4 +1,5 @@
 from typing import Dict, Tuple
+import functools
 import enum
 
 from irspy.utils import bound
@@ -226,7 +227,20 @@ def __make_range_limits() -> Dict[SignalRange, Tuple[float, float]]:
     return range_limits
 
 
-RANGE_LIMITS = __make_range_limits()
+@functools.lru_cache(maxsize=None)
+def get_range_limits() -> Dict[SignalRange, Tuple[float, float]]:
+    """
+    Возвращает RANGE_LIMITS. Вычисляется при первом вызове, чтобы не разбирать строки диапазонов при импорте
+    """
+    return __make_range_limits()
+
+
+def __getattr__(a_name):
+    # Совместимость с calibrator_constants.RANGE_LIMITS
+    if a_name == "RANGE_LIMITS":
+        return get_range_limits()
+    raise AttributeError(f"module {__name__!r} has no attribute {a_name!r}")
+
 
 SIGNAL_TYPE_RANGES = {
     SignalType.DCV: DcvRanges,
@@ -236,6 +250,20 @@ SIGNAL_TYPE_RANGES = {
 }
 
 
+def get_signal_range(a_amplitude: float, a_signal_type: SignalType) -> enum.Enum:
+    """
+    Возвращает диапазон (элемент DcvRanges, DciRanges, AcvRanges или AciRanges), в который попадает амплитуда.
+    Для амплитуды больше верхнего предела последнего диапазона возвращает последний диапазон
+    """
+    amplitude = abs(a_amplitude)
+    range_limits = get_range_limits()
+    signal_range = None
+    for signal_range in SIGNAL_TYPE_RANGES[a_signal_type]:
+        if amplitude <= range_limits[signal_range][1]:
+            break
+    return signal_range
+
+
 def bound_amplitude(a_amplitude: float, a_signal_type: SignalType) -> float:
     """
     Обрезает амплитуду в допустимых для калибратора границах, в зависимости от типа сигнала
@@ -0,0 +1,299 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import threading
+import tempfile
+import ctypes
+from os.path import join
+import logging
+import shutil
+import time
+import sys
+import os
+
+from irspy.clb.clb_dll import ClbDrv, UsbDrv, load_clb_dll_copy
+from irspy.clb.network_variables import NetworkVariables
+from irspy.clb.acquisition import Snapshot
+import irspy.clb.calibrator_constants as clb
+import irspy.utils as utils
+
+
+class PoolThroughput(NamedTuple):
+    devices_count: int
+    ticks_per_s: float
+    snapshots_per_s: float
+    bytes_per_s: float
+    # Среднее время одного прохода по всем калибраторам
+    tick_time_s: float
+
+
+class CalibratorSession:
+    """
+    Соединение с одним калибратором пула: свой экземпляр драйвера, UsbDrv, ClbDrv, NetworkVariables
+    и последний снимок сетевых переменных
+    """
+    def __init__(self, a_name: str, a_clb_dll, a_data_size: int, a_variables_ini_path: str):
+        self.name = a_name
+        self.clb_dll = a_clb_dll
+        self.usb = UsbDrv(a_clb_dll, a_data_size)
+        self.calibrator = ClbDrv(a_clb_dll)
+        self.network_variables = NetworkVariables(a_variables_ini_path, self.calibrator)
+
+        self.snapshot: Optional[Snapshot] = None
+        self.__snapshot_number = 0
+
+    def connect(self):
+        self.calibrator.connect(self.name)
+
+    def disconnect(self):
+        self.calibrator.connect("")
+
+    def __update_state(self):
+        if self.usb.get_status() != UsbDrv.UsbState.CONNECTED:
+            state = clb.State.DISCONNECTED
+        else:
+            self.calibrator.signal_enable_changed()
+            if not self.calibrator.signal_enable:
+                state = clb.State.STOPPED
+            elif self.calibrator.is_signal_ready():
+                state = clb.State.READY
+            else:
+                state = clb.State.WAITING_SIGNAL
+        self.calibrator.state = state
+
+    def tick(self) -> int:
+        """
+        Вызывает UsbDrv.tick, обновляет ClbDrv.state и читает снимок сетевых переменных
+        :return: Количество прочитанных байт, 0 - калибратор не подключен и снимок без значений
+        """
+        self.usb.tick()
+        self.__update_state()
+
+        values = ()
+        if self.network_variables.connected():
+            values = tuple(self.network_variables.read_snapshot())
+
+        self.__snapshot_number += 1
+        self.snapshot = Snapshot(number=self.__snapshot_number, timestamp=time.time(),
+                                 usb_status=self.usb.get_status(), values=values)
+        return self.network_variables.get_data_size() if values else 0
+
+
+class CalibratorPool:
+    """
+    Работа с несколькими калибраторами N4-25 из одного процесса. Драйвер калибратора поддерживает одно
+    соединение на экземпляр библиотеки, поэтому для каждого найденного калибратора создается CalibratorSession
+    со своим экземпляром драйвера из a_clb_dll_factory (по умолчанию - копия clb_dll, см. load_clb_dll_copy).
+    Отдельный экземпляр драйвера следит за списком калибраторов на USB: новые калибраторы подключаются
+    автоматически, отключенные удаляются из пула.
+    Один вызов tick() обслуживает все калибраторы: tick USB-драйверов, состояние и снимок сетевых переменных.
+    tick() вызывается либо вручную, либо потоком пула (start/stop).
+    Копии clb_dll загружены до завершения процесса, поэтому close() их каталог не удаляет. Каталоги копий
+    завершившихся процессов удаляются, когда следующий пул создает свой каталог
+    """
+    COPIES_PREFIX = "irspy_clb_"
+
+    def __init__(self, a_variables_ini_path: str, a_clb_dll_factory: Optional[Callable[[], Any]] = None,
+                 a_period_s: float = 0.1):
+        """
+        :param a_variables_ini_path: Путь к файлу с описанием сетевых переменных
+        :param a_clb_dll_factory: Функция без параметров, которая создает новый экземпляр драйвера калибратора.
+        Обязательна, если через select_clb_dll выбран не файл библиотеки, а объект (например, SimulatedClbDll)
+        :param a_period_s: Период вызова tick() потоком пула
+        """
+        self.__variables_ini_path = a_variables_ini_path
+        variables_info = NetworkVariables.get_variables_from_ini(a_variables_ini_path)
+        self.__data_size = max((v.index + v.size for v in variables_info), default=0)
+
+        self.__copies_directory: Optional[str] = None
+        self.__clb_dll_factory = a_clb_dll_factory if a_clb_dll_factory is not None else self.__load_clb_dll_copy
+        self.period_s = a_period_s
+
+        self.__discovery_usb = UsbDrv(self.__clb_dll_factory(), self.__data_size)
+        self.__sessions: Dict[str, CalibratorSession] = {}
+        # Экземпляры драйвера отключенных калибраторов, используются повторно
+        self.__free_clb_dlls = []
+
+        self.__stop_event = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+        self.__stat_start_time = time.perf_counter()
+        self.__ticks_count = 0
+        self.__snapshots_count = 0
+        self.__bytes_count = 0
+        self.__tick_time_s = 0.
+
+    def __load_clb_dll_copy(self):
+        if self.__copies_directory is None:
+            CalibratorPool.remove_stale_copies()
+            self.__copies_directory = tempfile.mkdtemp(prefix=f"{CalibratorPool.COPIES_PREFIX}{os.getpid()}_")
+        return load_clb_dll_copy(self.__copies_directory)
+
+    @staticmethod
+    def remove_stale_copies():
+        """
+        Удаляет из временного каталога каталоги копий clb_dll, созданные завершившимися процессами
+        """
+        temp_directory = tempfile.gettempdir()
+        for name in os.listdir(temp_directory):
+            if not name.startswith(CalibratorPool.COPIES_PREFIX):
+                continue
+            pid = name[len(CalibratorPool.COPIES_PREFIX):].split("_", 1)[0]
+            if pid.isdigit() and int(pid) != os.getpid() and not CalibratorPool.__process_may_be_alive(int(pid)):
+                shutil.rmtree(join(temp_directory, name), ignore_errors=True)
+
+    @staticmethod
+    def __process_may_be_alive(a_pid: int) -> bool:
+        """
+        False, только если известно, что процесса a_pid нет. Если проверить не удалось, процесс считается живым,
+        и каталог его копий не удаляется
+        """
+        if sys.platform == "win32":
+            return CalibratorPool.__windows_process_may_be_alive(a_pid)
+        try:
+            os.kill(a_pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+        return True
+
+    @staticmethod
+    def __windows_process_may_be_alive(a_pid: int) -> bool:
+        from ctypes import wintypes
+
+        process_query_limited_information = 0x1000
+        error_invalid_parameter = 87
+        still_active = 259
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        kernel32.GetExitCodeProcess.argtypes = [wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD)]
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+        handle = kernel32.OpenProcess(process_query_limited_information, False, a_pid)
+        if not handle:
+            # ERROR_INVALID_PARAMETER - процесса с таким pid нет, остальные ошибки (например, нет доступа к
+            # процессу другого пользователя) ничего не говорят о том, жив ли процесс
+            return ctypes.get_last_error() != error_invalid_parameter
+        try:
+            exit_code = wintypes.DWORD()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == still_active
+        finally:
+            kernel32.CloseHandle(handle)
+
+    def devices(self) -> List[str]:
+        """
+        Имена калибраторов, для которых открыты сессии
+        """
+        return list(self.__sessions)
+
+    def get_session(self, a_name: str) -> CalibratorSession:
+        return self.__sessions[a_name]
+
+    def snapshot(self, a_name: str) -> Optional[Snapshot]:
+        """
+        Последний снимок калибратора a_name или None, если калибратор еще не опрашивался или не найден
+        """
+        session = self.__sessions.get(a_name)
+        return session.snapshot if session is not None else None
+
+    def snapshots(self) -> Dict[str, Optional[Snapshot]]:
+        return {name: session.snapshot for name, session in list(self.__sessions.items())}
+
+    def __sync_sessions(self, a_devices: List[str]):
+        for name in [name for name in self.__sessions if name not in a_devices]:
+            session = self.__sessions.pop(name)
+            session.disconnect()
+            self.__free_clb_dlls.append(session.clb_dll)
+
+        for name in a_devices:
+            if name not in self.__sessions:
+                clb_dll = self.__free_clb_dlls.pop() if self.__free_clb_dlls else self.__clb_dll_factory()
+                session = CalibratorSession(name, clb_dll, self.__data_size, self.__variables_ini_path)
+                session.connect()
+                self.__sessions[name] = session
+
+    def tick(self):
+        start_time = time.perf_counter()
+
+        self.__discovery_usb.tick()
+        if self.__discovery_usb.is_dev_list_changed():
+            self.__sync_sessions(self.__discovery_usb.get_dev_list())
+
+        for session in list(self.__sessions.values()):
+            try:
+                read_size = session.tick()
+                if read_size:
+                    self.__snapshots_count += 1
+                    self.__bytes_count += read_size
+            except Exception as err:
+                logging.error(f"Калибратор {session.name}: {utils.exception_handler(err)}")
+
+        self.__ticks_count += 1
+        self.__tick_time_s += time.perf_counter() - start_time
+
+    def get_throughput(self) -> PoolThroughput:
+        """
+        Статистика с момента создания пула или последнего reset_statistics
+        """
+        elapsed_s = max(time.perf_counter() - self.__stat_start_time, 1e-9)
+        return PoolThroughput(devices_count=len(self.__sessions),
+                              ticks_per_s=self.__ticks_count / elapsed_s,
+                              snapshots_per_s=self.__snapshots_count / elapsed_s,
+                              bytes_per_s=self.__bytes_count / elapsed_s,
+                              tick_time_s=self.__tick_time_s / self.__ticks_count if self.__ticks_count else 0.)
+
+    def reset_statistics(self):
+        self.__stat_start_time = time.perf_counter()
+        self.__ticks_count = 0
+        self.__snapshots_count = 0
+        self.__bytes_count = 0
+        self.__tick_time_s = 0.
+
+    def start(self):
+        """
+        Запускает поток. Если поток, остановленный stop, еще не завершился, бросает RuntimeError: иначе работали бы
+        оба потока
+        """
+        if self.is_running():
+            if not self.__stop_event.is_set():
+                return
+            raise RuntimeError("Поток пула калибраторов еще не завершился после stop")
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, name="clb_pool", daemon=True)
+        self.__thread.start()
+
+    def stop(self, a_timeout_s: Optional[float] = None):
+        """
+        :param a_timeout_s: Время ожидания завершения потока. Если поток не завершился, is_running возвращает
+        True, пока он не завершится
+        """
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join(a_timeout_s)
+            if not self.__thread.is_alive():
+                self.__thread = None
+
+    def is_running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def __run(self):
+        while not self.__stop_event.is_set():
+            start_time = time.perf_counter()
+            try:
+                self.tick()
+            except Exception as err:
+                logging.error(utils.exception_handler(err))
+            self.__stop_event.wait(max(self.period_s - (time.perf_counter() - start_time), 0))
+
+    def close(self):
+        """
+        Останавливает поток пула и отключает все калибраторы. Каталог копий clb_dll не удаляется: копии
+        остаются загруженными до завершения процесса (см. remove_stale_copies)
+        """
+        self.stop()
+        for session in self.__sessions.values():
+            session.disconnect()
+        self.__sessions.clear()
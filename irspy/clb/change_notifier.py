@@ -0,0 +1,85 @@
+from typing import Callable, Dict, Hashable, List
+import logging
+
+import irspy.utils as utils
+
+
+class ChangeNotifier:
+    """
+    Хранит подписки на изменение значений по ключу и вызывает обработчик подписки, когда значение по ключу
+    изменилось больше, чем на зону нечувствительности подписки.
+    Значения передаются в update() тем, кто их опрашивает, сам ChangeNotifier к драйверу не обращается
+    """
+    class Subscription:
+        __slots__ = ("callback", "deadband", "last_value")
+
+        def __init__(self, a_callback: Callable, a_deadband: float):
+            self.callback = a_callback
+            self.deadband = a_deadband
+            # Значение, с которым обработчик вызывался последний раз
+            self.last_value = ChangeNotifier.NO_VALUE
+
+    # Значение, которого еще не было, первый update() всегда вызывает обработчик
+    NO_VALUE = object()
+
+    def __init__(self):
+        self.__subscriptions: Dict[Hashable, List[ChangeNotifier.Subscription]] = {}
+
+    def subscribe(self, a_key: Hashable, a_callback: Callable, a_deadband: float = 0):
+        """
+        :param a_key: Ключ значения
+        :param a_callback: Обработчик, вызывается с новым значением в качестве единственного аргумента
+        :param a_deadband: Зона нечувствительности. Обработчик вызывается, только если значение отличается от
+        значения, с которым он вызывался последний раз, больше, чем на a_deadband. 0 - при любом изменении
+        """
+        assert a_deadband >= 0, "Зона нечувствительности не может быть отрицательной"
+        self.__subscriptions.setdefault(a_key, []).append(ChangeNotifier.Subscription(a_callback, a_deadband))
+
+    def unsubscribe(self, a_key: Hashable, a_callback: Callable):
+        subscriptions = self.__subscriptions.get(a_key)
+        if subscriptions is not None:
+            subscriptions[:] = [s for s in subscriptions if s.callback != a_callback]
+            if not subscriptions:
+                del self.__subscriptions[a_key]
+
+    def is_subscribed(self, a_key: Hashable) -> bool:
+        return a_key in self.__subscriptions
+
+    def keys(self) -> List[Hashable]:
+        return list(self.__subscriptions)
+
+    def reset(self):
+        """
+        Забывает последние значения, следующий update() вызовет все обработчики
+        """
+        for subscriptions in self.__subscriptions.values():
+            for subscription in subscriptions:
+                subscription.last_value = ChangeNotifier.NO_VALUE
+
+    def update(self, a_key: Hashable, a_value):
+        """
+        Передает новое значение по ключу и вызывает обработчики, для которых оно изменилось.
+        Исключения обработчиков логируются и не мешают вызову остальных обработчиков
+        """
+        for subscription in self.__subscriptions.get(a_key, ()):
+            if self.__is_changed(subscription, a_value):
+                subscription.last_value = a_value
+                try:
+                    subscription.callback(a_value)
+                except Exception as err:
+                    logging.error(utils.exception_handler(err))
+
+    @staticmethod
+    def __is_changed(a_subscription: Subscription, a_value) -> bool:
+        last_value = a_subscription.last_value
+        if last_value is ChangeNotifier.NO_VALUE:
+            return True
+        if a_value != a_value and last_value != last_value:
+            # nan не равен сам себе, но nan -> nan не изменение
+            return False
+        if a_subscription.deadband:
+            try:
+                return not abs(a_value - last_value) <= a_subscription.deadband
+            except TypeError:
+                pass
+        return a_value != last_value
@@ -1,10 +1,17 @@
-from os.path import dirname
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from os.path import basename, dirname, join
 from os import sep
+import contextlib
+import shutil
+import uuid
 import ctypes
 import enum
 import sys
 
+from irspy.clb.change_notifier import ChangeNotifier
 import irspy.clb.calibrator_constants as clb
+from irspy.dlls.lazy_library import LazyLibrary
+from irspy.dlls import instrumentation
 from irspy.revisions import Revisions
 import irspy.utils as utils
 
@@ -55,7 +62,47 @@ def set_up_driver(a_full_path) -> ctypes.CDLL:
 
 
 __path = "n4-25.dll" if sys.platform == "win32" else "libn4-25.so"
-clb_dll = set_up_driver(dirname(__file__) + sep + __path)
+_clb_dll = LazyLibrary("clb_dll", dirname(__file__) + sep + __path, set_up_driver)
+
+
+def get_clb_dll():
+    """
+    Возвращает драйвер калибратора, при первом вызове загружает его
+    """
+    return _clb_dll.get()
+
+
+def select_clb_dll(a_library_or_path):
+    """
+    Выбирает драйвер калибратора, который будет возвращать get_clb_dll. Вызывается до первого get_clb_dll
+    :param a_library_or_path: Путь к библиотеке драйвера или объект с тем же интерфейсом (например, SimulatedClbDll)
+    """
+    _clb_dll.select(a_library_or_path)
+
+
+def load_clb_dll_copy(a_directory: str):
+    """
+    Загружает отдельный экземпляр драйвера калибратора из копии библиотеки в каталоге a_directory.
+    Драйвер хранит соединение в глобальных переменных библиотеки, а повторная загрузка того же файла возвращает
+    уже загруженный экземпляр, поэтому для одновременной работы с несколькими калибраторами каждому нужна своя копия.
+    Копируется библиотека, выбранная через select_clb_dll (или по умолчанию). Копия оборачивается для
+    инструментирования так же, как get_clb_dll
+    :param a_directory: Каталог для копии, удалять его можно только после выгрузки процесса
+    """
+    source_path = _clb_dll.get_library_path()
+    if source_path is None:
+        raise ValueError("Выбранный драйвер калибратора не загружен из файла, копию загрузить нельзя")
+    copy_name = f"{uuid.uuid4().hex}_{basename(source_path)}"
+    copy_path = join(a_directory, copy_name)
+    shutil.copyfile(source_path, copy_path)
+    return instrumentation.instrument(f"clb_dll {copy_name}", set_up_driver(copy_path))
+
+
+def __getattr__(a_name):
+    # Совместимость с clb_dll.clb_dll, драйвер загружается при первом обращении
+    if a_name == "clb_dll":
+        return get_clb_dll()
+    raise AttributeError(f"module {__name__!r} has no attribute {a_name!r}")
 
 
 class UsbDrv:
@@ -68,6 +115,7 @@ class UsbDrv:
 
     def __init__(self, a_clb_dll, a_data_size):
         self.clb_dll = a_clb_dll
+        self.__data_size = a_data_size
         # Обязательно перед любыми действиями с clb_driver_dll
         self.clb_dll.usb_init(a_data_size)
 
@@ -118,8 +166,121 @@ class UsbDrv:
     def get_status(self):
         return self.UsbState(self.usb_status)
 
+    def get_data_size(self) -> int:
+        """
+        Возвращает размер mxdata, с которым был инициализирован драйвер
+        """
+        return self.__data_size
+
+
+def merge_ranges(a_ranges: Iterable[Tuple[int, int]], a_max_gap: int = 0) -> List[Tuple[int, int]]:
+    """
+    Объединяет диапазоны байт, которые пересекаются или отстоят друг от друга не больше чем на a_max_gap байт
+    :param a_ranges: Диапазоны (смещение, количество байт) в любом порядке
+    :param a_max_gap: Максимальный промежуток между диапазонами, при котором они объединяются
+    :return: Отсортированный по смещению список непересекающихся диапазонов (смещение, количество байт)
+    """
+    merged = []
+    block_start = block_end = -1
+    for start, count in sorted(a_ranges):
+        if count <= 0:
+            continue
+        end = start + count
+        if block_start >= 0 and start - block_end <= a_max_gap:
+            block_end = max(block_end, end)
+        else:
+            if block_start >= 0:
+                merged.append((block_start, block_end - block_start))
+            block_start, block_end = start, end
+    if block_start >= 0:
+        merged.append((block_start, block_end - block_start))
+    return merged
+
+
+class WriteBatch:
+    """
+    Накапливает записи в mxdata и отправляет их в драйвер минимальным количеством вызовов:
+    соседние байты объединяются в один write_bytes, несколько битов одного байта записываются одним
+    чтением-модификацией-записью байта, одиночный бит записывается через write_bit
+    """
+    def __init__(self):
+        # Индекс байта -> значение байта
+        self.__bytes: Dict[int, int] = {}
+        # Индекс байта -> {Номер бита: значение бита}
+        self.__bits: Dict[int, Dict[int, int]] = {}
+
+    def is_empty(self) -> bool:
+        return not self.__bytes and not self.__bits
+
+    def clear(self):
+        self.__bytes.clear()
+        self.__bits.clear()
+
+    def add_bytes(self, a_start_index: int, a_bytes_count: int, a_bytes):
+        for offset, byte in enumerate(bytes(a_bytes[:a_bytes_count])):
+            index = a_start_index + offset
+            self.__bytes[index] = byte
+            # Запись байта целиком перекрывает все ранее записанные в него биты
+            self.__bits.pop(index, None)
+
+    def add_bit(self, a_byte_index: int, a_bit_index: int, a_value: int):
+        if a_byte_index in self.__bytes:
+            self.__bytes[a_byte_index] = WriteBatch.__apply_bits(self.__bytes[a_byte_index], {a_bit_index: a_value})
+        else:
+            self.__bits.setdefault(a_byte_index, {})[a_bit_index] = a_value
+
+    @staticmethod
+    def __apply_bits(a_byte: int, a_bits: Dict[int, int]) -> int:
+        for bit_index, value in a_bits.items():
+            if value:
+                a_byte |= 1 << bit_index
+            else:
+                a_byte &= ~(1 << bit_index)
+        return a_byte & 0xFF
+
+    def flush(self, a_clb_dll) -> int:
+        """
+        Отправляет накопленные записи в драйвер и очищает пакет
+        :param a_clb_dll: Библиотека драйвера калибратора
+        :return: Количество вызовов драйвера
+        """
+        calls_count = 0
+        byte_buffer = (ctypes.c_ubyte * 1)()
+
+        for byte_index, bits in self.__bits.items():
+            if len(bits) == 1:
+                (bit_index, value), = bits.items()
+                a_clb_dll.write_bit(byte_index, bit_index, value)
+                calls_count += 1
+            else:
+                a_clb_dll.read_bytes(byte_buffer, byte_index, 1)
+                self.__bytes[byte_index] = WriteBatch.__apply_bits(byte_buffer[0], bits)
+                calls_count += 1
+
+        run_start = None
+        run = bytearray()
+        for index in sorted(self.__bytes):
+            if run_start is not None and index != run_start + len(run):
+                a_clb_dll.write_bytes(bytes(run), run_start, len(run))
+                calls_count += 1
+                run_start = None
+                run = bytearray()
+            if run_start is None:
+                run_start = index
+            run.append(self.__bytes[index])
+        if run_start is not None:
+            a_clb_dll.write_bytes(bytes(run), run_start, len(run))
+            calls_count += 1
+
+        self.clear()
+        return calls_count
+
 
 class ClbDrv:
+    # Параметры, на изменение которых можно подписаться через subscribe, в порядке их проверки в notify_changes.
+    # Тип сигнала проверяется первым, потому что от него зависят амплитуда и частота
+    SUBSCRIBABLE_PARAMETERS = ("signal_type", "amplitude", "frequency", "mode", "signal_enable")
+
     def __init__(self, a_clb_dll):
         self.__clb_dll = a_clb_dll
 
@@ -133,10 +294,37 @@ class ClbDrv:
         self.__mode = clb.Mode.SOURCE
         self.__signal_ready = False
         self.__state = clb.State.DISCONNECTED
+        # Увеличивается при каждом переподключении, см. connection_number
+        self.__connection_number = 0
 
         self.__set_signal_timer = utils.Timer(1)
         self.__set_signal_timer.start()
 
+        # Параметры сигнала, прочитанные внутри state_snapshot (имя параметра -> значение)
+        self.__snapshot_values: Dict[str, float] = {}
+        self.__snapshot_depth = 0
+        # Имя параметра -> функция драйвера, которая его читает
+        self.__parameter_getters = {
+            "amplitude": "get_amplitude",
+            "polarity": "get_polarity",
+            "frequency": "get_frequency",
+            "signal_type": "get_signal_type",
+            "mode": "get_mode",
+            "enabled": "enabled",
+        }
+
+        self.__write_batch = WriteBatch()
+        self.__batch_depth = 0
+
+        self.__notifier = ChangeNotifier()
+        self.__change_detectors = {
+            "signal_type": self.signal_type_changed,
+            "amplitude": self.amplitude_changed,
+            "frequency": self.frequency_changed,
+            "mode": self.mode_changed,
+            "signal_enable": self.signal_enable_changed,
+        }
+
         buf1_t = ctypes.c_char * 1
         buf2_t = ctypes.c_char * 2
         buf4_t = ctypes.c_char * 4
@@ -160,16 +348,81 @@ class ClbDrv:
         self.__mode = clb.Mode.SOURCE
         self.__signal_ready = False
         self.__state = clb.State.DISCONNECTED
+        self.__connection_number += 1
+        self.__notifier.reset()
+        self.__snapshot_values.clear()
 
         if a_clb_name:
             self.__clb_dll.connect_usb(a_clb_name.encode("ascii"))
         else:
             self.__clb_dll.disconnect_usb()
 
+    def subscribe(self, a_parameter: str, a_callback: Callable, a_deadband: float = 0):
+        """
+        Подписывает a_callback на изменение параметра калибратора. Параметры проверяются в notify_changes
+        :param a_parameter: Имя параметра из SUBSCRIBABLE_PARAMETERS
+        :param a_callback: Обработчик, вызывается с новым значением параметра
+        :param a_deadband: Зона нечувствительности (см. ChangeNotifier.subscribe)
+        """
+        assert a_parameter in ClbDrv.SUBSCRIBABLE_PARAMETERS, f"Нельзя подписаться на параметр '{a_parameter}'"
+        self.__notifier.subscribe(a_parameter, a_callback, a_deadband)
+
+    def unsubscribe(self, a_parameter: str, a_callback: Callable):
+        self.__notifier.unsubscribe(a_parameter, a_callback)
+
+    def notify_changes(self):
+        """
+        Читает из драйвера только параметры, на которые есть подписки, и вызывает обработчики параметров,
+        которые изменились. Вызывается периодически, например по таймеру
+        """
+        subscribed = [parameter for parameter in ClbDrv.SUBSCRIBABLE_PARAMETERS
+                      if self.__notifier.is_subscribed(parameter)]
+        if not subscribed:
+            return
+
+        with self.state_snapshot():
+            if "signal_type" not in subscribed and ("amplitude" in subscribed or "frequency" in subscribed):
+                self.signal_type_changed()
+
+            for parameter in subscribed:
+                self.__change_detectors[parameter]()
+                self.__notifier.update(parameter, getattr(self, parameter))
+
+    @contextlib.contextmanager
+    def state_snapshot(self):
+        """
+        Область, внутри которой каждый параметр сигнала (амплитуда, полярность, частота, тип, режим, включение)
+        читается из драйвера не больше одного раза: *_changed, вызванные в одном такте, например
+        with calibrator.state_snapshot(): ..., не читают один и тот же параметр повторно. Читаются только те
+        параметры, которые запрошены. Вне области каждый *_changed обращается к драйверу.
+        Готовность сигнала (is_signal_ready) никогда не берется из области. Сеттеры сбрасывают затронутые
+        параметры, чтобы следующее чтение в той же области вернуло новое значение. Области можно вкладывать
+        """
+        self.__snapshot_depth += 1
+        try:
+            yield self
+        finally:
+            self.__snapshot_depth -= 1
+            if self.__snapshot_depth == 0:
+                self.__snapshot_values.clear()
+
+    def __read_parameter(self, a_name: str):
+        if self.__snapshot_depth == 0:
+            return getattr(self.__clb_dll, self.__parameter_getters[a_name])()
+        value = self.__snapshot_values.get(a_name)
+        if value is None:
+            value = getattr(self.__clb_dll, self.__parameter_getters[a_name])()
+            self.__snapshot_values[a_name] = value
+        return value
+
+    def __forget_parameters(self, *a_names: str):
+        for name in a_names:
+            self.__snapshot_values.pop(name, None)
+
     def amplitude_changed(self):
-        actual_amplitude = clb.bound_amplitude(self.__clb_dll.get_amplitude(), self.__signal_type)
+        actual_amplitude = clb.bound_amplitude(self.__read_parameter("amplitude"), self.__signal_type)
 
-        if self.__clb_dll.get_polarity() == clb.Polarity.NEG and \
+        if self.__read_parameter("polarity") == clb.Polarity.NEG and \
                 clb.is_dc_signal[self.__signal_type]:
             actual_amplitude = -actual_amplitude
 
@@ -186,16 +439,20 @@ class ClbDrv:
     @amplitude.setter
     def amplitude(self, a_amplitude: float):
         self.__clb_dll.set_amplitude(abs(a_amplitude))
+        self.__forget_parameters("amplitude")
         self.__set_polarity_by_amplitude_sign(a_amplitude)
 
     def __set_polarity_by_amplitude_sign(self, a_amplitude):
-        if a_amplitude < 0 and self.__clb_dll.get_polarity() != clb.Polarity.NEG:
+        polarity = self.__read_parameter("polarity")
+        if a_amplitude < 0 and polarity != clb.Polarity.NEG:
             self.__clb_dll.set_polarity(clb.Polarity.NEG)
-        elif a_amplitude >= 0 and self.__clb_dll.get_polarity() != clb.Polarity.POS:
+            self.__forget_parameters("polarity")
+        elif a_amplitude >= 0 and polarity != clb.Polarity.POS:
             self.__clb_dll.set_polarity(clb.Polarity.POS)
+            self.__forget_parameters("polarity")
 
     def frequency_changed(self):
-        actual_frequency = self.__clb_dll.get_frequency() if clb.is_ac_signal[self.__signal_type] \
+        actual_frequency = self.__read_parameter("frequency") if clb.is_ac_signal[self.__signal_type] \
             else 0
 
         if self.__frequency != actual_frequency:
@@ -212,9 +469,10 @@ class ClbDrv:
     def frequency(self, a_frequency: float):
         frequency = utils.bound(a_frequency, clb.MIN_FREQUENCY, clb.MAX_FREQUENCY)
         self.__clb_dll.set_frequency(frequency)
+        self.__forget_parameters("frequency")
 
     def signal_type_changed(self):
-        actual_signal_type = self.__clb_dll.get_signal_type()
+        actual_signal_type = self.__read_parameter("signal_type")
         if self.__signal_type != actual_signal_type:
             self.__signal_type = actual_signal_type
             return True
@@ -230,8 +488,11 @@ class ClbDrv:
         if self.__set_signal_timer.check():
             self.__set_signal_timer.start()
             self.__clb_dll.set_signal_type(a_signal_type)
+            # От типа сигнала зависят остальные параметры
+            self.__snapshot_values.clear()
 
     def is_signal_ready(self):
+        # Всегда из драйвера: готовность опрашивается в циклах ожидания, значение из state_snapshot их обманет
         return self.__clb_dll.is_signal_ready()
 
     @property
@@ -240,10 +501,20 @@ class ClbDrv:
 
     @state.setter
     def state(self, a_state: clb.State):
+        if (self.__state == clb.State.DISCONNECTED) != (a_state == clb.State.DISCONNECTED):
+            self.__connection_number += 1
         self.__state = a_state
 
+    @property
+    def connection_number(self) -> int:
+        """
+        Номер текущего соединения. Меняется при вызове connect() и при переходе в состояние DISCONNECTED и из него.
+        Все, что привязано к адресу mxdata, после смены номера нужно получать заново
+        """
+        return self.__connection_number
+
     def signal_enable_changed(self):
-        actual_enabled = self.__clb_dll.enabled()
+        actual_enabled = self.__read_parameter("enabled")
         if self.__signal_on != actual_enabled:
             self.__signal_on = actual_enabled
             return True
@@ -257,9 +528,10 @@ class ClbDrv:
     @signal_enable.setter
     def signal_enable(self, a_signal_enable: int):
         self.__clb_dll.signal_enable(a_signal_enable)
+        self.__forget_parameters("enabled")
 
     def mode_changed(self):
-        actual_mode = self.__clb_dll.get_mode()
+        actual_mode = self.__read_parameter("mode")
         if self.__mode != actual_mode:
             self.__mode = actual_mode
             return True
@@ -273,22 +545,85 @@ class ClbDrv:
     @mode.setter
     def mode(self, a_mode: int):
         self.__clb_dll.set_mode(a_mode)
+        self.__forget_parameters("mode")
 
     def fast_control_mode_enable(self, a_enable: int):
         self.__clb_dll.fast_control_mode_enable(a_enable)
 
-    def read_raw_bytes(self, a_start_index: int, a_bytes_count: int):
-        self.__clb_dll.read_bytes(self.__read_buffers[a_bytes_count], a_start_index, a_bytes_count)
-        return self.__read_buffers[a_bytes_count]
+    def read_raw_bytes(self, a_start_index: int, a_bytes_count: int) -> bytes:
+        """
+        Возвращает копию прочитанных байт, внутренний буфер чтения наружу не отдается.
+        Постоянные буферы есть только для размеров переменных (1, 2, 4, 8, 10 байт), для остальных размеров
+        создается временный буфер. Чтобы читать большие блоки без выделения памяти, есть read_raw_bytes_into
+        """
+        read_buffer = self.__read_buffers.get(a_bytes_count)
+        if read_buffer is None:
+            read_buffer = (ctypes.c_char * a_bytes_count)()
+
+        self.__clb_dll.read_bytes(read_buffer, a_start_index, a_bytes_count)
+        return read_buffer.raw
+
+    def read_ranges(self, a_ranges: Iterable[Tuple[int, int]], a_buffer: Optional[bytearray] = None,
+                    a_max_gap: int = 0) -> bytearray:
+        """
+        Читает несколько диапазонов mxdata в один буфер - образ mxdata: байт со смещением i попадает в a_buffer[i].
+        Диапазоны объединяются (см. merge_ranges), каждый объединенный диапазон читается одним вызовом
+        read_bytes прямо в a_buffer, без промежуточных буферов
+        :param a_ranges: Диапазоны (смещение, количество байт)
+        :param a_buffer: Буфер, если None, создается буфер до конца последнего диапазона
+        :param a_max_gap: Максимальный промежуток между диапазонами, при котором они читаются одним вызовом
+        :return: a_buffer или созданный буфер
+        """
+        ranges = merge_ranges(a_ranges, a_max_gap)
+        if a_buffer is None:
+            a_buffer = bytearray(ranges[-1][0] + ranges[-1][1] if ranges else 0)
+        elif ranges:
+            assert ranges[-1][0] + ranges[-1][1] <= len(a_buffer), "Диапазоны выходят за пределы буфера"
+
+        for start, count in ranges:
+            self.__clb_dll.read_bytes((ctypes.c_ubyte * count).from_buffer(a_buffer, start), start, count)
+        return a_buffer
+
+    def read_raw_bytes_into(self, a_buffer, a_start_index: int, a_bytes_count: int):
+        """
+        Читает a_bytes_count байт mxdata, начиная с a_start_index, в переданный буфер
+        :param a_buffer: ctypes-массив размером не меньше a_bytes_count
+        :param a_start_index: Смещение первого байта в mxdata
+        :param a_bytes_count: Количество байт
+        """
+        assert ctypes.sizeof(a_buffer) >= a_bytes_count, "Размер буфера меньше количества читаемых байт"
+        self.__clb_dll.read_bytes(a_buffer, a_start_index, a_bytes_count)
 
     def write_raw_bytes(self, a_start_index: int, a_bytes_count: int, a_bytes):
-        self.__clb_dll.write_bytes(a_bytes, a_start_index, a_bytes_count)
+        if self.__batch_depth:
+            self.__write_batch.add_bytes(a_start_index, a_bytes_count, a_bytes)
+        else:
+            self.__clb_dll.write_bytes(a_bytes, a_start_index, a_bytes_count)
 
     def read_bit(self, a_byte_index: int, a_bit_index: int) -> int:
         return self.__clb_dll.read_bit(a_byte_index, a_bit_index)
 
     def write_bit(self, a_byte_index: int, a_bit_index: int, a_value: int):
-        self.__clb_dll.write_bit(a_byte_index, a_bit_index, a_value)
+        if self.__batch_depth:
+            self.__write_batch.add_bit(a_byte_index, a_bit_index, a_value)
+        else:
+            self.__clb_dll.write_bit(a_byte_index, a_bit_index, a_value)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Внутри блока with записи write_raw_bytes и write_bit не отправляются в драйвер сразу, а накапливаются
+        и отправляются одним пакетом (см. WriteBatch) при выходе из внешнего блока.
+        Записи, сделанные до исключения внутри блока, тоже отправляются, как и без пакета.
+        Чтение внутри блока возвращает значения из mxdata, т.е. без учета накопленных записей
+        """
+        self.__batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.__batch_depth -= 1
+            if not self.__batch_depth:
+                self.__write_batch.flush(self.__clb_dll)
 
     def get_mxdata_address(self) -> int:
         return self.__clb_dll.get_mxdata_address()
@@ -0,0 +1,157 @@
+from typing import Callable, Iterable, Optional, Tuple
+import concurrent.futures
+import threading
+import asyncio
+import logging
+import queue
+import time
+
+from irspy.clb.clb_dll import ClbDrv, UsbDrv
+import irspy.utils as utils
+
+
+class ClbDriverThread:
+    """
+    Потокобезопасный доступ к одному калибратору из нескольких потоков (GUI, логгер, скрипты автоматизации).
+    Все обращения к UsbDrv и ClbDrv выполняет один поток-владелец, который берет команды из очереди по порядку.
+    Методы возвращают concurrent.futures.Future сразу, не дожидаясь драйвера, для asyncio есть call_async.
+    Если передан a_usb_driver, поток сам вызывает UsbDrv.tick с периодом a_tick_period_s между командами.
+    Пока поток запущен, к UsbDrv и ClbDrv нельзя обращаться напрямую из других потоков
+    """
+    def __init__(self, a_calibrator: ClbDrv, a_usb_driver: Optional[UsbDrv] = None, a_tick_period_s: float = 0.1):
+        """
+        :param a_calibrator: Драйвер калибратора
+        :param a_usb_driver: USB-драйвер, None - tick вызывает кто-то другой через call
+        :param a_tick_period_s: Период вызова UsbDrv.tick
+        """
+        self.__calibrator = a_calibrator
+        self.__usb_driver = a_usb_driver
+        self.tick_period_s = a_tick_period_s
+
+        self.__commands = queue.SimpleQueue()
+        self.__thread: Optional[threading.Thread] = None
+        self.__running = False
+        # Защищает __running и постановку команд, чтобы после stop в очередь ничего не попало
+        self.__lock = threading.Lock()
+        self.__next_tick_time = 0.
+
+    @property
+    def calibrator(self) -> ClbDrv:
+        return self.__calibrator
+
+    def start(self):
+        """
+        Запускает поток. Если поток, остановленный stop, еще выполняет поставленные до stop команды, бросает
+        RuntimeError: второй поток обращался бы к драйверу одновременно с ним
+        """
+        if self.is_running():
+            if self.__running:
+                return
+            raise RuntimeError("Поток драйвера калибратора еще выполняет команды, поставленные до stop")
+        self.__running = True
+        self.__thread = threading.Thread(target=self.__run, name="clb_driver", daemon=True)
+        self.__thread.start()
+
+    def stop(self, a_timeout_s: Optional[float] = None):
+        """
+        Останавливает поток после выполнения уже поставленных команд
+        :param a_timeout_s: Время ожидания завершения потока. Если поток не завершился, is_running возвращает
+        True, пока он не выполнит оставшиеся команды
+        """
+        if self.__thread is None:
+            return
+        with self.__lock:
+            self.__running = False
+            # Пустая команда будит поток, если он ждет очередь
+            self.__commands.put(None)
+        self.__thread.join(a_timeout_s)
+        if not self.__thread.is_alive():
+            self.__thread = None
+
+    def is_running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def call(self, a_function: Callable, *a_args, **a_kwargs) -> concurrent.futures.Future:
+        """
+        Ставит в очередь вызов a_function(*a_args, **a_kwargs) в потоке-владельце.
+        Несколько обращений к драйверу внутри a_function выполняются подряд, без команд других потоков между ними
+        :return: Future с результатом или исключением a_function
+        """
+        future = concurrent.futures.Future()
+        with self.__lock:
+            if not self.__running:
+                raise RuntimeError("Поток драйвера калибратора не запущен")
+            self.__commands.put((future, a_function, a_args, a_kwargs))
+        return future
+
+    def call_async(self, a_function: Callable, *a_args, **a_kwargs) -> asyncio.Future:
+        """
+        То же, что call, но для await в корутине
+        """
+        return asyncio.wrap_future(self.call(a_function, *a_args, **a_kwargs))
+
+    def read_raw_bytes(self, a_start_index: int, a_bytes_count: int) -> concurrent.futures.Future:
+        return self.call(self.__calibrator.read_raw_bytes, a_start_index, a_bytes_count)
+
+    def read_ranges(self, a_ranges: Iterable[Tuple[int, int]], a_max_gap: int = 0) -> concurrent.futures.Future:
+        """
+        См. ClbDrv.read_ranges. Результат - новый bytearray для каждого вызова
+        """
+        return self.call(self.__calibrator.read_ranges, list(a_ranges), None, a_max_gap)
+
+    def write_raw_bytes(self, a_start_index: int, a_bytes_count: int, a_bytes) -> concurrent.futures.Future:
+        return self.call(self.__calibrator.write_raw_bytes, a_start_index, a_bytes_count, bytes(a_bytes))
+
+    def read_bit(self, a_byte_index: int, a_bit_index: int) -> concurrent.futures.Future:
+        return self.call(self.__calibrator.read_bit, a_byte_index, a_bit_index)
+
+    def write_bit(self, a_byte_index: int, a_bit_index: int, a_value: int) -> concurrent.futures.Future:
+        return self.call(self.__calibrator.write_bit, a_byte_index, a_bit_index, a_value)
+
+    def get(self, a_parameter: str) -> concurrent.futures.Future:
+        """
+        Читает свойство ClbDrv (amplitude, frequency, signal_type, state и т.д.)
+        """
+        return self.call(getattr, self.__calibrator, a_parameter)
+
+    def set(self, a_parameter: str, a_value) -> concurrent.futures.Future:
+        """
+        Записывает свойство ClbDrv (amplitude, frequency, signal_type, signal_enable, mode и т.д.)
+        """
+        return self.call(setattr, self.__calibrator, a_parameter, a_value)
+
+    def __run(self):
+        while self.__running:
+            timeout_s = None
+            if self.__usb_driver is not None:
+                timeout_s = self.__next_tick_time - time.perf_counter()
+                if timeout_s <= 0:
+                    self.__usb_driver.tick()
+                    self.__next_tick_time = time.perf_counter() + self.tick_period_s
+                    timeout_s = self.tick_period_s
+
+            try:
+                command = self.__commands.get(timeout=timeout_s)
+            except queue.Empty:
+                continue
+            if command is not None:
+                self.__execute(*command)
+
+        # Команды, поставленные до stop, выполняются, чтобы ни один Future не остался без результата
+        while True:
+            try:
+                command = self.__commands.get_nowait()
+            except queue.Empty:
+                break
+            if command is not None:
+                self.__execute(*command)
+
+    @staticmethod
+    def __execute(a_future: concurrent.futures.Future, a_function: Callable, a_args, a_kwargs):
+        if not a_future.set_running_or_notify_cancel():
+            return
+        try:
+            a_future.set_result(a_function(*a_args, **a_kwargs))
+        except BaseException as err:
+            logging.debug(utils.exception_handler(err))
+            a_future.set_exception(err)
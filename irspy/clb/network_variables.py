@@ -1,18 +1,44 @@
+from typing import Callable, List, Sequence, Dict, Union
+from operator import itemgetter
 from enum import IntEnum
-from typing import List
+from array import array
+import functools
 import logging
+import ctypes
 import struct
 import re
+import os
 
+from irspy.clb.change_notifier import ChangeNotifier
 import irspy.clb.calibrator_constants as clb
 from irspy.clb.clb_dll import ClbDrv
 import irspy.utils as utils
 
 
+# Имя типа -> (короткое имя типа для struct, размер типа в байтах)
+VARIABLE_TYPES = {
+    "double": ('d', 8),
+    "float": ('f', 4),
+    # 'o' используется как флаг битовой переменной
+    "bit": ('o', 1),
+    "u32": ('I', 4),
+    "i32": ('i', 4),
+    "u8": ('B', 1),
+    "i8": ('b', 1),
+    "u16": ('H', 2),
+    "i16": ('h', 2),
+    "bool": ('B', 1),
+    "u64": ('Q', 8),
+    "i64": ('q', 8),
+}
+
+
 class VariableInfo:
     """
     Класс для описания сетевой переменной
     """
+    __slots__ = ("number", "index", "name", "size", "c_type", "bit_index", "__type")
+
     def __init__(self, a_number: int = 0, a_index: int = 0, a_bit_index: int = 0, a_type: str = "u32",
                  a_name: str = ""):
         """
@@ -25,12 +51,8 @@ class VariableInfo:
         self.number = a_number
         self.index = a_index
         self.name = a_name
-        self.size = 0
-        self.c_type = ""
         self.bit_index = a_bit_index
-
-        self.__type = a_type
-        self.type = self.__type
+        self.type = a_type
 
     @property
     def type(self) -> str:
@@ -38,75 +60,278 @@ class VariableInfo:
 
     @type.setter
     def type(self, a_type: str):
+        """
+        Для неучтенных в VARIABLE_TYPES типов бросает исключение TypeError
+        """
+        try:
+            self.c_type, self.size = VARIABLE_TYPES[a_type]
+        except KeyError:
+            raise TypeError(f"Незарегистрированый тип '{a_type}'") from None
         self.__type = a_type
-        self.c_type = VariableInfo.__get_c_type(self.__type)
-        self.size = VariableInfo.__get_type_size(self.__type)
 
-    @staticmethod
-    def __get_type_size(a_type_name: str) -> int:
-        """
-        Возвращает размер типа в байтах по имени, для неучтенных типов бросает исключение TypeError
-        :param a_type_name: Имя типа
-        :return: Размер типа в байтах
-        """
-        if a_type_name == "double":
-            return 8
-        elif a_type_name == "float":
-            return 4
-        elif "32" in a_type_name:
-            return 4
-        elif "16" in a_type_name:
-            return 2
-        elif "8" in a_type_name:
-            return 1
-        elif a_type_name == "bit":
-            return 1
-        elif a_type_name == "bool":
-            return 1
-        elif "64" in a_type_name:
-            return 8
-        elif "long" in a_type_name:
-            return 10
+    def __repr__(self):
+        return f"{self.number}, {self.index}, {self.bit_index}, {self.name}, {self.__type}"
+
+
+class VariableTable(Sequence):
+    """
+    Таблица сетевых переменных, хранящаяся по столбцам: смещения, номера битов, размеры и коды типов лежат в
+    отдельных array, имена - в списке. Элементы таблицы выдаются как VariableInfo, которые создаются при
+    обращении, поэтому их изменение на таблицу не влияет. Частые чтения и записи переменных обращаются к
+    столбцам напрямую, без создания VariableInfo
+    """
+    TYPE_NAMES = tuple(VARIABLE_TYPES)
+    TYPE_CODES = {type_name: code for code, type_name in enumerate(TYPE_NAMES)}
+    # Код типа -> struct.Struct типа, None для битовых переменных
+    TYPE_STRUCTS = tuple(None if c_type == 'o' else struct.Struct(c_type) for c_type, _ in VARIABLE_TYPES.values())
+
+    def __init__(self):
+        self.indexes = array('I')
+        self.bit_indexes = array('B')
+        self.sizes = array('B')
+        # Индекс в TYPE_NAMES
+        self.type_codes = array('B')
+        self.names: List[str] = []
+        self.__numbers: Dict[str, int] = {}
+
+    def append(self, a_index: int, a_bit_index: int, a_type: str, a_name: str):
+        try:
+            type_code = VariableTable.TYPE_CODES[a_type]
+        except KeyError:
+            raise TypeError(f"Незарегистрированый тип '{a_type}'") from None
+
+        self.__numbers.setdefault(a_name, len(self.names))
+        self.indexes.append(a_index)
+        self.bit_indexes.append(a_bit_index)
+        self.sizes.append(VARIABLE_TYPES[a_type][1])
+        self.type_codes.append(type_code)
+        self.names.append(a_name)
+
+    def get_number(self, a_name: str) -> int:
+        """
+        Возвращает номер переменной по ее имени, если переменной нет, бросает KeyError
+        """
+        return self.__numbers[a_name]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, a_number):
+        if isinstance(a_number, slice):
+            return [self[number] for number in range(*a_number.indices(len(self)))]
+        if a_number < 0:
+            a_number += len(self)
+        return VariableInfo(a_number=a_number, a_index=self.indexes[a_number],
+                            a_bit_index=self.bit_indexes[a_number],
+                            a_type=VariableTable.TYPE_NAMES[self.type_codes[a_number]], a_name=self.names[a_number])
+
+
+class VariablesDecoder:
+    """
+    План декодирования области сетевых переменных. Строится один раз по списку VariableInfo.
+    Вся область описывается одним struct.Struct, в котором подряд идущие переменные одного типа объединены
+    в одну группу ("12d"), а биты, лежащие в одном байте, читаются из этого байта один раз.
+    Декодирование всей таблицы - это один вызов unpack_from и одна выборка через itemgetter
+    """
+    FORMAT_PREFIX = "="
+
+    def __init__(self, a_variables_info: Sequence[VariableInfo]):
+        """
+        :param a_variables_info: Список VariableInfo, номер переменной должен совпадать с индексом в списке
+        """
+        codes = []
+        # Для каждой переменной номер значения в результате unpack_from
+        slots = []
+        # (Номер переменной, номер бита) для битовых переменных
+        self.__bits = []
+        # (Номер переменной, struct.Struct, смещение, номер бита или -1) для переменных, которые не попали
+        # в общий формат
+        self.__standalone = []
+
+        offset = 0
+        values_count = 0
+        last_bit_byte_index = -1
+        last_bit_byte_slot = -1
+        for variable_info in a_variables_info:
+            is_bit = variable_info.c_type == 'o'
+
+            if is_bit and variable_info.index == last_bit_byte_index:
+                slots.append(last_bit_byte_slot)
+                self.__bits.append((variable_info.number, variable_info.bit_index))
+                continue
+
+            if variable_info.index < offset:
+                # Переменная перекрывается с уже описанными, ее придется читать отдельно
+                c_type = 'B' if is_bit else variable_info.c_type
+                self.__standalone.append((variable_info.number, struct.Struct(self.FORMAT_PREFIX + c_type),
+                                          variable_info.index, variable_info.bit_index if is_bit else -1))
+                slots.append(0)
+                continue
+
+            codes.extend('x' * (variable_info.index - offset))
+            slots.append(values_count)
+            values_count += 1
+            if is_bit:
+                codes.append('B')
+                offset = variable_info.index + 1
+                last_bit_byte_index = variable_info.index
+                last_bit_byte_slot = slots[-1]
+                self.__bits.append((variable_info.number, variable_info.bit_index))
+            else:
+                codes.append(variable_info.c_type)
+                offset = variable_info.index + variable_info.size
+
+        self.__struct = struct.Struct(self.FORMAT_PREFIX + self.__compress_codes(codes))
+        if len(slots) > 1:
+            self.__getter = itemgetter(*slots)
         else:
-            raise TypeError(f"Незарегистрированый тип '{a_type_name}'")
+            # itemgetter с одним номером возвращает значение, а не кортеж, а без номеров не создается
+            slots = tuple(slots)
+            self.__getter = lambda a_values: tuple(a_values[slot] for slot in slots)
 
     @staticmethod
-    def __get_c_type(a_type_name: str) -> str:
-        """
-        Возвращает короткое имя типа по обычному имени, для неучтенных типов бросает исключение TypeError
-        :param a_type_name: Имя типа
-        :return: Короткое имя типа
-        """
-        if a_type_name == "double":
-            return 'd'
-        elif a_type_name == "float":
-            return 'f'
-        elif a_type_name == "bit":
-            # Используется как флаг
-            return 'o'
-        elif a_type_name == "u32":
-            return 'I'
-        elif a_type_name == "i32":
-            return 'i'
-        elif a_type_name == "u8":
-            return 'B'
-        elif a_type_name == "i8":
-            return 'b'
-        elif a_type_name == "u16":
-            return 'H'
-        elif a_type_name == "i16":
-            return 'h'
-        elif a_type_name == "bool":
-            return 'B'
-        elif a_type_name == "u64":
-            return 'Q'
-        elif a_type_name == "i64":
-            return 'q'
+    def __compress_codes(a_codes: List[str]) -> str:
+        """
+        Объединяет подряд идущие одинаковые коды в одну группу: ['d', 'd', 'd', 'x'] -> "3dx"
+        """
+        groups = []
+        for code in a_codes:
+            if groups and groups[-1][0] == code:
+                groups[-1][1] += 1
+            else:
+                groups.append([code, 1])
+        return "".join(f"{count}{code}" if count > 1 else code for code, count in groups)
+
+    @property
+    def format(self) -> str:
+        return self.__struct.format
+
+    @property
+    def size(self) -> int:
+        """
+        Размер области, которую описывает общий формат
+        """
+        return self.__struct.size
+
+    def decode(self, a_buffer) -> list:
+        """
+        Декодирует значения всех сетевых переменных
+        :param a_buffer: Объект с buffer protocol, содержащий всю область сетевых переменных
+        :return: Список значений, индекс в списке соответствует номеру переменной
+        """
+        values = list(self.__getter(self.__struct.unpack_from(a_buffer)))
+
+        for number, bit_index in self.__bits:
+            values[number] = (values[number] >> bit_index) & 1
+
+        for number, variable_struct, index, bit_index in self.__standalone:
+            value = variable_struct.unpack_from(a_buffer, index)[0]
+            values[number] = value if bit_index < 0 else (value >> bit_index) & 1
+
+        return values
+
+
+class BufferedVariable:
+    """
+    Класс для буферизации значений сетевых переменных. Нужен, когда необходимо, чтобы чтение сетевой переменной
+    сразу после ее записи возвращала только что записанное значение.
+    (Если читать просто сетевую переменную, то чтение вернет старое значение, т.к. mxdata обновляется не мгновенно)
+    """
+    class Mode(IntEnum):
+        R = 0
+        RW = 1
+
+    def __init__(self, a_variable_info: VariableInfo, a_calibrator: ClbDrv, a_mode: Mode = Mode.RW,
+                 a_buffer_delay_s: float = 1):
+        """
+        :param a_variable_info: Информация о сетевой переменной
+        :param a_calibrator: Драйвер калибратора
+        :param a_mode: Режим доступа (R / RW). Если переменная в режиме R, то запись в нее бросает PermissionError
+        :param a_buffer_delay_s: Время в секундах, в течение которого значение переменной должно читаться из буфера
+        """
+        assert a_variable_info.c_type != "", "variable must have a c_type"
+        assert a_variable_info.type != "", "variable must have a type"
+        assert a_variable_info.size != 0, "variable must have a non-zero size"
+
+        self.__variable_info = a_variable_info
+        self.__is_bit = True if a_variable_info.c_type == 'o' else False
+        self.__mode = a_mode
+        self.__calibrator = a_calibrator
+
+        self.__buffer = 0
+        self._buffer_delay = a_buffer_delay_s
+        self.__delay_timer = utils.Timer(self._buffer_delay)
+
+    def get(self):
+        if self.__calibrator.state == clb.State.DISCONNECTED:
+            return 0
+
+        if self.__delay_timer.check() or not self.__delay_timer.started():
+            if self.__is_bit:
+                return self.__calibrator.read_bit(self.__variable_info.index, self.__variable_info.bit_index)
+            else:
+                _bytes = self.__calibrator.read_raw_bytes(self.__variable_info.index, self.__variable_info.size)
+                return struct.unpack(self.__variable_info.c_type, _bytes)[0]
+        else:
+            return self.__buffer
+
+    def set(self, a_value):
+        if self.__mode == BufferedVariable.Mode.R:
+            raise PermissionError(f"Попытка записи в read-only переменную "
+                                  f"(Индекс: {self.__variable_info.index}.{self.__variable_info.bit_index})")
+
+        if self.__is_bit:
+            a_value = utils.bound(int(a_value), 0, 1)
+            self.__calibrator.write_bit(self.__variable_info.index, self.__variable_info.bit_index, a_value)
         else:
-            raise TypeError("WARNING! Незарегистрированый тип '{a_type_name}'")
+            if self.__variable_info.c_type != 'd' and self.__variable_info.c_type != 'f':
+                a_value = int(a_value)
+
+            _bytes = struct.pack(self.__variable_info.c_type, a_value)
+            self.__calibrator.write_raw_bytes(self.__variable_info.index, self.__variable_info.size, _bytes)
+
+        self.__buffer = a_value
+        self.__delay_timer.start()
+
+
+class BufferedVariableField:
+    """
+    Описание сетевой переменной в таблице NetworkVariables. Сам BufferedVariable создается при первом обращении
+    к атрибуту и сохраняется в экземпляре NetworkVariables, поэтому переменные, к которым никто не обращался,
+    ничего не стоят
+    """
+    def __init__(self, a_index: int, a_type: str, a_mode: BufferedVariable.Mode = BufferedVariable.Mode.RW,
+                 a_bit_index: int = 0):
+        """
+        :param a_index: Смещение переменной
+        :param a_type: Тип переменной
+        :param a_mode: Режим доступа (R / RW)
+        :param a_bit_index: Смещение бита переменной (Используется только когда a_type == "bit")
+        """
+        self.name = ""
+        self.index = a_index
+        self.bit_index = a_bit_index
+        self.type = a_type
+        self.mode = a_mode
+
+    def __set_name__(self, a_owner, a_name: str):
+        self.name = a_name
+
+    def __get__(self, a_instance, a_owner):
+        if a_instance is None:
+            return self
+
+        variable = a_instance.make_buffered_variable(self.get_variable_info(), self.mode)
+        # Атрибут экземпляра перекрывает дескриптор, следующие обращения идут мимо __get__
+        a_instance.__dict__[self.name] = variable
+        return variable
+
+    def get_variable_info(self) -> VariableInfo:
+        return VariableInfo(a_index=self.index, a_bit_index=self.bit_index, a_type=self.type, a_name=self.name)
 
     def __repr__(self):
-        return f"{self.number}, {self.index}, {self.bit_index}, {self.name}, {self.__type}"
+        return f"{self.name}, {self.index}, {self.bit_index}, {self.type}, {self.mode.name}"
+
 
 
 class NetworkVariables:
@@ -116,679 +341,301 @@ class NetworkVariables:
     """
     VARIABLE_RE = re.compile(r"^(?P<parameter>Name|Type)_(?P<number>\d+)=(?P<value>.*)")
 
+    short_circuit_password = BufferedVariableField(20, "u32", BufferedVariable.Mode.RW)
+    core_t_calibration = BufferedVariableField(36, "double", BufferedVariable.Mode.RW)
+    shutdown_execute_password = BufferedVariableField(24, "u32", BufferedVariable.Mode.RW)
+    signal_on = BufferedVariableField(60, "bit", BufferedVariable.Mode.RW, a_bit_index=0)
+    reference_amplitude = BufferedVariableField(61, "double", BufferedVariable.Mode.RW)
+    current_enabled = BufferedVariableField(69, "bit", BufferedVariable.Mode.RW, a_bit_index=0)
+    dc_enabled = BufferedVariableField(69, "bit", BufferedVariable.Mode.RW, a_bit_index=1)
+    reverse = BufferedVariableField(69, "bit", BufferedVariable.Mode.RW, a_bit_index=2)
+    release_firmware = BufferedVariableField(69, "bit", BufferedVariable.Mode.R, a_bit_index=5)
+    has_correction = BufferedVariableField(69, "bit", BufferedVariable.Mode.R, a_bit_index=6)
+    pid_ac_voltage_k = BufferedVariableField(71, "double", BufferedVariable.Mode.RW)
+    pid_ac_voltage_ki = BufferedVariableField(79, "double", BufferedVariable.Mode.RW)
+    pid_ac_voltage_kd = BufferedVariableField(87, "double", BufferedVariable.Mode.RW)
+    iso_ac_voltage_k = BufferedVariableField(95, "double", BufferedVariable.Mode.RW)
+    iso_ac_voltage_t = BufferedVariableField(103, "double", BufferedVariable.Mode.RW)
+    acv_rate_slope = BufferedVariableField(111, "double", BufferedVariable.Mode.RW)
+    pid_ac_current_k = BufferedVariableField(119, "double", BufferedVariable.Mode.RW)
+    pid_ac_current_ki = BufferedVariableField(127, "double", BufferedVariable.Mode.RW)
+    pid_ac_current_kd = BufferedVariableField(135, "double", BufferedVariable.Mode.RW)
+    iso_ac_current_k = BufferedVariableField(143, "double", BufferedVariable.Mode.RW)
+    iso_ac_current_t = BufferedVariableField(151, "double", BufferedVariable.Mode.RW)
+    aci_rate_slope = BufferedVariableField(159, "double", BufferedVariable.Mode.RW)
+    aci_preset_voltage_rate_slope = BufferedVariableField(167, "double", BufferedVariable.Mode.RW)
+    dead_band = BufferedVariableField(183, "double", BufferedVariable.Mode.RW)
+    f_correct_off = BufferedVariableField(199, "bit", BufferedVariable.Mode.RW, a_bit_index=0)
+    ui_correct_off = BufferedVariableField(199, "bit", BufferedVariable.Mode.RW, a_bit_index=1)
+    error_occurred = BufferedVariableField(199, "bit", BufferedVariable.Mode.R, a_bit_index=3)
+    use_eeprom_instead_of_sd_for_correct = BufferedVariableField(199, "bit", BufferedVariable.Mode.RW, a_bit_index=6)
+    clear_error_occurred_status = BufferedVariableField(199, "bit", BufferedVariable.Mode.RW, a_bit_index=4)
+    error_code = BufferedVariableField(200, "i32", BufferedVariable.Mode.R)
+    error_index = BufferedVariableField(204, "u32", BufferedVariable.Mode.RW)
+    error_count = BufferedVariableField(208, "u32", BufferedVariable.Mode.R)
+    source_manual_mode_password = BufferedVariableField(216, "u32", BufferedVariable.Mode.RW)
+    source_ready = BufferedVariableField(220, "bit", BufferedVariable.Mode.R, a_bit_index=0)
+    fast_adc_slow = BufferedVariableField(229, "double", BufferedVariable.Mode.R)
+    frequency = BufferedVariableField(293, "double", BufferedVariable.Mode.RW)
+    aux_stabilizer_4v_dac_code_float = BufferedVariableField(374, "float", BufferedVariable.Mode.RW)
+    aux_stabilizer_45v_dac_code_float = BufferedVariableField(378, "float", BufferedVariable.Mode.RW)
+    aux_stabilizer_600v_dac_code_float = BufferedVariableField(382, "float", BufferedVariable.Mode.RW)
+    relay_200_600 = BufferedVariableField(406, "bit", BufferedVariable.Mode.RW, a_bit_index=0)
+    relay_aux_stabilizer_600v = BufferedVariableField(406, "bit", BufferedVariable.Mode.RW, a_bit_index=1)
+    relay_aux_stabilizer_4v = BufferedVariableField(406, "bit", BufferedVariable.Mode.RW, a_bit_index=4)
+    final_stabilizer_dac_dc_level = BufferedVariableField(416, "double", BufferedVariable.Mode.R)
+    aux_stabilizer_adc_dc_600v_voltage = BufferedVariableField(428, "double", BufferedVariable.Mode.R)
+    aux_stabilizer_adc_dc_40v_voltage = BufferedVariableField(448, "double", BufferedVariable.Mode.R)
+    aux_stabilizer_adc_dc_4v_voltage = BufferedVariableField(468, "double", BufferedVariable.Mode.R)
+    inner_stabilizer_12v_voltage = BufferedVariableField(512, "double", BufferedVariable.Mode.R)
+    inner_stabilizer_9v_voltage = BufferedVariableField(520, "double", BufferedVariable.Mode.R)
+    inner_stabilizer_5v_voltage = BufferedVariableField(528, "double", BufferedVariable.Mode.R)
+    inner_stabilizer_2_5v_pos_voltage = BufferedVariableField(536, "double", BufferedVariable.Mode.R)
+    inner_stabilizer_2_5v_neg_voltage = BufferedVariableField(544, "double", BufferedVariable.Mode.R)
+    cooling_power_supply_voltage = BufferedVariableField(552, "double", BufferedVariable.Mode.R)
+    analog_board_temperature_max = BufferedVariableField(560, "double", BufferedVariable.Mode.RW)
+    main_board_temperature_max = BufferedVariableField(576, "double", BufferedVariable.Mode.RW)
+    main_board_fun_temperature_setpoint = BufferedVariableField(584, "double", BufferedVariable.Mode.RW)
+    main_board_temperature = BufferedVariableField(592, "double", BufferedVariable.Mode.R)
+    main_board_fun_pid_k = BufferedVariableField(600, "double", BufferedVariable.Mode.RW)
+    main_board_fun_pid_ki = BufferedVariableField(608, "double", BufferedVariable.Mode.RW)
+    main_board_fun_pid_kd = BufferedVariableField(616, "double", BufferedVariable.Mode.RW)
+    main_board_fun_iso_k = BufferedVariableField(624, "double", BufferedVariable.Mode.RW)
+    main_board_fun_iso_t = BufferedVariableField(632, "double", BufferedVariable.Mode.RW)
+    main_board_fun_rate_slope = BufferedVariableField(640, "double", BufferedVariable.Mode.RW)
+    main_board_fun_pid_out = BufferedVariableField(648, "double", BufferedVariable.Mode.R)
+    main_board_fun_speed = BufferedVariableField(656, "i32", BufferedVariable.Mode.R)
+    transistor_dc_10a_temperature_max = BufferedVariableField(660, "double", BufferedVariable.Mode.RW)
+    transistor_dc_10a_fun_temperature_setpoint = BufferedVariableField(668, "double", BufferedVariable.Mode.RW)
+    transistor_dc_10a_temperature = BufferedVariableField(676, "double", BufferedVariable.Mode.R)
+    transistor_dc_10a_fun_pid_k = BufferedVariableField(684, "double", BufferedVariable.Mode.RW)
+    transistor_dc_10a_fun_pid_ki = BufferedVariableField(692, "double", BufferedVariable.Mode.RW)
+    transistor_dc_10a_fun_pid_kd = BufferedVariableField(700, "double", BufferedVariable.Mode.RW)
+    transistor_dc_10a_fun_iso_k = BufferedVariableField(708, "double", BufferedVariable.Mode.RW)
+    transistor_dc_10a_fun_iso_t = BufferedVariableField(716, "double", BufferedVariable.Mode.RW)
+    transistor_dc_10a_fun_rate_slope = BufferedVariableField(724, "double", BufferedVariable.Mode.RW)
+    transistor_dc_10a_fun_pid_out = BufferedVariableField(732, "double", BufferedVariable.Mode.R)
+    transistor_dc_10a_fun_speed = BufferedVariableField(740, "i32", BufferedVariable.Mode.R)
+    peltier_1_temperature_max = BufferedVariableField(744, "double", BufferedVariable.Mode.RW)
+    peltier_1_temperature_setpoint = BufferedVariableField(752, "double", BufferedVariable.Mode.RW)
+    peltier_1_temperature = BufferedVariableField(760, "double", BufferedVariable.Mode.R)
+    peltier_1_pid_k = BufferedVariableField(768, "double", BufferedVariable.Mode.RW)
+    peltier_1_pid_ki = BufferedVariableField(776, "double", BufferedVariable.Mode.RW)
+    peltier_1_pid_kd = BufferedVariableField(784, "double", BufferedVariable.Mode.RW)
+    peltier_1_iso_k = BufferedVariableField(792, "double", BufferedVariable.Mode.RW)
+    peltier_1_iso_t = BufferedVariableField(800, "double", BufferedVariable.Mode.RW)
+    peltier_1_rate_slope = BufferedVariableField(808, "double", BufferedVariable.Mode.RW)
+    peltier_1_polarity_pin = BufferedVariableField(832, "bit", BufferedVariable.Mode.R, a_bit_index=2)
+    peltier_1_ready = BufferedVariableField(832, "bit", BufferedVariable.Mode.RW, a_bit_index=3)
+    peltier_1_invert_polarity = BufferedVariableField(832, "bit", BufferedVariable.Mode.RW, a_bit_index=4)
+    peltier_1_pid_out = BufferedVariableField(816, "double", BufferedVariable.Mode.R)
+    peltier_1_amplitude_code_float = BufferedVariableField(824, "double", BufferedVariable.Mode.R)
+    peltier_2_temperature_max = BufferedVariableField(833, "double", BufferedVariable.Mode.RW)
+    peltier_2_temperature_setpoint = BufferedVariableField(841, "double", BufferedVariable.Mode.RW)
+    peltier_2_temperature = BufferedVariableField(849, "double", BufferedVariable.Mode.R)
+    peltier_2_pid_k = BufferedVariableField(857, "double", BufferedVariable.Mode.RW)
+    peltier_2_pid_ki = BufferedVariableField(865, "double", BufferedVariable.Mode.RW)
+    peltier_2_pid_kd = BufferedVariableField(873, "double", BufferedVariable.Mode.RW)
+    peltier_2_iso_k = BufferedVariableField(881, "double", BufferedVariable.Mode.RW)
+    peltier_2_iso_t = BufferedVariableField(889, "double", BufferedVariable.Mode.RW)
+    peltier_2_rate_slope = BufferedVariableField(897, "double", BufferedVariable.Mode.RW)
+    peltier_2_polarity_pin = BufferedVariableField(921, "bit", BufferedVariable.Mode.R, a_bit_index=2)
+    peltier_2_ready = BufferedVariableField(921, "bit", BufferedVariable.Mode.RW, a_bit_index=3)
+    peltier_2_invert_polarity = BufferedVariableField(921, "bit", BufferedVariable.Mode.RW, a_bit_index=4)
+    peltier_2_pid_out = BufferedVariableField(905, "double", BufferedVariable.Mode.R)
+    peltier_3_temperature_max = BufferedVariableField(922, "double", BufferedVariable.Mode.RW)
+    peltier_3_temperature_setpoint = BufferedVariableField(930, "double", BufferedVariable.Mode.RW)
+    peltier_3_temperature = BufferedVariableField(938, "double", BufferedVariable.Mode.R)
+    peltier_3_pid_k = BufferedVariableField(946, "double", BufferedVariable.Mode.RW)
+    peltier_3_pid_ki = BufferedVariableField(954, "double", BufferedVariable.Mode.RW)
+    peltier_3_pid_kd = BufferedVariableField(962, "double", BufferedVariable.Mode.RW)
+    peltier_3_iso_k = BufferedVariableField(970, "double", BufferedVariable.Mode.RW)
+    peltier_3_iso_t = BufferedVariableField(978, "double", BufferedVariable.Mode.RW)
+    peltier_3_rate_slope = BufferedVariableField(986, "double", BufferedVariable.Mode.RW)
+    peltier_3_pid_out = BufferedVariableField(994, "double", BufferedVariable.Mode.R)
+    peltier_3_polarity_pin = BufferedVariableField(1010, "bit", BufferedVariable.Mode.R, a_bit_index=2)
+    peltier_3_ready = BufferedVariableField(1010, "bit", BufferedVariable.Mode.RW, a_bit_index=3)
+    peltier_3_invert_polarity = BufferedVariableField(1010, "bit", BufferedVariable.Mode.RW, a_bit_index=4)
+    peltier_4_temperature_max = BufferedVariableField(1011, "double", BufferedVariable.Mode.RW)
+    peltier_4_temperature = BufferedVariableField(1019, "double", BufferedVariable.Mode.R)
+    volume = BufferedVariableField(1036, "float", BufferedVariable.Mode.RW)
+    result_id = BufferedVariableField(1040, "u32", BufferedVariable.Mode.RW)
+    f_calibr_coeff = BufferedVariableField(1064, "double", BufferedVariable.Mode.RW)
+    time_calibr_coeff = BufferedVariableField(1088, "double", BufferedVariable.Mode.RW)
+    id = BufferedVariableField(1098, "u32", BufferedVariable.Mode.RW)
+    software_revision = BufferedVariableField(1108, "u32", BufferedVariable.Mode.R)
+    peltier_4_temperature_setpoint = BufferedVariableField(1130, "double", BufferedVariable.Mode.RW)
+    peltier_4_pid_k = BufferedVariableField(1138, "double", BufferedVariable.Mode.RW)
+    peltier_4_pid_ki = BufferedVariableField(1146, "double", BufferedVariable.Mode.RW)
+    peltier_4_pid_kd = BufferedVariableField(1154, "double", BufferedVariable.Mode.RW)
+    peltier_4_iso_k = BufferedVariableField(1162, "double", BufferedVariable.Mode.RW)
+    peltier_4_iso_t = BufferedVariableField(1170, "double", BufferedVariable.Mode.RW)
+    peltier_4_rate_slope = BufferedVariableField(1178, "double", BufferedVariable.Mode.RW)
+    peltier_4_pid_out = BufferedVariableField(1186, "double", BufferedVariable.Mode.R)
+    peltier_4_polarity_pin = BufferedVariableField(1202, "bit", BufferedVariable.Mode.R, a_bit_index=2)
+    peltier_4_ready = BufferedVariableField(1202, "bit", BufferedVariable.Mode.RW, a_bit_index=3)
+    peltier_4_invert_polarity = BufferedVariableField(1202, "bit", BufferedVariable.Mode.RW, a_bit_index=4)
+    fun_max_level_for_low_dcv = BufferedVariableField(1237, "double", BufferedVariable.Mode.RW)
+
     def __init__(self, a_variables_ini_path: str, a_calibrator: ClbDrv, a_variables_read_delay=1):
         """
         :param a_variables_ini_path: Путь к файлу с описанием сетевых переменных
         :param a_calibrator: Драйвер калибратора
         :param a_variables_read_delay: Передается во все BufferedVariable и задает время, которое переменная будет
-        читаться из внутреннего буфера, вместо чтения из калибратора
+        читаться из внутреннего буфера, вместо чтения из калибратора.
+        BufferedVariable из таблицы переменных класса (см. BufferedVariableField) создаются при первом обращении
         """
         self.__calibrator = a_calibrator
+        self.__variables_read_delay = a_variables_read_delay
         self.__variables_info = self.get_variables_from_ini(a_variables_ini_path)
 
-        self.short_circuit_password = BufferedVariable(a_variable_info=VariableInfo(a_index=20, a_type="u32"),
-                                                       a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                       a_buffer_delay_s=a_variables_read_delay)
-
-        self.core_t_calibration = BufferedVariable(a_variable_info=VariableInfo(a_index=36, a_type="double"),
-                                                   a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                   a_buffer_delay_s=a_variables_read_delay)
-
-        self.shutdown_execute_password = BufferedVariable(a_variable_info=VariableInfo(a_index=24, a_type="u32"),
-                                                          a_calibrator=self.__calibrator,
-                                                          a_mode=BufferedVariable.Mode.RW,
-                                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.signal_on = BufferedVariable(a_variable_info=VariableInfo(a_index=60, a_bit_index=0, a_type="bit"),
-                                          a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.reference_amplitude = BufferedVariable(a_variable_info=VariableInfo(a_index=61, a_type="double"),
-                                                    a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                    a_buffer_delay_s=a_variables_read_delay)
-
-        self.current_enabled = BufferedVariable(a_variable_info=VariableInfo(a_index=69, a_bit_index=0, a_type="bit"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.dc_enabled = BufferedVariable(a_variable_info=VariableInfo(a_index=69, a_bit_index=1, a_type="bit"),
-                                           a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                           a_buffer_delay_s=a_variables_read_delay)
-
-        self.reverse = BufferedVariable(a_variable_info=VariableInfo(a_index=69, a_bit_index=2, a_type="bit"),
-                                        a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                        a_buffer_delay_s=a_variables_read_delay)
-
-        self.release_firmware = BufferedVariable(a_variable_info=VariableInfo(a_index=69, a_bit_index=5, a_type="bit"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                 a_buffer_delay_s=a_variables_read_delay)
+        for problem in self.check_variables_table(self.__variables_info):
+            logging.warning(problem)
 
-        self.has_correction = BufferedVariable(a_variable_info=VariableInfo(a_index=69, a_bit_index=6, a_type="bit"),
-                                               a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                               a_buffer_delay_s=a_variables_read_delay)
+        self.__decoder = VariablesDecoder(self.__variables_info)
+        # Буфер под всю область mxdata, создается при первом вызове read_snapshot
+        self.__snapshot_buffer = None
+        # Ключ - номер переменной
+        self.__notifier = ChangeNotifier()
 
-        self.pid_ac_voltage_k = BufferedVariable(a_variable_info=VariableInfo(a_index=71, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
+    def make_buffered_variable(self, a_variable_info: VariableInfo,
+                               a_mode: BufferedVariable.Mode = BufferedVariable.Mode.RW) -> BufferedVariable:
+        """
+        Создает BufferedVariable для этого калибратора с задержкой чтения, переданной в конструктор
+        """
+        return BufferedVariable(a_variable_info=a_variable_info, a_calibrator=self.__calibrator, a_mode=a_mode,
+                                a_buffer_delay_s=self.__variables_read_delay)
 
-        self.pid_ac_voltage_ki = BufferedVariable(a_variable_info=VariableInfo(a_index=79, a_type="double"),
-                                                  a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                  a_buffer_delay_s=a_variables_read_delay)
+    @classmethod
+    def get_variables_table(cls) -> List[BufferedVariableField]:
+        """
+        Возвращает описания всех переменных, объявленных в классе через BufferedVariableField
+        """
+        return [field for field in vars(cls).values() if isinstance(field, BufferedVariableField)]
 
-        self.pid_ac_voltage_kd = BufferedVariable(a_variable_info=VariableInfo(a_index=87, a_type="double"),
-                                                  a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.iso_ac_voltage_k = BufferedVariable(a_variable_info=VariableInfo(a_index=95, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.iso_ac_voltage_t = BufferedVariable(a_variable_info=VariableInfo(a_index=103, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.acv_rate_slope = BufferedVariable(a_variable_info=VariableInfo(a_index=111, a_type="double"),
-                                               a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                               a_buffer_delay_s=a_variables_read_delay)
-
-        self.pid_ac_current_k = BufferedVariable(a_variable_info=VariableInfo(a_index=119, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.pid_ac_current_ki = BufferedVariable(a_variable_info=VariableInfo(a_index=127, a_type="double"),
-                                                  a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.pid_ac_current_kd = BufferedVariable(a_variable_info=VariableInfo(a_index=135, a_type="double"),
-                                                  a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.iso_ac_current_k = BufferedVariable(a_variable_info=VariableInfo(a_index=143, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.iso_ac_current_t = BufferedVariable(a_variable_info=VariableInfo(a_index=151, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.aci_rate_slope = BufferedVariable(a_variable_info=VariableInfo(a_index=159, a_type="double"),
-                                               a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                               a_buffer_delay_s=a_variables_read_delay)
-
-        self.aci_preset_voltage_rate_slope = BufferedVariable(a_variable_info=VariableInfo(a_index=167,
-                                                                                           a_type="double"),
-                                                              a_calibrator=self.__calibrator,
-                                                              a_mode=BufferedVariable.Mode.RW,
-                                                              a_buffer_delay_s=a_variables_read_delay)
-
-        self.dead_band = BufferedVariable(a_variable_info=VariableInfo(a_index=183, a_type="double"),
-                                          a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.f_correct_off = BufferedVariable(a_variable_info=VariableInfo(a_index=199, a_bit_index=0, a_type="bit"),
-                                              a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                              a_buffer_delay_s=a_variables_read_delay)
-
-        self.ui_correct_off = BufferedVariable(a_variable_info=VariableInfo(a_index=199, a_bit_index=1, a_type="bit"),
-                                               a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                               a_buffer_delay_s=a_variables_read_delay)
-
-        self.error_occurred = BufferedVariable(a_variable_info=VariableInfo(a_index=199, a_bit_index=3, a_type="bit"),
-                                               a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                               a_buffer_delay_s=a_variables_read_delay)
-
-        self.use_eeprom_instead_of_sd_for_correct = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=199, a_bit_index=6, a_type="bit"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.clear_error_occurred_status = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=199, a_bit_index=4, a_type="bit"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.error_code = BufferedVariable(a_variable_info=VariableInfo(a_index=200, a_type="i32"),
-                                           a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                           a_buffer_delay_s=a_variables_read_delay)
-
-        self.error_index = BufferedVariable(a_variable_info=VariableInfo(a_index=204, a_type="u32"),
-                                            a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                            a_buffer_delay_s=a_variables_read_delay)
-
-        self.error_count = BufferedVariable(a_variable_info=VariableInfo(a_index=208, a_type="u32"),
-                                            a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                            a_buffer_delay_s=a_variables_read_delay)
-
-        self.source_manual_mode_password = BufferedVariable(a_variable_info=VariableInfo(a_index=216, a_type="u32"),
-                                                            a_calibrator=self.__calibrator,
-                                                            a_mode=BufferedVariable.Mode.RW,
-                                                            a_buffer_delay_s=a_variables_read_delay)
-
-        self.source_ready = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=220, a_bit_index=0, a_type="bit"), a_calibrator=self.__calibrator,
-            a_mode=BufferedVariable.Mode.R, a_buffer_delay_s=a_variables_read_delay)
-
-        self.fast_adc_slow = BufferedVariable(a_variable_info=VariableInfo(a_index=229, a_type="double"),
-                                              a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                              a_buffer_delay_s=a_variables_read_delay)
-
-        self.frequency = BufferedVariable(a_variable_info=VariableInfo(a_index=293, a_type="double"),
-                                          a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.aux_stabilizer_4v_dac_code_float = BufferedVariable(a_variable_info=VariableInfo(a_index=374,
-                                                                                              a_type="float"),
-                                                                 a_calibrator=self.__calibrator,
-                                                                 a_mode=BufferedVariable.Mode.RW,
-                                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.aux_stabilizer_45v_dac_code_float = BufferedVariable(a_variable_info=VariableInfo(a_index=378,
-                                                                                               a_type="float"),
-                                                                  a_calibrator=self.__calibrator,
-                                                                  a_mode=BufferedVariable.Mode.RW,
-                                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.aux_stabilizer_600v_dac_code_float = BufferedVariable(a_variable_info=VariableInfo(a_index=382,
-                                                                                                a_type="float"),
-                                                                   a_calibrator=self.__calibrator,
-                                                                   a_mode=BufferedVariable.Mode.RW,
-                                                                   a_buffer_delay_s=a_variables_read_delay)
-
-        self.relay_200_600 = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=406, a_bit_index=0, a_type="bit"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.relay_aux_stabilizer_600v = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=406, a_bit_index=1, a_type="bit"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.relay_aux_stabilizer_4v = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=406, a_bit_index=4, a_type="bit"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.final_stabilizer_dac_dc_level = BufferedVariable(a_variable_info=VariableInfo(a_index=416,
-                                                                                           a_type="double"),
-                                                              a_calibrator=self.__calibrator,
-                                                              a_mode=BufferedVariable.Mode.R,
-                                                              a_buffer_delay_s=a_variables_read_delay)
-
-        self.aux_stabilizer_adc_dc_600v_voltage = BufferedVariable(a_variable_info=VariableInfo(a_index=428,
-                                                                                                a_type="double"),
-                                                                   a_calibrator=self.__calibrator,
-                                                                   a_mode=BufferedVariable.Mode.R,
-                                                                   a_buffer_delay_s=a_variables_read_delay)
-
-        self.aux_stabilizer_adc_dc_40v_voltage = BufferedVariable(a_variable_info=VariableInfo(a_index=448,
-                                                                                               a_type="double"),
-                                                                  a_calibrator=self.__calibrator,
-                                                                  a_mode=BufferedVariable.Mode.R,
-                                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.aux_stabilizer_adc_dc_4v_voltage = BufferedVariable(a_variable_info=VariableInfo(a_index=468,
-                                                                                              a_type="double"),
-                                                                 a_calibrator=self.__calibrator,
-                                                                 a_mode=BufferedVariable.Mode.R,
-                                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.inner_stabilizer_12v_voltage = BufferedVariable(a_variable_info=VariableInfo(a_index=512, a_type="double"),
-                                                             a_calibrator=self.__calibrator,
-                                                             a_mode=BufferedVariable.Mode.R,
-                                                             a_buffer_delay_s=a_variables_read_delay)
-
-        self.inner_stabilizer_9v_voltage = BufferedVariable(a_variable_info=VariableInfo(a_index=520, a_type="double"),
-                                                            a_calibrator=self.__calibrator,
-                                                            a_mode=BufferedVariable.Mode.R,
-                                                            a_buffer_delay_s=a_variables_read_delay)
-
-        self.inner_stabilizer_5v_voltage = BufferedVariable(a_variable_info=VariableInfo(a_index=528, a_type="double"),
-                                                            a_calibrator=self.__calibrator,
-                                                            a_mode=BufferedVariable.Mode.R,
-                                                            a_buffer_delay_s=a_variables_read_delay)
-
-        self.inner_stabilizer_2_5v_pos_voltage = BufferedVariable(a_variable_info=VariableInfo(a_index=536,
-                                                                                               a_type="double"),
-                                                                  a_calibrator=self.__calibrator,
-                                                                  a_mode=BufferedVariable.Mode.R,
-                                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.inner_stabilizer_2_5v_neg_voltage = BufferedVariable(a_variable_info=VariableInfo(a_index=544,
-                                                                                               a_type="double"),
-                                                                  a_calibrator=self.__calibrator,
-                                                                  a_mode=BufferedVariable.Mode.R,
-                                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.cooling_power_supply_voltage = BufferedVariable(a_variable_info=VariableInfo(a_index=552, a_type="double"),
-                                                             a_calibrator=self.__calibrator,
-                                                             a_mode=BufferedVariable.Mode.R,
-                                                             a_buffer_delay_s=a_variables_read_delay)
-
-        self.analog_board_temperature_max = BufferedVariable(a_variable_info=VariableInfo(a_index=560, a_type="double"),
-                                                             a_calibrator=self.__calibrator,
-                                                             a_mode=BufferedVariable.Mode.RW,
-                                                             a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_temperature_max = BufferedVariable(a_variable_info=VariableInfo(a_index=576, a_type="double"),
-                                                           a_calibrator=self.__calibrator,
-                                                           a_mode=BufferedVariable.Mode.RW,
-                                                           a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_fun_temperature_setpoint = BufferedVariable(a_variable_info=VariableInfo(a_index=584,
-                                                                                                 a_type="double"),
-                                                                    a_calibrator=self.__calibrator,
-                                                                    a_mode=BufferedVariable.Mode.RW,
-                                                                    a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_temperature = BufferedVariable(a_variable_info=VariableInfo(a_index=592, a_type="double"),
-                                                       a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                       a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_fun_pid_k = BufferedVariable(a_variable_info=VariableInfo(a_index=600, a_type="double"),
-                                                     a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                     a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_fun_pid_ki = BufferedVariable(a_variable_info=VariableInfo(a_index=608, a_type="double"),
-                                                      a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                      a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_fun_pid_kd = BufferedVariable(a_variable_info=VariableInfo(a_index=616, a_type="double"),
-                                                      a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                      a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_fun_iso_k = BufferedVariable(a_variable_info=VariableInfo(a_index=624, a_type="double"),
-                                                     a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                     a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_fun_iso_t = BufferedVariable(a_variable_info=VariableInfo(a_index=632, a_type="double"),
-                                                     a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                     a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_fun_rate_slope = BufferedVariable(a_variable_info=VariableInfo(a_index=640, a_type="double"),
-                                                          a_calibrator=self.__calibrator,
-                                                          a_mode=BufferedVariable.Mode.RW,
-                                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_fun_pid_out = BufferedVariable(a_variable_info=VariableInfo(a_index=648, a_type="double"),
-                                                       a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                       a_buffer_delay_s=a_variables_read_delay)
-
-        self.main_board_fun_speed = BufferedVariable(a_variable_info=VariableInfo(a_index=656, a_type="i32"),
-                                                     a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                     a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_temperature_max = BufferedVariable(a_variable_info=VariableInfo(a_index=660,
-                                                                                               a_type="double"),
-                                                                  a_calibrator=self.__calibrator,
-                                                                  a_mode=BufferedVariable.Mode.RW,
-                                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_fun_temperature_setpoint = BufferedVariable(a_variable_info=VariableInfo(a_index=668,
-                                                                                                        a_type="double"),
-                                                                           a_calibrator=self.__calibrator,
-                                                                           a_mode=BufferedVariable.Mode.RW,
-                                                                           a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_temperature = BufferedVariable(a_variable_info=VariableInfo(a_index=676,
-                                                                                           a_type="double"),
-                                                              a_calibrator=self.__calibrator,
-                                                              a_mode=BufferedVariable.Mode.R,
-                                                              a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_fun_pid_k = BufferedVariable(a_variable_info=VariableInfo(a_index=684, a_type="double"),
-                                                            a_calibrator=self.__calibrator,
-                                                            a_mode=BufferedVariable.Mode.RW,
-                                                            a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_fun_pid_ki = BufferedVariable(a_variable_info=VariableInfo(a_index=692, a_type="double"),
-                                                             a_calibrator=self.__calibrator,
-                                                             a_mode=BufferedVariable.Mode.RW,
-                                                             a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_fun_pid_kd = BufferedVariable(a_variable_info=VariableInfo(a_index=700, a_type="double"),
-                                                             a_calibrator=self.__calibrator,
-                                                             a_mode=BufferedVariable.Mode.RW,
-                                                             a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_fun_iso_k = BufferedVariable(a_variable_info=VariableInfo(a_index=708, a_type="double"),
-                                                            a_calibrator=self.__calibrator,
-                                                            a_mode=BufferedVariable.Mode.RW,
-                                                            a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_fun_iso_t = BufferedVariable(a_variable_info=VariableInfo(a_index=716, a_type="double"),
-                                                            a_calibrator=self.__calibrator,
-                                                            a_mode=BufferedVariable.Mode.RW,
-                                                            a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_fun_rate_slope = BufferedVariable(a_variable_info=VariableInfo(a_index=724,
-                                                                                              a_type="double"),
-                                                                 a_calibrator=self.__calibrator,
-                                                                 a_mode=BufferedVariable.Mode.RW,
-                                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_fun_pid_out = BufferedVariable(a_variable_info=VariableInfo(a_index=732,
-                                                                                           a_type="double"),
-                                                              a_calibrator=self.__calibrator,
-                                                              a_mode=BufferedVariable.Mode.R,
-                                                              a_buffer_delay_s=a_variables_read_delay)
-
-        self.transistor_dc_10a_fun_speed = BufferedVariable(a_variable_info=VariableInfo(a_index=740, a_type="i32"),
-                                                            a_calibrator=self.__calibrator,
-                                                            a_mode=BufferedVariable.Mode.R,
-                                                            a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_temperature_max = BufferedVariable(a_variable_info=VariableInfo(a_index=744, a_type="double"),
-                                                          a_calibrator=self.__calibrator,
-                                                          a_mode=BufferedVariable.Mode.RW,
-                                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_temperature_setpoint = BufferedVariable(a_variable_info=VariableInfo(a_index=752,
-                                                                                            a_type="double"),
-                                                               a_calibrator=self.__calibrator,
-                                                               a_mode=BufferedVariable.Mode.RW,
-                                                               a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_temperature = BufferedVariable(a_variable_info=VariableInfo(a_index=760, a_type="double"),
-                                                      a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                      a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_pid_k = BufferedVariable(a_variable_info=VariableInfo(a_index=768, a_type="double"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_pid_ki = BufferedVariable(a_variable_info=VariableInfo(a_index=776, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_pid_kd = BufferedVariable(a_variable_info=VariableInfo(a_index=784, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_iso_k = BufferedVariable(a_variable_info=VariableInfo(a_index=792, a_type="double"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_iso_t = BufferedVariable(a_variable_info=VariableInfo(a_index=800, a_type="double"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_rate_slope = BufferedVariable(a_variable_info=VariableInfo(a_index=808, a_type="double"),
-                                                     a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                     a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_polarity_pin = BufferedVariable(a_variable_info=VariableInfo(a_index=832, a_bit_index=2,
-                                                                                    a_type="bit"),
-                                                       a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                       a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_ready = BufferedVariable(a_variable_info=VariableInfo(a_index=832, a_bit_index=3, a_type="bit"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_invert_polarity = BufferedVariable(a_variable_info=VariableInfo(a_index=832, a_bit_index=4,
-                                                                                       a_type="bit"),
-                                                          a_calibrator=self.__calibrator,
-                                                          a_mode=BufferedVariable.Mode.RW,
-                                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_pid_out = BufferedVariable(a_variable_info=VariableInfo(a_index=816, a_type="double"),
-                                                  a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_1_amplitude_code_float = BufferedVariable(a_variable_info=VariableInfo(a_index=824,
-                                                                                            a_type="double"),
-                                                               a_calibrator=self.__calibrator,
-                                                               a_mode=BufferedVariable.Mode.R,
-                                                               a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_temperature_max = BufferedVariable(a_variable_info=VariableInfo(a_index=833, a_type="double"),
-                                                          a_calibrator=self.__calibrator,
-                                                          a_mode=BufferedVariable.Mode.RW,
-                                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_temperature_setpoint = BufferedVariable(a_variable_info=VariableInfo(a_index=841,
-                                                                                            a_type="double"),
-                                                               a_calibrator=self.__calibrator,
-                                                               a_mode=BufferedVariable.Mode.RW,
-                                                               a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_temperature = BufferedVariable(a_variable_info=VariableInfo(a_index=849, a_type="double"),
-                                                      a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                      a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_pid_k = BufferedVariable(a_variable_info=VariableInfo(a_index=857, a_type="double"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_pid_ki = BufferedVariable(a_variable_info=VariableInfo(a_index=865, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_pid_kd = BufferedVariable(a_variable_info=VariableInfo(a_index=873, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_iso_k = BufferedVariable(a_variable_info=VariableInfo(a_index=881, a_type="double"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_iso_t = BufferedVariable(a_variable_info=VariableInfo(a_index=889, a_type="double"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_rate_slope = BufferedVariable(a_variable_info=VariableInfo(a_index=897, a_type="double"),
-                                                     a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                     a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_polarity_pin = BufferedVariable(a_variable_info=VariableInfo(a_index=921, a_bit_index=2,
-                                                                                    a_type="bit"),
-                                                       a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                       a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_ready = BufferedVariable(a_variable_info=VariableInfo(a_index=921, a_bit_index=3, a_type="bit"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_invert_polarity = BufferedVariable(a_variable_info=VariableInfo(a_index=921, a_bit_index=4,
-                                                                                       a_type="bit"),
-                                                          a_calibrator=self.__calibrator,
-                                                          a_mode=BufferedVariable.Mode.RW,
-                                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_2_pid_out = BufferedVariable(a_variable_info=VariableInfo(a_index=905, a_type="double"),
-                                                  a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_temperature_max = BufferedVariable(a_variable_info=VariableInfo(a_index=922, a_type="double"),
-                                                          a_calibrator=self.__calibrator,
-                                                          a_mode=BufferedVariable.Mode.RW,
-                                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_temperature_setpoint = BufferedVariable(a_variable_info=VariableInfo(a_index=930,
-                                                                                            a_type="double"),
-                                                               a_calibrator=self.__calibrator,
-                                                               a_mode=BufferedVariable.Mode.RW,
-                                                               a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_temperature = BufferedVariable(a_variable_info=VariableInfo(a_index=938, a_type="double"),
-                                                      a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                      a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_pid_k = BufferedVariable(a_variable_info=VariableInfo(a_index=946, a_type="double"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_pid_ki = BufferedVariable(a_variable_info=VariableInfo(a_index=954, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_pid_kd = BufferedVariable(a_variable_info=VariableInfo(a_index=962, a_type="double"),
-                                                 a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                 a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_iso_k = BufferedVariable(a_variable_info=VariableInfo(a_index=970, a_type="double"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_iso_t = BufferedVariable(a_variable_info=VariableInfo(a_index=978, a_type="double"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_rate_slope = BufferedVariable(a_variable_info=VariableInfo(a_index=986, a_type="double"),
-                                                     a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                     a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_pid_out = BufferedVariable(a_variable_info=VariableInfo(a_index=994, a_type="double"),
-                                                  a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_polarity_pin = BufferedVariable(a_variable_info=VariableInfo(a_index=1010, a_bit_index=2,
-                                                                                    a_type="bit"),
-                                                       a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                       a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_ready = BufferedVariable(a_variable_info=VariableInfo(a_index=1010, a_bit_index=3, a_type="bit"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_3_invert_polarity = BufferedVariable(a_variable_info=VariableInfo(a_index=1010, a_bit_index=4,
-                                                                                       a_type="bit"),
-                                                          a_calibrator=self.__calibrator,
-                                                          a_mode=BufferedVariable.Mode.RW,
-                                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_temperature_max = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1011, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_temperature = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1019, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.volume = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1036, a_type="float"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.result_id = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1040, a_type="u32"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.f_calibr_coeff = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1064, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.time_calibr_coeff = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1088, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.id = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1098, a_type="u32"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.software_revision = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1108, a_type="u32"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_temperature_setpoint = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1130, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_pid_k = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1138, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_pid_ki = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1146, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_pid_kd = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1154, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_iso_k = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1162, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_iso_t = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1170, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_rate_slope = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1178, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_pid_out = BufferedVariable(a_variable_info=VariableInfo(a_index=1186, a_type="double"),
-                                                  a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                  a_buffer_delay_s=a_variables_read_delay)
-
-        self.peltier_4_polarity_pin = BufferedVariable(a_variable_info=VariableInfo(a_index=1202, a_bit_index=2,
-                                                                                    a_type="bit"),
-                                                       a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.R,
-                                                       a_buffer_delay_s=a_variables_read_delay)
+    @classmethod
+    def check_variables_table(cls, a_variables_info: Sequence[VariableInfo]) -> List[str]:
+        """
+        Сверяет таблицу переменных класса со списком переменных из ini-файла.
+        Переменная ищется в ini по имени (первому слову имени), а если не найдена, то по смещению
+        :param a_variables_info: Список VariableInfo из ini-файла
+        :return: Список описаний расхождений, пустой, если расхождений нет
+        """
+        by_name = {}
+        by_location = {}
+        for variable_info in a_variables_info:
+            if variable_info.name:
+                by_name.setdefault(variable_info.name.split()[0], variable_info)
+            bit_index = variable_info.bit_index if variable_info.type == "bit" else 0
+            by_location.setdefault((variable_info.index, bit_index), variable_info)
+
+        problems = []
+        for field in cls.get_variables_table():
+            location = f"{field.index}.{field.bit_index}" if field.type == "bit" else f"{field.index}"
+            variable_info = by_name.get(field.name)
+            if variable_info is not None:
+                ini_bit_index = variable_info.bit_index if variable_info.type == "bit" else 0
+                if (variable_info.index, ini_bit_index, variable_info.type) != \
+                        (field.index, field.bit_index, field.type):
+                    ini_location = f"{variable_info.index}.{ini_bit_index}" if variable_info.type == "bit" \
+                        else f"{variable_info.index}"
+                    problems.append(f"Сетевая переменная {field.name}: в таблице {location} ({field.type}), "
+                                    f"в ini-файле {ini_location} ({variable_info.type})")
+            else:
+                variable_info = by_location.get((field.index, field.bit_index))
+                if variable_info is None or variable_info.type != field.type:
+                    problems.append(f"Сетевая переменная {field.name} ({location}, {field.type}) "
+                                    f"не найдена в ini-файле")
+        return problems
 
-        self.peltier_4_ready = BufferedVariable(a_variable_info=VariableInfo(a_index=1202, a_bit_index=3, a_type="bit"),
-                                                a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-                                                a_buffer_delay_s=a_variables_read_delay)
+    @staticmethod
+    def get_variables_from_ini(a_ini_path: str) -> VariableTable:
+        """
+        Парсит ini-файл с информацией о сетевых переменных и возвращает таблицу переменных.
+        Результат кэшируется по пути, времени изменения и размеру файла, поэтому повторное открытие того же
+        файла не парсит его заново. Таблица общая для всех, кто получил ее из кэша, ее нельзя изменять
+        :param a_ini_path: Путь к ini-файлу
+        :return: VariableTable, содержащая информацию о сетевых переменных
+        """
+        ini_stat = os.stat(a_ini_path)
+        return NetworkVariables.__parse_variables_ini(os.path.abspath(a_ini_path), ini_stat.st_mtime_ns,
+                                                      ini_stat.st_size)
 
-        self.peltier_4_invert_polarity = BufferedVariable(a_variable_info=VariableInfo(a_index=1202, a_bit_index=4,
-                                                                                       a_type="bit"),
-                                                          a_calibrator=self.__calibrator,
-                                                          a_mode=BufferedVariable.Mode.RW,
-                                                          a_buffer_delay_s=a_variables_read_delay)
-
-        self.fun_max_level_for_low_dcv = BufferedVariable(a_variable_info=VariableInfo(
-            a_index=1237, a_type="double"), a_calibrator=self.__calibrator, a_mode=BufferedVariable.Mode.RW,
-            a_buffer_delay_s=a_variables_read_delay)
+    @staticmethod
+    def clear_variables_ini_cache():
+        NetworkVariables.__parse_variables_ini.cache_clear()
 
     @staticmethod
-    def get_variables_from_ini(a_ini_path: str) -> List[VariableInfo]:
+    @functools.lru_cache(maxsize=16)
+    def __parse_variables_ini(a_ini_path: str, a_mtime_ns: int, a_size: int) -> VariableTable:
         """
-        Парсит ini-файл с информацией о сетевых переменных и возвращает список VariableInfo
-        :param a_ini_path: Путь к ini-файлу
-        :return: Список VariableInfo, содержащий информацию о сетевых переменных
+        a_mtime_ns и a_size не используются при парсинге, они нужны только как часть ключа кэша
         """
-        variables_info = []
-        with open(a_ini_path) as config:
+        names = []
+        types = []
+        # Переменные описаны только в секции [vars], остальные секции пропускаются без разбора
+        in_vars_section = True
+        with open(a_ini_path, encoding="cp1251") as config:
             for line in config:
+                if line.startswith('['):
+                    in_vars_section = line.strip().lower() == "[vars]"
+                    continue
+                if not in_vars_section or not line.startswith(("Name_", "Type_")):
+                    continue
+
                 variable_re = NetworkVariables.VARIABLE_RE.match(line)
                 if variable_re is not None:
                     number = int(variable_re.group('number'))
                     value = variable_re.group('value')
 
-                    if number >= len(variables_info):
-                        assert (number - len(variables_info)) < 1, f"Переменные в конфиге расположены не по порядку"
-                        variables_info.append(VariableInfo(a_number=number))
+                    if number >= len(names):
+                        assert (number - len(names)) < 1, f"Переменные в конфиге расположены не по порядку"
+                        names.append("")
+                        types.append("u32")
 
                     if variable_re.group('parameter') == "Name":
-                        variables_info[number].name = value
+                        names[number] = value
                     else:
-                        variables_info[number].type = value
-
-                        if number != 0:
-                            current_var = variables_info[number]
-                            prev_var = variables_info[number - 1]
-
-                            if current_var.type == "bit":
-                                if prev_var.type == "bit":
-                                    if prev_var.bit_index == 7:
-                                        current_var.index = prev_var.index + 1
-                                        current_var.bit_index = 0
-                                    else:
-                                        current_var.index = prev_var.index
-                                        current_var.bit_index = prev_var.bit_index + 1
-                                else:
-                                    current_var.index = prev_var.index + prev_var.size
-                            else:
-                                current_var.index = prev_var.index + prev_var.size
-        return variables_info
-
-    def get_variables_info(self) -> List[VariableInfo]:
-        """
-        Возвращает список VariableInfo с информацией о сетевых переменных
+                        types[number] = value
+
+        variables_table = VariableTable()
+        index = 0
+        bit_index = 0
+        prev_type = ""
+        prev_size = 0
+        for name, type_name in zip(names, types):
+            if type_name == "bit" and prev_type == "bit":
+                if bit_index == 7:
+                    index += 1
+                    bit_index = 0
+                else:
+                    bit_index += 1
+            else:
+                index += prev_size
+                bit_index = 0
+
+            variables_table.append(index, bit_index, type_name, name)
+            prev_type = type_name
+            prev_size = variables_table.sizes[-1]
+        return variables_table
+
+    def get_variables_info(self) -> VariableTable:
+        """
+        Возвращает таблицу сетевых переменных, элементы которой - VariableInfo
         """
         return self.__variables_info
 
+    def get_decoder(self) -> VariablesDecoder:
+        """
+        Возвращает план декодирования области сетевых переменных
+        """
+        return self.__decoder
+
     def get_data_size(self) -> int:
         """
         Возвращает размер памяти, который занимают сетевые переменные
         """
-        return self.__variables_info[-1].index + self.__variables_info[-1].size
+        return self.__variables_info.indexes[-1] + self.__variables_info.sizes[-1]
 
     def connected(self) -> bool:
         """
@@ -802,12 +649,99 @@ class NetworkVariables:
         :param a_variable_number: Номер сетевой переменной
         :return: Значение сетевой переменной
         """
-        variable_info = self.__variables_info[a_variable_number]
-        if variable_info.c_type == 'o':
-            return self.__calibrator.read_bit(variable_info.index, variable_info.bit_index)
+        table = self.__variables_info
+        variable_struct = VariableTable.TYPE_STRUCTS[table.type_codes[a_variable_number]]
+        if variable_struct is None:
+            return self.__calibrator.read_bit(table.indexes[a_variable_number], table.bit_indexes[a_variable_number])
         else:
-            _bytes = self.__calibrator.read_raw_bytes(variable_info.index, variable_info.size)
-            return struct.unpack(variable_info.c_type, _bytes)[0]
+            _bytes = self.__calibrator.read_raw_bytes(table.indexes[a_variable_number], table.sizes[a_variable_number])
+            return variable_struct.unpack(_bytes)[0]
+
+    def read_snapshot(self) -> list:
+        """
+        Читает всю область сетевых переменных за одно обращение к драйверу и декодирует из нее значения
+        всех переменных. Все значения относятся к одному и тому же моменту времени
+        :return: Список значений сетевых переменных, индекс в списке соответствует номеру переменной
+        """
+        data_size = self.get_data_size()
+        if self.__snapshot_buffer is None or len(self.__snapshot_buffer) != data_size:
+            self.__snapshot_buffer = (ctypes.c_ubyte * data_size)()
+
+        self.__calibrator.read_raw_bytes_into(self.__snapshot_buffer, 0, data_size)
+        return self.__decoder.decode(self.__snapshot_buffer)
+
+    def get_variable_number(self, a_name: Union[str, int]) -> int:
+        """
+        Возвращает номер переменной в ini-файле.
+        :param a_name: Номер переменной, полное имя или первое слово имени из ini-файла,
+        либо имя атрибута из таблицы переменных класса (ищется в ini-файле по смещению)
+        """
+        if isinstance(a_name, int):
+            assert 0 <= a_name < len(self.__variables_info), f"Нет переменной с номером {a_name}"
+            return a_name
+
+        try:
+            return self.__variables_info.get_number(a_name)
+        except KeyError:
+            pass
+
+        for number, name in enumerate(self.__variables_info.names):
+            if name and name.split()[0] == a_name:
+                return number
+
+        field = vars(type(self)).get(a_name)
+        if isinstance(field, BufferedVariableField):
+            table = self.__variables_info
+            for number in range(len(table)):
+                if table.indexes[number] == field.index and table.type_codes[number] == \
+                        VariableTable.TYPE_CODES[field.type] and \
+                        (field.type != "bit" or table.bit_indexes[number] == field.bit_index):
+                    return number
+
+        raise KeyError(f"Сетевая переменная '{a_name}' не найдена")
+
+    def subscribe(self, a_name: Union[str, int], a_callback: Callable, a_deadband: float = 0):
+        """
+        Подписывает a_callback на изменение сетевой переменной. Переменные проверяются в notify_changes
+        :param a_name: Имя или номер переменной, см. get_variable_number
+        :param a_callback: Обработчик, вызывается с новым значением переменной
+        :param a_deadband: Зона нечувствительности (см. ChangeNotifier.subscribe)
+        """
+        self.__notifier.subscribe(self.get_variable_number(a_name), a_callback, a_deadband)
+
+    def unsubscribe(self, a_name: Union[str, int], a_callback: Callable):
+        self.__notifier.unsubscribe(self.get_variable_number(a_name), a_callback)
+
+    def notify_changes(self, a_values: Sequence = None):
+        """
+        Сравнивает значения переменных, на которые есть подписки, с предыдущими и вызывает обработчики изменившихся
+        :param a_values: Значения всех переменных (например, Snapshot.values из AcquisitionService).
+        Если не передан, значения читаются через read_snapshot, если есть подписки и калибратор подключен
+        """
+        numbers = self.__notifier.keys()
+        if not numbers:
+            return
+
+        if a_values is None:
+            if not self.connected():
+                return
+            a_values = self.read_snapshot()
+        elif not a_values:
+            # Снимок, прочитанный без подключения
+            return
+
+        for number in numbers:
+            self.__notifier.update(number, a_values[number])
+
+    def batch(self):
+        """
+        Контекстный менеджер для пакетной записи сетевых переменных, см. ClbDrv.batch:
+            with netvars.batch():
+                netvars.pid_ac_voltage_k.set(1)
+                netvars.pid_ac_voltage_ki.set(2)
+        Записи write_variable и BufferedVariable.set внутри блока отправляются в драйвер при выходе из него
+        """
+        return self.__calibrator.batch()
 
     def write_variable(self, a_variable_number: int, a_variable_value):
         """
@@ -815,76 +749,112 @@ class NetworkVariables:
         :param a_variable_number: Номер сетевой переменной
         :param a_variable_value: Значение, которое необходимо записать
         """
-        variable_info = self.__variables_info[a_variable_number]
-        if variable_info.c_type == 'o':
+        table = self.__variables_info
+        variable_struct = VariableTable.TYPE_STRUCTS[table.type_codes[a_variable_number]]
+        if variable_struct is None:
             value = int(utils.bound(a_variable_value, 0, 1))
-            self.__calibrator.write_bit(variable_info.index, variable_info.bit_index, value)
+            self.__calibrator.write_bit(table.indexes[a_variable_number], table.bit_indexes[a_variable_number], value)
         else:
-            if variable_info.c_type != 'd' and variable_info.c_type != 'f':
+            if variable_struct.format != 'd' and variable_struct.format != 'f':
                 a_variable_value = int(a_variable_value)
 
-            _bytes = struct.pack(variable_info.c_type, a_variable_value)
-            self.__calibrator.write_raw_bytes(variable_info.index, variable_info.size, _bytes)
+            _bytes = variable_struct.pack(a_variable_value)
+            self.__calibrator.write_raw_bytes(table.indexes[a_variable_number], table.sizes[a_variable_number],
+                                              _bytes)
 
 
-class BufferedVariable:
+# memoryview.toreadonly() есть только с python 3.8, поэтому представление только для чтения на память драйвера
+# создается напрямую через C API. Писать через такое представление нельзя, а доступного на запись объекта на
+# ту же память не создается
+_PyBUF_READ = 0x100
+_memoryview_from_memory = ctypes.PYFUNCTYPE(ctypes.py_object, ctypes.c_void_p, ctypes.c_ssize_t, ctypes.c_int)(
+    ("PyMemoryView_FromMemory", ctypes.pythonapi))
+
+
+class MxDataView:
     """
-    Класс для буферизации значений сетевых переменных. Нужен, когда необходимо, чтобы чтение сетевой переменной
-    сразу после ее записи возвращала только что записанное значение.
-    (Если читать просто сетевую переменную, то чтение вернет старое значение, т.к. mxdata обновляется не мгновенно)
+    Чтение сетевых переменных напрямую из mxdata драйвера (по адресу ClbDrv.get_mxdata_address()), без вызовов
+    ctypes и без копирования.
+    Представление привязано к соединению, в котором оно было создано: после ClbDrv.connect() и после перехода
+    калибратора в состояние DISCONNECTED или из него (см. ClbDrv.connection_number) оно становится
+    недействительным, и любое чтение бросает RuntimeError. Чтобы продолжить работу, нужно вызвать rebind()
     """
-    class Mode(IntEnum):
-        R = 0
-        RW = 1
-
-    def __init__(self, a_variable_info: VariableInfo, a_calibrator: ClbDrv, a_mode: Mode = Mode.RW,
-                 a_buffer_delay_s: float = 1):
+    def __init__(self, a_calibrator: ClbDrv, a_variables_info: Sequence[VariableInfo], a_data_size: int):
         """
-        :param a_variable_info: Информация о сетевой переменной
         :param a_calibrator: Драйвер калибратора
-        :param a_mode: Режим доступа (R / RW). Если переменная в режиме R, то запись в нее бросает PermissionError
-        :param a_buffer_delay_s: Время в секундах, в течение которого значение переменной должно читаться из буфера
+        :param a_variables_info: Список VariableInfo, номер переменной должен совпадать с индексом в списке
+        :param a_data_size: Размер mxdata, с которым был инициализирован драйвер (UsbDrv.get_data_size())
         """
-        assert a_variable_info.c_type != "", "variable must have a c_type"
-        assert a_variable_info.type != "", "variable must have a type"
-        assert a_variable_info.size != 0, "variable must have a non-zero size"
+        variables_size = max((v.index + v.size for v in a_variables_info), default=0)
+        if variables_size > a_data_size:
+            raise ValueError(f"Сетевые переменные занимают {variables_size} байт, "
+                             f"а размер mxdata драйвера {a_data_size} байт")
 
-        self.__variable_info = a_variable_info
-        self.__is_bit = True if a_variable_info.c_type == 'o' else False
-        self.__mode = a_mode
         self.__calibrator = a_calibrator
+        self.__data_size = a_data_size
+        self.__decoder = VariablesDecoder(a_variables_info)
+        # Для каждой переменной (struct.Struct типа или None для битовой переменной, смещение, номер бита),
+        # чтобы read_variable не обращался к VariableInfo
+        self.__readers = [(VariableTable.TYPE_STRUCTS[VariableTable.TYPE_CODES[v.type]], v.index, v.bit_index)
+                          for v in a_variables_info]
 
-        self.__buffer = 0
-        self._buffer_delay = a_buffer_delay_s
-        self.__delay_timer = utils.Timer(self._buffer_delay)
+        self.__view = None
+        self.__connection_number = -1
 
-    def get(self):
-        if self.__calibrator.state == clb.State.DISCONNECTED:
-            return 0
+        self.rebind()
 
-        if self.__delay_timer.check() or not self.__delay_timer.started():
-            if self.__is_bit:
-                return self.__calibrator.read_bit(self.__variable_info.index, self.__variable_info.bit_index)
-            else:
-                _bytes = self.__calibrator.read_raw_bytes(self.__variable_info.index, self.__variable_info.size)
-                return struct.unpack(self.__variable_info.c_type, _bytes)[0]
-        else:
-            return self.__buffer
+    def rebind(self) -> bool:
+        """
+        Заново получает адрес mxdata у драйвера
+        :return: True, если представление действительно
+        """
+        self.__view = None
+        self.__connection_number = self.__calibrator.connection_number
 
-    def set(self, a_value):
-        if self.__mode == BufferedVariable.Mode.R:
-            raise PermissionError(f"Попытка записи в read-only переменную "
-                                  f"(Индекс: {self.__variable_info.index}.{self.__variable_info.bit_index})")
+        address = self.__calibrator.get_mxdata_address()
+        if address:
+            self.__view = _memoryview_from_memory(address, self.__data_size, _PyBUF_READ)
+        return self.__view is not None
 
-        if self.__is_bit:
-            a_value = utils.bound(int(a_value), 0, 1)
-            self.__calibrator.write_bit(self.__variable_info.index, self.__variable_info.bit_index, a_value)
+    def is_valid(self) -> bool:
+        return self.__view is not None and self.__connection_number == self.__calibrator.connection_number
+
+    def __checked_view(self) -> memoryview:
+        if not self.is_valid():
+            raise RuntimeError("Представление mxdata недействительно, необходимо вызвать rebind()")
+        return self.__view
+
+    @property
+    def view(self) -> memoryview:
+        """
+        memoryview только для чтения на всю область mxdata
+        """
+        return self.__checked_view()
+
+    def read(self, a_variable_info: VariableInfo):
+        """
+        Читает значение сетевой переменной, описанной a_variable_info
+        """
+        view = self.__checked_view()
+        if a_variable_info.c_type == 'o':
+            return (view[a_variable_info.index] >> a_variable_info.bit_index) & 1
         else:
-            if self.__variable_info.c_type != 'd' and self.__variable_info.c_type != 'f':
-                a_value = int(a_value)
+            return struct.unpack_from(a_variable_info.c_type, view, a_variable_info.index)[0]
 
-            _bytes = struct.pack(self.__variable_info.c_type, a_value)
-            self.__calibrator.write_raw_bytes(self.__variable_info.index, self.__variable_info.size, _bytes)
+    def read_variable(self, a_variable_number: int):
+        """
+        Читает значение сетевой переменной по номеру
+        """
+        view = self.__checked_view()
+        variable_struct, index, bit_index = self.__readers[a_variable_number]
+        if variable_struct is None:
+            return (view[index] >> bit_index) & 1
+        else:
+            return variable_struct.unpack_from(view, index)[0]
 
-        self.__buffer = a_value
-        self.__delay_timer.start()
+    def read_snapshot(self) -> list:
+        """
+        Декодирует значения всех сетевых переменных
+        :return: Список значений сетевых переменных, индекс в списке соответствует номеру переменной
+        """
+        return self.__decoder.decode(self.__checked_view())
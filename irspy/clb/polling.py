@@ -0,0 +1,139 @@
+from typing import Dict, Hashable, Sequence, Tuple
+import struct
+import time
+
+from irspy.clb.clb_dll import ClbDrv, merge_ranges
+from irspy.clb.network_variables import VariableInfo
+
+
+class PollingScheduler:
+    """
+    Опрашивает сетевые переменные с индивидуальным периодом.
+    Каждый потребитель подписывает нужные ему переменные со своим периодом, переменная опрашивается с наименьшим
+    периодом среди подписок, а переменные без подписок не опрашиваются совсем.
+    При каждом вызове poll() все переменные, которым пора обновиться, объединяются в непрерывные блоки
+    (соседние переменные с промежутком не больше a_max_gap байт читаются одним блоком), и каждый блок читается
+    одним обращением к драйверу
+    """
+    # Переменная считается готовой к опросу, если до ее срока осталось меньше этой доли периода.
+    # Нужно, чтобы переменная с периодом, равным периоду таймера, не пропускала каждый второй тик из-за дрожания
+    DUE_TOLERANCE = 0.1
+
+    def __init__(self, a_calibrator: ClbDrv, a_variables_info: Sequence[VariableInfo], a_max_gap: int = 16,
+                 a_max_bytes_per_poll: int = 0):
+        """
+        :param a_calibrator: Драйвер калибратора
+        :param a_variables_info: Список VariableInfo, номер переменной должен совпадать с индексом в списке
+        :param a_max_gap: Максимальный промежуток в байтах между переменными, при котором они читаются одним блоком
+        :param a_max_bytes_per_poll: Ограничение на количество байт, читаемых за один poll(). Если переменным,
+        которым пора обновиться, нужно больше, то переменные с большим периодом откладываются до следующего poll().
+        0 - без ограничения
+        """
+        self.__calibrator = a_calibrator
+        self.__variables_info = list(a_variables_info)
+        self.max_gap = a_max_gap
+        self.max_bytes_per_poll = a_max_bytes_per_poll
+
+        data_size = max((v.index + v.size for v in self.__variables_info), default=0)
+        self.__buffer = bytearray(data_size)
+        self.__structs = [None if v.c_type == 'o' else struct.Struct(v.c_type) for v in self.__variables_info]
+
+        # Номер переменной -> {Подписчик: период опроса}
+        self.__subscriptions: Dict[int, Dict[Hashable, float]] = {}
+        # Номер переменной -> (период опроса, время следующего опроса)
+        self.__schedule: Dict[int, Tuple[float, float]] = {}
+        self.__values = [0] * len(self.__variables_info)
+
+        self.reads_count = 0
+        self.bytes_count = 0
+
+    def subscribe(self, a_variable_number: int, a_period_s: float, a_subscriber: Hashable = None):
+        """
+        Подписывает переменную на опрос с периодом a_period_s. Повторная подписка того же подписчика меняет период
+        """
+        assert a_period_s > 0, "Период опроса должен быть больше 0"
+        self.__subscriptions.setdefault(a_variable_number, {})[a_subscriber] = a_period_s
+        self.__update_schedule(a_variable_number)
+
+    def unsubscribe(self, a_variable_number: int, a_subscriber: Hashable = None):
+        subscribers = self.__subscriptions.get(a_variable_number)
+        if subscribers is not None:
+            subscribers.pop(a_subscriber, None)
+            if not subscribers:
+                del self.__subscriptions[a_variable_number]
+        self.__update_schedule(a_variable_number)
+
+    def unsubscribe_all(self, a_subscriber: Hashable = None):
+        for variable_number in list(self.__subscriptions):
+            self.unsubscribe(variable_number, a_subscriber)
+
+    def is_subscribed(self, a_variable_number: int) -> bool:
+        return a_variable_number in self.__schedule
+
+    def __update_schedule(self, a_variable_number: int):
+        subscribers = self.__subscriptions.get(a_variable_number)
+        if not subscribers:
+            self.__schedule.pop(a_variable_number, None)
+            return
+
+        period_s = min(subscribers.values())
+        if a_variable_number in self.__schedule:
+            _, next_time = self.__schedule[a_variable_number]
+            self.__schedule[a_variable_number] = (period_s, next_time)
+        else:
+            # Новая подписка опрашивается при ближайшем poll()
+            self.__schedule[a_variable_number] = (period_s, 0)
+
+    def get_value(self, a_variable_number: int):
+        """
+        Возвращает последнее прочитанное значение переменной (0, если переменная еще не читалась)
+        """
+        return self.__values[a_variable_number]
+
+    def poll(self) -> Dict[int, object]:
+        """
+        Читает все переменные, которым пора обновиться
+        :return: Словарь {номер переменной: значение} с переменными, прочитанными в этом вызове
+        """
+        now = time.perf_counter()
+        due = [(period_s, number) for number, (period_s, next_time) in self.__schedule.items()
+               if next_time - now <= period_s * PollingScheduler.DUE_TOLERANCE]
+        if not due:
+            return {}
+
+        if self.max_bytes_per_poll:
+            due.sort()
+            budget = self.max_bytes_per_poll
+            selected = []
+            for period_s, number in due:
+                size = self.__variables_info[number].size
+                if size > budget and selected:
+                    break
+                budget -= size
+                selected.append((period_s, number))
+            due = selected
+
+        ranges = merge_ranges(((self.__variables_info[number].index, self.__variables_info[number].size)
+                               for _, number in due), self.max_gap)
+        self.__calibrator.read_ranges(ranges, self.__buffer)
+        self.reads_count += len(ranges)
+        self.bytes_count += sum(count for _, count in ranges)
+
+        result = {}
+        for period_s, number in due:
+            variable_info = self.__variables_info[number]
+            variable_struct = self.__structs[number]
+            if variable_struct is None:
+                value = (self.__buffer[variable_info.index] >> variable_info.bit_index) & 1
+            else:
+                value = variable_struct.unpack_from(self.__buffer, variable_info.index)[0]
+            self.__values[number] = value
+            result[number] = value
+
+            _, next_time = self.__schedule[number]
+            next_time += period_s
+            if next_time <= now:
+                # Опрос опоздал больше, чем на период, отсчет начинается заново
+                next_time = now + period_s
+            self.__schedule[number] = (period_s, next_time)
+        return result
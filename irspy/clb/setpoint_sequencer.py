@@ -0,0 +1,262 @@
+from typing import Callable, List, NamedTuple, Optional, Sequence
+from itertools import groupby
+from enum import IntEnum
+import time
+
+from irspy.clb.clb_dll import ClbDrv
+import irspy.clb.calibrator_constants as clb
+
+
+class Setpoint(NamedTuple):
+    signal_type: clb.SignalType
+    # Для постоянного сигнала знак задает полярность
+    amplitude: float
+    # Для постоянного сигнала не используется
+    frequency: float = 0
+
+
+class SetpointStep(NamedTuple):
+    """
+    Заранее рассчитанный переход к точке: какие параметры калибратора нужно поменять
+    """
+    setpoint: Setpoint
+    # Индекс точки в списке, переданном в SetpointSequencer
+    index: int
+    set_signal_type: bool
+    set_amplitude: bool
+    set_frequency: bool
+    # Переход меняет диапазон калибратора
+    range_changed: bool
+
+
+class StepResult(NamedTuple):
+    setpoint: Setpoint
+    index: int
+    # False, если сигнал не установился за время ожидания
+    ready: bool
+    # Время от начала перехода к точке до готовности сигнала (или до истечения времени ожидания)
+    settle_time_s: float
+    range_changed: bool
+
+
+def order_setpoints(a_setpoints: Sequence[Setpoint]) -> List[int]:
+    """
+    Упорядочивает точки так, чтобы калибратор как можно реже менял тип сигнала и диапазон: точки группируются
+    по типу сигнала (в порядке первого появления типа), внутри типа - по диапазону (по возрастанию), внутри
+    диапазона - по частоте, а амплитуда внутри каждой частоты идет попеременно по возрастанию и по убыванию,
+    чтобы соседние точки на стыке частот были близки
+    :return: Индексы точек a_setpoints в новом порядке
+    """
+    type_order = {}
+    for setpoint in a_setpoints:
+        type_order.setdefault(setpoint.signal_type, len(type_order))
+
+    range_order = {}
+    for signal_type, ranges in clb.SIGNAL_TYPE_RANGES.items():
+        for number, signal_range in enumerate(ranges):
+            range_order[signal_range] = number
+
+    def group_key(a_index: int):
+        setpoint = a_setpoints[a_index]
+        signal_range = clb.get_signal_range(setpoint.amplitude, setpoint.signal_type)
+        frequency = setpoint.frequency if clb.is_ac_signal[setpoint.signal_type] else 0
+        return type_order[setpoint.signal_type], range_order[signal_range], frequency
+
+    order = []
+    ascending = True
+    for _, group in groupby(sorted(range(len(a_setpoints)), key=group_key), key=group_key):
+        order.extend(sorted(group, key=lambda i: a_setpoints[i].amplitude, reverse=not ascending))
+        ascending = not ascending
+    return order
+
+
+class SetpointSequencer:
+    """
+    Проходит список точек (тип сигнала, амплитуда, частота) на калибраторе.
+    Точки упорядочиваются (см. order_setpoints), переходы между ними рассчитываются заранее: в калибратор
+    записываются только изменившиеся параметры, поэтому тип сигнала (сеттер которого ограничен одной записью
+    в секунду) записывается только при смене типа.
+    Работает как конечный автомат, который продвигает tick(), вызываемый по таймеру или в цикле (run).
+    Для каждой точки запоминается время установления сигнала, когда сигнал установился, вызывается
+    a_on_ready(StepResult) и через a_dwell_s начинается переход к следующей точке.
+    Сразу после записи параметров флаг готовности может быть еще от предыдущей точки, поэтому готовность
+    принимается, только если после записи флаг хотя бы раз был сброшен или прошло a_min_settle_s
+    """
+    class State(IntEnum):
+        IDLE = 0
+        SETTING_SIGNAL_TYPE = 1
+        SETTLING = 2
+        DWELL = 3
+        DONE = 4
+
+    def __init__(self, a_calibrator: ClbDrv, a_setpoints: Sequence[Setpoint], a_reorder: bool = True,
+                 a_settle_timeout_s: float = 30., a_dwell_s: float = 0., a_confirmations: int = 1,
+                 a_on_ready: Optional[Callable[[StepResult], None]] = None, a_min_settle_s: float = 0.5):
+        """
+        :param a_calibrator: Драйвер калибратора
+        :param a_setpoints: Точки
+        :param a_reorder: Упорядочить точки, иначе точки проходятся в переданном порядке
+        :param a_settle_timeout_s: Максимальное время установления сигнала в точке
+        :param a_dwell_s: Время в точке после установления сигнала (например, на измерение)
+        :param a_confirmations: Сколько вызовов tick подряд сигнал должен быть готов, больше 1 - если флаг
+        готовности дребезжит
+        :param a_on_ready: Вызывается, когда сигнал в точке установился или вышло время ожидания
+        :param a_min_settle_s: Время после записи параметров точки, раньше которого готовность принимается, только
+        если флаг готовности после записи был сброшен
+        """
+        assert a_confirmations >= 1, "Количество подтверждений должно быть не меньше 1"
+        self.__calibrator = a_calibrator
+        self.__setpoints = list(a_setpoints)
+        self.settle_timeout_s = a_settle_timeout_s
+        self.dwell_s = a_dwell_s
+        self.confirmations = a_confirmations
+        self.on_ready = a_on_ready
+        self.min_settle_s = a_min_settle_s
+
+        order = order_setpoints(self.__setpoints) if a_reorder else list(range(len(self.__setpoints)))
+        self.__steps = self.__make_steps(order)
+
+        self.__state = SetpointSequencer.State.IDLE
+        self.__step_number = 0
+        self.__step_start_time = 0.
+        self.__dwell_end_time = 0.
+        self.__ready_count = 0
+        self.__settling_start_time = 0.
+        self.__ready_dropped = False
+        self.results: List[StepResult] = []
+
+    def __make_steps(self, a_order: List[int]) -> List[SetpointStep]:
+        steps = []
+        previous: Optional[Setpoint] = None
+        previous_range = None
+        for index in a_order:
+            setpoint = self.__setpoints[index]
+            signal_range = clb.get_signal_range(setpoint.amplitude, setpoint.signal_type)
+            is_ac = clb.is_ac_signal[setpoint.signal_type]
+            if previous is None:
+                steps.append(SetpointStep(setpoint, index, True, True, is_ac, True))
+            else:
+                type_changed = previous.signal_type != setpoint.signal_type
+                steps.append(SetpointStep(
+                    setpoint, index,
+                    set_signal_type=type_changed,
+                    set_amplitude=type_changed or previous.amplitude != setpoint.amplitude,
+                    set_frequency=is_ac and (type_changed or previous.frequency != setpoint.frequency),
+                    range_changed=signal_range != previous_range))
+            previous, previous_range = setpoint, signal_range
+        return steps
+
+    @property
+    def steps(self) -> List[SetpointStep]:
+        return self.__steps
+
+    @property
+    def state(self) -> 'SetpointSequencer.State':
+        return self.__state
+
+    def current_step(self) -> Optional[SetpointStep]:
+        return self.__steps[self.__step_number] if self.__step_number < len(self.__steps) else None
+
+    def start(self):
+        self.results.clear()
+        self.__step_number = 0
+        self.__begin_step()
+
+    def stop(self):
+        self.__state = SetpointSequencer.State.DONE
+
+    def is_done(self) -> bool:
+        return self.__state == SetpointSequencer.State.DONE
+
+    def __begin_step(self):
+        step = self.current_step()
+        if step is None:
+            self.__state = SetpointSequencer.State.DONE
+            return
+
+        self.__step_start_time = time.perf_counter()
+        self.__ready_count = 0
+        if step.set_signal_type:
+            # Тип сигнала нельзя поменять при включенном сигнале
+            self.__calibrator.signal_enable = False
+            self.__state = SetpointSequencer.State.SETTING_SIGNAL_TYPE
+            self.__tick_setting_signal_type(step)
+        else:
+            self.__apply_parameters(step)
+
+    def __tick_setting_signal_type(self, a_step: SetpointStep):
+        self.__calibrator.signal_type_changed()
+        if self.__calibrator.signal_type == a_step.setpoint.signal_type:
+            self.__apply_parameters(a_step)
+        elif time.perf_counter() - self.__step_start_time > self.settle_timeout_s:
+            self.__finish_step(False)
+        else:
+            # Сеттер сам пропускает запись, если предыдущая была меньше секунды назад
+            self.__calibrator.signal_type = a_step.setpoint.signal_type
+
+    def __apply_parameters(self, a_step: SetpointStep):
+        setpoint = a_step.setpoint
+        if a_step.set_amplitude:
+            self.__calibrator.amplitude = clb.bound_amplitude(setpoint.amplitude, setpoint.signal_type)
+        if a_step.set_frequency:
+            self.__calibrator.frequency = setpoint.frequency
+        if a_step.set_signal_type or self.__step_number == 0:
+            self.__calibrator.signal_enable = True
+        self.__settling_start_time = time.perf_counter()
+        self.__ready_dropped = False
+        self.__state = SetpointSequencer.State.SETTLING
+
+    def __is_ready(self) -> bool:
+        """
+        :return: True, если сигнал готов и флаг готовности относится к текущей точке
+        """
+        if not self.__calibrator.is_signal_ready():
+            self.__ready_dropped = True
+            return False
+        return self.__ready_dropped or time.perf_counter() - self.__settling_start_time >= self.min_settle_s
+
+    def __finish_step(self, a_ready: bool):
+        step = self.current_step()
+        result = StepResult(setpoint=step.setpoint, index=step.index, ready=a_ready,
+                            settle_time_s=time.perf_counter() - self.__step_start_time,
+                            range_changed=step.range_changed)
+        self.results.append(result)
+        if self.on_ready is not None:
+            self.on_ready(result)
+
+        self.__dwell_end_time = time.perf_counter() + self.dwell_s
+        self.__state = SetpointSequencer.State.DWELL
+
+    def tick(self) -> 'SetpointSequencer.State':
+        state = self.__state
+        if state == SetpointSequencer.State.SETTING_SIGNAL_TYPE:
+            self.__tick_setting_signal_type(self.current_step())
+
+        elif state == SetpointSequencer.State.SETTLING:
+            self.__ready_count = self.__ready_count + 1 if self.__is_ready() else 0
+            if self.__ready_count >= self.confirmations:
+                self.__finish_step(True)
+            elif time.perf_counter() - self.__step_start_time > self.settle_timeout_s:
+                self.__finish_step(False)
+
+        elif state == SetpointSequencer.State.DWELL:
+            if time.perf_counter() >= self.__dwell_end_time:
+                self.__step_number += 1
+                self.__begin_step()
+
+        return self.__state
+
+    def run(self, a_tick_period_s: float = 0.01, a_tick: Optional[Callable[[], None]] = None) -> List[StepResult]:
+        """
+        Проходит все точки, блокируя вызывающий поток
+        :param a_tick_period_s: Период вызова tick
+        :param a_tick: Вызывается перед каждым tick, например UsbDrv.tick
+        :return: results
+        """
+        self.start()
+        while not self.is_done():
+            if a_tick is not None:
+                a_tick()
+            self.tick()
+            time.sleep(a_tick_period_s)
+        return self.results
@@ -0,0 +1,255 @@
+from typing import Sequence
+import random
+import ctypes
+import time
+
+from irspy.clb.network_variables import NetworkVariables
+import irspy.clb.calibrator_constants as clb
+from irspy.revisions import Revisions
+
+
+class SimulatedClbDll:
+    """
+    Программная модель драйвера калибратора (clb_dll) без оборудования. Повторяет интерфейс ctypes-библиотеки,
+    поэтому передается в UsbDrv и ClbDrv вместо clb_dll:
+        dll = SimulatedClbDll.from_ini(ini_path, a_latency_s=0.0005)
+        usb = UsbDrv(dll, dll.get_data_size())
+        calibrator = ClbDrv(dll)
+    или выбирается вместо clb_dll до ее загрузки: clb_dll.select_clb_dll(dll)
+    mxdata - массив байт в памяти, read_bytes/write_bytes/read_bit/write_bit работают с ним.
+    Каждое обращение к mxdata и usb_tick выполняется с задержкой a_latency_s + a_byte_time_s * количество байт
+    плюс случайная добавка до a_jitter_s, что позволяет мерить пропускную способность и задержки опроса.
+    Параметры сигнала хранятся как есть, сигнал считается установившимся через a_settle_time_s после включения
+    или последнего изменения параметров
+    """
+    # Значения UsbDrv.UsbState
+    USB_DISABLED = 1
+    USB_CONNECTED = 2
+
+    def __init__(self, a_data_size: int = 0, a_devices: Sequence[str] = ("N4-25 simulated",),
+                 a_latency_s: float = 0., a_jitter_s: float = 0., a_byte_time_s: float = 0.,
+                 a_settle_time_s: float = 1., a_seed=None):
+        """
+        :param a_data_size: Размер mxdata. Может быть увеличен при вызове usb_init
+        :param a_devices: Имена калибраторов, которые "подключены" к USB
+        :param a_latency_s: Задержка каждого обращения к mxdata и usb_tick
+        :param a_jitter_s: Максимальная случайная добавка к задержке
+        :param a_byte_time_s: Дополнительная задержка на каждый переданный байт
+        :param a_settle_time_s: Время установления сигнала
+        :param a_seed: Начальное значение генератора случайных чисел для a_jitter_s
+        """
+        assert a_latency_s >= 0 and a_jitter_s >= 0 and a_byte_time_s >= 0, "Задержки не могут быть отрицательными"
+        self.latency_s = a_latency_s
+        self.jitter_s = a_jitter_s
+        self.byte_time_s = a_byte_time_s
+        self.settle_time_s = a_settle_time_s
+        self.__random = random.Random(a_seed)
+
+        self.__mxdata = (ctypes.c_ubyte * a_data_size)()
+        self.__devices = list(a_devices)
+        self.__devices_changed = True
+        self.__connected_device = ""
+
+        self.__amplitude = 0.
+        self.__frequency = 0.
+        self.__signal_type = clb.SignalType.ACI
+        self.__polarity = clb.Polarity.POS
+        self.__mode = clb.Mode.SOURCE
+        self.__enabled = 0
+        self.__fast_control_mode = 0
+        self.__signal_change_time = time.perf_counter()
+
+        self.calls_count = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def from_ini(cls, a_ini_path: str, **a_kwargs) -> 'SimulatedClbDll':
+        """
+        Создает модель с размером mxdata, достаточным для всех переменных из tstlan-совместимого ini-файла
+        :param a_kwargs: Остальные параметры конструктора
+        """
+        variables_info = NetworkVariables.get_variables_from_ini(a_ini_path)
+        data_size = max((v.index + v.size for v in variables_info), default=0)
+        return cls(data_size, **a_kwargs)
+
+    def get_data_size(self) -> int:
+        return len(self.__mxdata)
+
+    @property
+    def mxdata(self) -> memoryview:
+        """
+        mxdata модели, для подготовки данных в тестах и бенчмарках
+        """
+        return memoryview(self.__mxdata).cast('B')
+
+    def reset_statistics(self):
+        self.calls_count = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def __delay(self, a_bytes_count: int = 0):
+        self.calls_count += 1
+        delay_s = self.latency_s + self.byte_time_s * a_bytes_count
+        if self.jitter_s:
+            delay_s += self.__random.uniform(0, self.jitter_s)
+        if delay_s <= 0:
+            return
+
+        deadline = time.perf_counter() + delay_s
+        # sleep на большинстве систем неточен на долях миллисекунды, поэтому остаток выжидается циклом
+        if delay_s > 0.002:
+            time.sleep(delay_s - 0.001)
+        while time.perf_counter() < deadline:
+            pass
+
+    def __check_range(self, a_start_index: int, a_bytes_count: int):
+        assert 0 <= a_start_index and a_start_index + a_bytes_count <= len(self.__mxdata), \
+            f"Обращение за пределы mxdata: {a_start_index}, {a_bytes_count} байт, размер {len(self.__mxdata)}"
+
+    def revision(self) -> int:
+        return Revisions.clb_dll
+
+    # USB
+
+    def usb_init(self, a_data_size: int):
+        if a_data_size > len(self.__mxdata):
+            mxdata = (ctypes.c_ubyte * a_data_size)()
+            ctypes.memmove(mxdata, self.__mxdata, len(self.__mxdata))
+            self.__mxdata = mxdata
+
+    def usb_tick(self):
+        self.__delay()
+
+    def usb_devices_changed(self) -> int:
+        changed = self.__devices_changed
+        self.__devices_changed = False
+        return int(changed)
+
+    def set_devices(self, a_devices: Sequence[str]):
+        """
+        Имитирует подключение и отключение калибраторов от USB
+        """
+        self.__devices = list(a_devices)
+        self.__devices_changed = True
+        if self.__connected_device not in self.__devices:
+            self.__connected_device = ""
+
+    def get_usb_devices(self, a_names):
+        """
+        :param a_names: ctypes.byref(ctypes.c_char_p()) или ctypes.pointer(ctypes.c_char_p())
+        """
+        names = getattr(a_names, "_obj", None)
+        if names is None:
+            names = a_names.contents
+        names.value = ";".join(self.__devices).encode("ascii")
+
+    def free_usb_devices(self, a_names):
+        names = getattr(a_names, "_obj", None)
+        if names is None:
+            names = a_names.contents
+        names.value = None
+
+    def connect_usb(self, a_name: bytes):
+        name = a_name.decode("ascii")
+        self.__connected_device = name if name in self.__devices else ""
+
+    def disconnect_usb(self):
+        self.__connected_device = ""
+        self.__enabled = 0
+
+    def is_connected(self) -> int:
+        return int(bool(self.__connected_device))
+
+    def get_usb_status(self) -> int:
+        return SimulatedClbDll.USB_CONNECTED if self.__connected_device else SimulatedClbDll.USB_DISABLED
+
+    def get_mxdata_address(self) -> int:
+        return ctypes.addressof(self.__mxdata) if self.__connected_device else 0
+
+    # mxdata
+
+    def read_bytes(self, a_buffer, a_start_index: int, a_bytes_count: int):
+        self.__check_range(a_start_index, a_bytes_count)
+        self.__delay(a_bytes_count)
+        ctypes.memmove(a_buffer, ctypes.addressof(self.__mxdata) + a_start_index, a_bytes_count)
+        self.bytes_read += a_bytes_count
+
+    def write_bytes(self, a_bytes, a_start_index: int, a_bytes_count: int):
+        self.__check_range(a_start_index, a_bytes_count)
+        self.__delay(a_bytes_count)
+        ctypes.memmove(ctypes.addressof(self.__mxdata) + a_start_index, a_bytes, a_bytes_count)
+        self.bytes_written += a_bytes_count
+
+    def read_bit(self, a_byte_index: int, a_bit_index: int) -> int:
+        self.__check_range(a_byte_index, 1)
+        self.__delay(1)
+        self.bytes_read += 1
+        return (self.__mxdata[a_byte_index] >> a_bit_index) & 1
+
+    def write_bit(self, a_byte_index: int, a_bit_index: int, a_value: int):
+        self.__check_range(a_byte_index, 1)
+        self.__delay(1)
+        self.bytes_written += 1
+        if a_value:
+            self.__mxdata[a_byte_index] |= 1 << a_bit_index
+        else:
+            self.__mxdata[a_byte_index] &= ~(1 << a_bit_index) & 0xFF
+
+    # Параметры сигнала
+
+    def __signal_changed(self):
+        self.__signal_change_time = time.perf_counter()
+
+    def set_amplitude(self, a_amplitude: float):
+        if self.__amplitude != a_amplitude:
+            self.__amplitude = a_amplitude
+            self.__signal_changed()
+
+    def get_amplitude(self) -> float:
+        return self.__amplitude
+
+    def set_frequency(self, a_frequency: float):
+        if self.__frequency != a_frequency:
+            self.__frequency = a_frequency
+            self.__signal_changed()
+
+    def get_frequency(self) -> float:
+        return self.__frequency
+
+    def set_signal_type(self, a_signal_type: int):
+        if self.__signal_type != a_signal_type:
+            self.__signal_type = a_signal_type
+            self.__signal_changed()
+
+    def get_signal_type(self) -> int:
+        return self.__signal_type
+
+    def set_polarity(self, a_polarity: int):
+        if self.__polarity != a_polarity:
+            self.__polarity = a_polarity
+            self.__signal_changed()
+
+    def get_polarity(self) -> int:
+        return self.__polarity
+
+    def set_mode(self, a_mode: int):
+        self.__mode = a_mode
+
+    def get_mode(self) -> int:
+        return self.__mode
+
+    def signal_enable(self, a_enable: int):
+        enable = int(bool(a_enable)) if self.__connected_device else 0
+        if self.__enabled != enable:
+            self.__enabled = enable
+            self.__signal_changed()
+
+    def enabled(self) -> int:
+        return self.__enabled
+
+    def is_signal_ready(self) -> int:
+        return int(bool(self.__enabled) and time.perf_counter() - self.__signal_change_time >= self.settle_time_s)
+
+    def fast_control_mode_enable(self, a_enable: int):
+        self.__fast_control_mode = a_enable
@@ -30,8 +30,7 @@ class FtdiControl:
         ALL = 0b11111111
 
     def __init__(self):
-        assert mxsrlib_dll.mxsrclib_dll is not None, "mxsrclib_dll не инициализирована !!!"
-        self.mxsrclib_dll = mxsrlib_dll.mxsrclib_dll
+        self.mxsrclib_dll = mxsrlib_dll.get_mxsrclib_dll()
 
         self.pin_buffers = {
             # После инициализации ftdi все пины установлены в 1
@@ -0,0 +1,153 @@
+from typing import Dict, List
+import threading
+import json
+import time
+import os
+
+from irspy.utils import LatencyHistogram
+
+
+# Инструментирование включается до загрузки библиотек: enable() или переменная окружения IRSPY_DLL_STATS=1
+__enabled = os.environ.get("IRSPY_DLL_STATS", "") not in ("", "0")
+__libraries: Dict[str, 'InstrumentedLibrary'] = {}
+__libraries_lock = threading.Lock()
+
+
+def enable(a_enable: bool = True):
+    """
+    Включает инструментирование библиотек, загруженных после вызова (см. LazyLibrary)
+    """
+    global __enabled
+    __enabled = a_enable
+
+
+def is_enabled() -> bool:
+    return __enabled
+
+
+class InstrumentedFunction:
+    """
+    Обертка функции библиотеки, считающая вызовы и время выполнения
+    """
+    __slots__ = ("name", "function", "histogram", "errors_count")
+
+    def __init__(self, a_name: str, a_function):
+        self.name = a_name
+        self.function = a_function
+        self.histogram = LatencyHistogram()
+        self.errors_count = 0
+
+    def __call__(self, *a_args):
+        start_ns = time.perf_counter_ns()
+        try:
+            return self.function(*a_args)
+        except Exception:
+            self.errors_count += 1
+            raise
+        finally:
+            self.histogram.record_ns(time.perf_counter_ns() - start_ns)
+
+
+class InstrumentedLibrary:
+    """
+    Прокси библиотеки (ctypes.CDLL или объекта с тем же интерфейсом): каждая вызываемая функция оборачивается
+    в InstrumentedFunction при первом обращении. Атрибуты, которые не являются функциями, и установка
+    атрибутов передаются библиотеке как есть.
+    При вызовах из нескольких потоков счетчики приблизительны, блокировок на пути вызова нет
+    """
+    def __init__(self, a_name: str, a_library):
+        object.__setattr__(self, "_name", a_name)
+        object.__setattr__(self, "_library", a_library)
+        object.__setattr__(self, "_functions", {})
+        object.__setattr__(self, "_start_time", time.perf_counter())
+
+    def __getattr__(self, a_name: str):
+        functions = self._functions
+        function = functions.get(a_name)
+        if function is None:
+            attribute = getattr(self._library, a_name)
+            if a_name.startswith("_") or not callable(attribute):
+                return attribute
+            function = InstrumentedFunction(a_name, attribute)
+            functions[a_name] = function
+        return function
+
+    def __setattr__(self, a_name: str, a_value):
+        setattr(self._library, a_name, a_value)
+
+    @property
+    def library(self):
+        return self._library
+
+    def get_functions(self) -> List[InstrumentedFunction]:
+        return list(self._functions.values())
+
+    def elapsed_s(self) -> float:
+        return time.perf_counter() - self._start_time
+
+    def reset(self):
+        for function in self.get_functions():
+            function.histogram.reset()
+            function.errors_count = 0
+        object.__setattr__(self, "_start_time", time.perf_counter())
+
+
+def instrument(a_name: str, a_library):
+    """
+    Оборачивает библиотеку в InstrumentedLibrary и регистрирует ее для get_statistics, если инструментирование
+    включено, иначе возвращает библиотеку без изменений
+    """
+    if not __enabled or isinstance(a_library, InstrumentedLibrary):
+        return a_library
+    instrumented = InstrumentedLibrary(a_name, a_library)
+    with __libraries_lock:
+        __libraries[a_name] = instrumented
+    return instrumented
+
+
+def get_libraries() -> Dict[str, InstrumentedLibrary]:
+    with __libraries_lock:
+        return dict(__libraries)
+
+
+def reset():
+    for library in get_libraries().values():
+        library.reset()
+
+
+def get_statistics() -> Dict[str, Dict[str, dict]]:
+    """
+    :return: {библиотека: {функция: {"calls_per_s", "errors", "count", "mean_us", "p50_us", ...}}}, функции
+    отсортированы по суммарному времени
+    """
+    statistics = {}
+    for library_name, library in get_libraries().items():
+        elapsed_s = library.elapsed_s()
+        functions = sorted(library.get_functions(), key=lambda f: f.histogram.total_ns, reverse=True)
+        library_statistics = {}
+        for function in functions:
+            if not function.histogram.count:
+                continue
+            function_statistics = function.histogram.to_dict()
+            function_statistics["calls_per_s"] = function.histogram.count / elapsed_s
+            function_statistics["total_ms"] = function.histogram.total_ns / 1e6
+            function_statistics["errors"] = function.errors_count
+            library_statistics[function.name] = function_statistics
+        statistics[library_name] = library_statistics
+    return statistics
+
+
+def to_json(a_indent: int = 2) -> str:
+    return json.dumps(get_statistics(), indent=a_indent, ensure_ascii=False)
+
+
+def dump_text() -> str:
+    lines = []
+    for library_name, functions in get_statistics().items():
+        lines.append(f"{library_name}:")
+        lines.append(f"    {'функция':<36} {'вызовов':>9} {'выз/с':>9} {'всего,мс':>10} {'сред,мкс':>9} "
+                     f"{'p50,мкс':>9} {'p99,мкс':>9} {'макс,мкс':>9}")
+        for name, s in functions.items():
+            lines.append(f"    {name:<36} {s['count']:>9} {s['calls_per_s']:>9.1f} {s['total_ms']:>10.2f} "
+                         f"{s['mean_us']:>9.1f} {s['p50_us']:>9.1f} {s['p99_us']:>9.1f} {s['max_us']:>9.1f}")
+    return "\n".join(lines)
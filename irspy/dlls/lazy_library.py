@@ -0,0 +1,64 @@
+from typing import Any, Callable, Optional
+import threading
+import ctypes
+
+from irspy.dlls import instrumentation
+
+
+class LazyLibrary:
+    """
+    Библиотека, которая загружается (ctypes.CDLL, проверка ревизии, настройка argtypes/restype) при первом вызове
+    get(), а не при импорте модуля. До загрузки вместо библиотеки по умолчанию можно выбрать другую
+    библиотеку или объект с тем же интерфейсом (например, SimulatedClbDll) через select().
+    Если включено инструментирование (instrumentation.enable), get() возвращает InstrumentedLibrary
+    """
+    def __init__(self, a_name: str, a_default_path: str, a_set_up: Callable[[str], Any]):
+        """
+        :param a_name: Имя библиотеки для сообщений об ошибках
+        :param a_default_path: Путь к библиотеке по умолчанию
+        :param a_set_up: Функция, которая загружает и настраивает библиотеку по пути
+        """
+        self.__name = a_name
+        self.__path = a_default_path
+        self.__set_up = a_set_up
+        self.__library = None
+        self.__lock = threading.Lock()
+
+    def get(self):
+        library = self.__library
+        if library is None:
+            with self.__lock:
+                if self.__library is None:
+                    self.__library = instrumentation.instrument(self.__name, self.__set_up(self.__path))
+                library = self.__library
+        return library
+
+    def select(self, a_library_or_path):
+        """
+        Выбирает библиотеку, которую вернет get()
+        :param a_library_or_path: Путь к библиотеке (загрузится при первом get()) или уже готовый объект
+        """
+        with self.__lock:
+            assert self.__library is None, f"{self.__name} уже загружена, выбрать другую библиотеку нельзя"
+            if isinstance(a_library_or_path, str):
+                self.__path = a_library_or_path
+            else:
+                self.__library = instrumentation.instrument(self.__name, a_library_or_path)
+
+    def is_loaded(self) -> bool:
+        return self.__library is not None
+
+    def get_path(self) -> Optional[str]:
+        return self.__path
+
+    def get_library_path(self) -> Optional[str]:
+        """
+        :return: Путь к файлу выбранной библиотеки: загруженной или той, что загрузится при первом get().
+        None, если выбран объект, который не загружен из файла (например, SimulatedClbDll)
+        """
+        library = self.__library
+        if library is None:
+            return self.__path
+        if isinstance(library, instrumentation.InstrumentedLibrary):
+            library = library.library
+        return library._name if isinstance(library, ctypes.CDLL) else None
@@ -1,8 +1,9 @@
-from typing import Union
 from array import array
 from os.path import dirname
 from os import sep
 import ctypes
+
+from irspy.dlls.lazy_library import LazyLibrary
 from irspy.revisions import Revisions
 
 
@@ -72,15 +73,34 @@ def set_up_mxsrclib_dll(a_full_path):
     return mx_dll
 
 
-__path = dirname(__file__) + sep + "mxsrclib_dll.dll"
-mxsrclib_dll: [Union, ctypes.CDLL] = set_up_mxsrclib_dll(__path)
+_mxsrclib_dll = LazyLibrary("mxsrclib_dll", dirname(__file__) + sep + "mxsrclib_dll.dll", set_up_mxsrclib_dll)
+
+
+def get_mxsrclib_dll():
+    """
+    Возвращает mxsrclib_dll, при первом вызове загружает ее
+    """
+    return _mxsrclib_dll.get()
+
+
+def select_mxsrclib_dll(a_library_or_path):
+    """
+    Выбирает библиотеку, которую будет возвращать get_mxsrclib_dll. Вызывается до первого get_mxsrclib_dll
+    :param a_library_or_path: Путь к mxsrclib_dll или объект с тем же интерфейсом
+    """
+    _mxsrclib_dll.select(a_library_or_path)
+
+
+def __getattr__(a_name):
+    # Совместимость с mxsrlib_dll.mxsrclib_dll, библиотека загружается при первом обращении
+    if a_name == "mxsrclib_dll":
+        return get_mxsrclib_dll()
+    raise AttributeError(f"module {__name__!r} has no attribute {a_name!r}")
 
 
 class FunnelClient:
     def __init__(self):
-        global mxsrclib_dll
-        assert mxsrclib_dll is not None, "mxsrclib_dll не инициализирована !!!"
-        self.mxsrclib_dll = mxsrclib_dll
+        self.mxsrclib_dll = get_mxsrclib_dll()
 
         self.__data_size = 0
         self.__created = False
@@ -147,9 +167,7 @@ class FunnelClient:
 
 class CorrectMap:
     def __init__(self):
-        global mxsrclib_dll
-        assert mxsrclib_dll is not None, "mxsrclib_dll не инициализирована !!!"
-        self.mxsrclib_dll = mxsrclib_dll
+        self.mxsrclib_dll = get_mxsrclib_dll()
 
         self.__handle = 0
 
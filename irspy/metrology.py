@@ -1,13 +1,32 @@
 from collections import deque
-from typing import Sequence
+from typing import Iterable, NamedTuple, Optional, Sequence
+from itertools import islice
 from array import array
-from math import sqrt
+from math import sqrt, fsum, log, exp, expm1, erfc, tan, pi
+import functools
+import operator
 import logging
+import bisect
 import ctypes
+import time
 
 from irspy.dlls import mxsrlib_dll
 
 
+@functools.lru_cache(maxsize=None)
+def _import_numpy():
+    """
+    Импортирует numpy при первом векторном вычислении, а не при импорте модуля (numpy загружается долго).
+    Результат запоминается, чтобы без numpy не искать его при каждом вызове
+    :return: Модуль numpy или None, если он не установлен
+    """
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
 def deviation_percents(a_value: float, a_reference: float):
     """
     :return: Разность между двумя числами в процентах
@@ -16,12 +35,91 @@ def deviation_percents(a_value: float, a_reference: float):
     return (a_value - a_reference) / abs(a_reference) * 100
 
 
-def student_t_inverse_distribution_2x(a_confidence_level, a_degrees_of_freedom):
-    assert mxsrlib_dll.mxsrclib_dll is not None, "mxsrclib_dll не инициализирована !!!"
+def normal_inverse_distribution(a_probability: float) -> float:
+    """
+    Квантиль стандартного нормального распределения: алгоритм Эклама (относительная погрешность 1.15e-9)
+    с одним шагом уточнения методом Галлея по erfc
+    :param a_probability: Вероятность от 0 до 1 (не включая границы)
+    """
+    assert 0 < a_probability < 1, "Вероятность должна быть больше 0 и меньше 1"
+    if a_probability > 0.5:
+        # 1 - a_probability вычисляется точно, а erfc в верхнем хвосте теряет точность
+        return -normal_inverse_distribution(1 - a_probability)
+
+    a = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02, 1.383577518672690e+02,
+         -3.066479806614716e+01, 2.506628277459239e+00)
+    b = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02, 6.680131188771972e+01,
+         -1.328068155288572e+01)
+    c = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00, -2.549732539343734e+00,
+         4.374664141464968e+00, 2.938163982698783e+00)
+    d = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+
+    if a_probability < 0.02425:
+        q = sqrt(-2 * log(a_probability))
+        x = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / \
+            ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1)
+    else:
+        q = a_probability - 0.5
+        r = q * q
+        x = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q / \
+            (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1)
+
+    error = 0.5 * erfc(-x / sqrt(2)) - a_probability
+    u = error * sqrt(2 * pi) * exp(x * x / 2)
+    return x - u / (1 + x * u / 2)
+
+
+@functools.lru_cache(maxsize=1024)
+def student_t_inverse_distribution_2x(a_confidence_level: float, a_degrees_of_freedom: int) -> float:
+    """
+    Двусторонний квантиль распределения Стьюдента (коэффициент Стьюдента) по алгоритму Хилла (ACM 396).
+    Результаты кэшируются, поэтому повторные вызовы с теми же аргументами стоят как поиск в словаре
+    :param a_confidence_level: Доверительная вероятность от 0 до 1 (не включая границы)
+    :param a_degrees_of_freedom: Количество степеней свободы
+    :return: t, для которого P(|T| < t) = a_confidence_level
+    """
+    assert a_degrees_of_freedom > 0, "Количество степеней свободы должно быть больше 0"
+    assert 0 < a_confidence_level < 1, "Уровень доверия должен быть больше 0 и меньше 1"
+
+    # Двусторонняя вероятность выхода за t
+    p = 1 - a_confidence_level
+    n = a_degrees_of_freedom
+
+    if n == 1:
+        return 1 / tan(p * pi / 2)
+    if n == 2:
+        return sqrt(2 / (p * (2 - p)) - 2)
+
+    a = 1 / (n - 0.5)
+    b = 48 / (a * a)
+    c = ((20700 * a / b - 98) * a - 16) * a + 96.36
+    d = ((94.5 / (b + c) - 3) / b + 1) * sqrt(a * pi / 2) * n
+    y = (d * p) ** (2 / n)
+
+    if y > 0.05 + a:
+        # Асимптотическое разложение через квантиль нормального распределения
+        x = normal_inverse_distribution(p / 2)
+        y = x * x
+        if n < 5:
+            c += 0.3 * (n - 4.5) * (x + 0.6)
+        c = (((0.05 * d * x - 5) * x - 7) * x - 2) * x + b + c
+        y = (((((0.4 * y + 6.3) * y + 36) * y + 94.5) / c - y - 3) / b + 1) * x
+        y = expm1(a * y * y)
+    else:
+        y = ((1 / (((n + 6) / (n * y) - 0.089 * d - 0.822) * (n + 2) * 3) + 0.5 / (n + 4)) * y - 1) * \
+            (n + 1) / (n + 2) + 1 / y
+
+    return sqrt(n * y)
+
+
+def dll_student_t_inverse_distribution_2x(a_confidence_level, a_degrees_of_freedom):
+    """
+    Реализация из mxsrclib_dll, для сверки с student_t_inverse_distribution_2x
+    """
     assert a_degrees_of_freedom > 0, "Количество степеней свободы должно быть больше 0"
     assert a_confidence_level in (0.95, 0.99, 0.999), "Допустимые уровни доверия: 0.95, 0.99, 0.999"
 
-    return mxsrlib_dll.mxsrclib_dll.student_t_inverse_distribution_2x(a_confidence_level, a_degrees_of_freedom)
+    return mxsrlib_dll.get_mxsrclib_dll().student_t_inverse_distribution_2x(a_confidence_level, a_degrees_of_freedom)
 
 
 class MovingAverage:
@@ -58,6 +156,22 @@ class MovingAverage:
 
         self.__samples.append(a_value)
 
+    def update_many(self, a_values: Iterable[float]):
+        """
+        Добавляет значения так же, как add для каждого значения
+        """
+        values = a_values if isinstance(a_values, Sequence) else list(a_values)
+        if self.__window_size and len(values) >= self.__window_size:
+            self.__samples.clear()
+            self.__samples.extend(islice(values, len(values) - self.__window_size, None))
+            self.__sum = fsum(self.__samples)
+        elif self.__window_size:
+            for value in values:
+                self.add(value)
+        else:
+            self.__samples.extend(values)
+            self.__sum += fsum(values)
+
     def is_empty(self):
         return not self.__samples
 
@@ -70,64 +184,265 @@ class MovingAverage:
 
 class MovingSKO:
     """
-    Класс для вычисления СКО в скользящем окне
+    Класс для вычисления СКО (генеральной совокупности, деление на количество значений) в скользящем окне.
+    Среднее и сумма квадратов отклонений обновляются по алгоритму Уэлфорда: при добавлении значения в
+    неполное окно - обычным шагом, при заполненном окне - заменой самого старого значения новым, поэтому
+    add выполняется за O(1) без потери точности на больших значениях с маленьким разбросом.
+    Ошибка округления, накопленная заменами, сбрасывается точным пересчетом по окну после каждых
+    a_window_size замен (в среднем O(1) на значение). Кроме того, окно пересчитывается сразу, когда сумма
+    квадратов отклонений падает в M2_DROP_TO_RECALCULATE раз от максимума после пересчета (например, из окна
+    ушел скачок уровня): ошибка округления замены пропорциональна этому максимуму, и без пересчета маленький
+    разброс оставшихся значений считался бы с большой относительной ошибкой.
+    Без окна (a_window_size = 0) значения не хранятся. Точность проверяется benchmarks/check_moving_sko.py
     """
+    M2_DROP_TO_RECALCULATE = 1e4
+
     def __init__(self, a_window_size: int = 0):
         """
-        :param a_window_size: Размер скользящего окна
+        :param a_window_size: Размер скользящего окна, 0 - без окна (по всем значениям)
         """
+        assert a_window_size >= 0, "Размер окна не может быть отрицательным"
         self.__window_size = a_window_size
-        self.__average = MovingAverage(self.__window_size)
-        self.__squares_sum = 0
-
-        if self.__window_size:
-            self.__squares = deque(maxlen=a_window_size)
-        else:
-            self.__squares = deque()
+        self.reset()
 
     def reset(self, a_window_size=None):
         if a_window_size:
             self.__window_size = a_window_size
 
-        self.__average.reset()
-        self.__squares_sum = 0
+        self.__count = 0
+        self.__mean = 0.
+        # Сумма квадратов отклонений от среднего
+        self.__m2 = 0.
+        # Наибольшая сумма квадратов отклонений после последнего точного пересчета
+        self.__m2_peak = 0.
+        # Кольцевой буфер значений окна, __next_index - место следующего значения (самое старое значение)
+        self.__samples = array('d', bytes(8 * self.__window_size))
+        self.__next_index = 0
+        self.__replaces_count = 0
 
-        if self.__window_size:
-            self.__squares = deque(maxlen=a_window_size)
+    def add(self, a_value: float):
+        if self.__window_size == 0 or self.__count < self.__window_size:
+            self.__count += 1
+            delta = a_value - self.__mean
+            self.__mean += delta / self.__count
+            self.__m2 += delta * (a_value - self.__mean)
         else:
-            self.__squares = deque()
+            if self.__m2 > self.__m2_peak:
+                self.__m2_peak = self.__m2
+            old_value = self.__samples[self.__next_index]
+            old_mean = self.__mean
+            self.__mean += (a_value - old_value) / self.__count
+            self.__m2 += (a_value - old_value) * (a_value - self.__mean + old_value - old_mean)
+            self.__replaces_count += 1
 
-    def add(self, a_value: float):
-        self.__average.add(a_value)
+        if self.__window_size:
+            self.__samples[self.__next_index] = a_value
+            self.__next_index = (self.__next_index + 1) % self.__window_size
+            if self.__replaces_count >= self.__window_size or \
+                    self.__m2 * MovingSKO.M2_DROP_TO_RECALCULATE < self.__m2_peak:
+                self.__recalculate()
 
-        if self.__window_size > 0 and len(self.__squares) == self.__window_size:
-            popped_value = self.__squares[0]
-            self.__squares_sum -= popped_value
+    def update_many(self, a_values: Iterable[float]):
+        """
+        Добавляет значения так же, как add для каждого значения. Без окна значения объединяются с накопленными
+        одним шагом (формула Чана), если значений больше, чем размер окна, окно заполняется последними
+        значениями и пересчитывается точно
+        """
+        values = a_values if isinstance(a_values, Sequence) else list(a_values)
+        if not values:
+            return
+
+        if self.__window_size == 0:
+            count = len(values)
+            mean = fsum(values) / count
+            m2 = fsum((value - mean) ** 2 for value in values)
+            total_count = self.__count + count
+            delta = mean - self.__mean
+            self.__mean += delta * count / total_count
+            self.__m2 += m2 + delta * delta * self.__count * count / total_count
+            self.__count = total_count
+        elif len(values) >= self.__window_size:
+            self.__samples = array('d', islice(values, len(values) - self.__window_size, None))
+            self.__count = self.__window_size
+            self.__next_index = 0
+            self.__recalculate()
+        else:
+            for value in values:
+                self.add(value)
 
-        square = (a_value - self.__average.get()) ** 2
-        self.__squares_sum += square
-        self.__squares.append(square)
+    def __recalculate(self):
+        mean = fsum(self.__samples) / self.__count
+        self.__mean = mean
+        self.__m2 = fsum((value - mean) ** 2 for value in self.__samples)
+        self.__m2_peak = self.__m2
+        self.__replaces_count = 0
 
     def is_empty(self):
-        return not self.__squares
+        return self.__count == 0
+
+    def count(self) -> int:
+        return self.__count
 
     def average(self):
-        return self.__average.get()
+        return self.__mean
 
     def get(self):
-        if self.__squares and self.__squares_sum >= 0:
-
-            return sqrt(self.__squares_sum / len(self.__squares))
+        if self.__count and self.__m2 > 0:
+            return sqrt(self.__m2 / self.__count)
         else:
             return 0
 
 
+class Description(NamedTuple):
+    count: int
+    min: float
+    max: float
+    mean: float
+    # СКО генеральной совокупности
+    sko: float
+    # Половина размаха, (max - min) / 2
+    delta_2: float
+    # Доверительные интервалы по Стьюденту (sko * t), в единицах значений
+    student_95: float
+    student_99: float
+    student_999: float
+
+
+def describe(a_values: Sequence[float], a_window: Optional[int] = None) -> Description:
+    """
+    Считает статистику последовательности целиком, без добавления значений по одному: векторно с numpy,
+    если он установлен, иначе встроенными min, max и fsum
+    :param a_values: Значения (list, array, numpy.ndarray)
+    :param a_window: Если задано, статистика считается по последним a_window значениям
+    """
+    if a_window is not None:
+        assert a_window > 0, "Размер окна должен быть больше 0"
+        a_values = a_values[-a_window:]
+
+    count = len(a_values)
+    if count == 0:
+        return Description(0, 0., 0., 0., 0., 0., 0., 0., 0.)
+
+    numpy = _import_numpy()
+    if numpy is not None:
+        values = numpy.asarray(a_values, dtype=float)
+        min_value, max_value = float(values.min()), float(values.max())
+        mean = float(values.mean())
+        sko = float(values.std())
+    else:
+        min_value, max_value = min(a_values), max(a_values)
+        mean = fsum(a_values) / count
+        deviations = [value - mean for value in a_values]
+        sko = sqrt(sum(map(operator.mul, deviations, deviations)) / count)
+
+    return Description(
+        count=count, min=min_value, max=max_value, mean=mean, sko=sko, delta_2=(max_value - min_value) / 2,
+        student_95=sko * student_t_inverse_distribution_2x(0.95, count),
+        student_99=sko * student_t_inverse_distribution_2x(0.99, count),
+        student_999=sko * student_t_inverse_distribution_2x(0.999, count))
+
+
+class PyImpulseFilter:
+    """
+    Импульсный фильтр mxsrclib без mxsrclib_dll, у каждого экземпляра свои значения. Алгоритм перенесен из
+    библиотеки: столько раз, сколько значений в фильтре, минимальное и максимальное значения заменяются двумя
+    копиями среднего остальных, поправленного на несимметричность значений вокруг него. Результат - среднее
+    получившихся значений.
+    С imp_filter_assign/imp_filter_get совпадает до ошибки округления (проверка - benchmarks/check_filters.py)
+    """
+    MIN_SIZE = 3
+
+    def __init__(self, a_window_size: int = 0):
+        """
+        :param a_window_size: Размер окна. 0 - окна нет, результат пересчитывается по всем значениям. Иначе
+            add вытесняет самое старое значение и пересчитывает результат, когда окно заполнено
+        """
+        assert a_window_size == 0 or a_window_size >= PyImpulseFilter.MIN_SIZE, \
+            "Размер окна импульсного фильтра должен быть 0 или не меньше 3!"
+        self.__window_size = a_window_size
+        self.__values = deque()
+        self.__result = 0.
+
+    def clear(self):
+        """
+        Удаляет значения. Как и в библиотеке, get до следующего расчета возвращает прошлый результат
+        """
+        self.__values.clear()
+
+    def add(self, a_value: float):
+        self.__push(a_value)
+        if self.__is_full():
+            self.__result = PyImpulseFilter.__calculate(self.__values)
+
+    def add_many(self, a_values: Iterable[float]):
+        """
+        То же, что add для каждого значения, но результат считается один раз, по последнему окну
+        """
+        for value in a_values:
+            self.__push(value)
+        if self.__is_full():
+            self.__result = PyImpulseFilter.__calculate(self.__values)
+
+    def assign(self, a_values: Iterable[float]):
+        """
+        Заменяет значения на a_values и пересчитывает результат. Как и в библиотеке, окно здесь не
+        учитывается, значения остаются все
+        """
+        values = deque(a_values)
+        assert len(values) >= PyImpulseFilter.MIN_SIZE, \
+            "Для корректной работы в импульсный фильтр нужно задать как минимум 3 значения!"
+        self.__values = values
+        self.__result = PyImpulseFilter.__calculate(values)
+
+    def size(self) -> int:
+        return len(self.__values)
+
+    def get(self) -> float:
+        """
+        :return: Результат последнего расчета, до первого расчета - 0
+        """
+        return self.__result
+
+    def __push(self, a_value: float):
+        # Как в библиотеке: вытесняется одно значение, даже если после assign их больше, чем размер окна
+        if self.__window_size and len(self.__values) >= self.__window_size:
+            self.__values.popleft()
+        self.__values.append(a_value)
+
+    def __is_full(self) -> bool:
+        return len(self.__values) >= (self.__window_size if self.__window_size else PyImpulseFilter.MIN_SIZE)
+
+    @staticmethod
+    def __calculate(a_values: Iterable[float]) -> float:
+        values = sorted(a_values)
+        count = len(values)
+        total = fsum(values)
+        for _ in range(count):
+            total -= values.pop(0) + values.pop()
+            mean = total / (count - 2)
+            # Вместо минимального и максимального встают две копии mean, они попадают в equal_count
+            lower = bisect.bisect_left(values, mean)
+            upper = bisect.bisect_right(values, mean)
+            above_count = count - 2 - upper
+            equal_count = upper - lower + 2
+            above_deviation = fsum(values[upper:]) - mean * above_count
+            value = mean + (2 * above_count + equal_count - count) * above_deviation / (count * count)
+
+            bisect.insort(values, value)
+            bisect.insort(values, value)
+            total += 2 * value
+        return total / count
+
+
 class ImpulseFilter:
+    """
+    Импульсный фильтр mxsrclib_dll. В библиотеке один фильтр на процесс, поэтому все экземпляры класса
+    работают с одними и теми же значениями
+    """
     MIN_SIZE = 3
 
     def __init__(self):
-        assert mxsrlib_dll.mxsrclib_dll is not None, "mxsrclib_dll не инициализирована !!!"
-        self.mxsrclib_dll = mxsrlib_dll.mxsrclib_dll
+        self.mxsrclib_dll = mxsrlib_dll.get_mxsrclib_dll()
 
     def clear(self):
         self.mxsrclib_dll.imp_filter_clear()
@@ -146,20 +461,144 @@ class ImpulseFilter:
         self.mxsrclib_dll.imp_filter_assign(pointer_to_double, size)
 
 
+class PyPchip:
+    """
+    Интерполяция Эрмита (монотонная кубическая, PCHIP, метод Фритча-Карлсона) без mxsrclib_dll.
+    Производные в узлах и коэффициенты кубических многочленов считаются один раз в set_points, поэтому
+    interpolate - это поиск отрезка через bisect и вычисление многочлена.
+    Внутри узлов результат совпадает с scipy.interpolate.PchipInterpolator. Поведение в двух случаях с
+    библиотекой (Pchip) не сверялось: узлы с одинаковым X объединяются в один со средним Y, а за пределами
+    узлов продолжаются многочлены крайних отрезков
+    """
+    def __init__(self):
+        self.__x_points = array('d')
+        # Коэффициенты многочлена на отрезке k: y = c0 + t * (c1 + t * (c2 + t * c3)), t = x - x_points[k]
+        self.__c0 = array('d')
+        self.__c1 = array('d')
+        self.__c2 = array('d')
+        self.__c3 = array('d')
+        self.__inited = False
+
+    @staticmethod
+    def __edge_derivative(a_h0: float, a_h1: float, a_delta0: float, a_delta1: float) -> float:
+        """
+        Производная в крайнем узле по трем точкам, ограниченная так, чтобы сохранить монотонность
+        """
+        derivative = ((2 * a_h0 + a_h1) * a_delta0 - a_h0 * a_delta1) / (a_h0 + a_h1)
+        if derivative * a_delta0 <= 0:
+            return 0.
+        if a_delta0 * a_delta1 < 0 and abs(derivative) > abs(3 * a_delta0):
+            return 3 * a_delta0
+        return derivative
+
+    @staticmethod
+    def __merge_repeated_points(a_x_points: Sequence, a_y_points: Sequence):
+        """
+        :return: Узлы с различными X (array('d')), Y узлов с одинаковым X усредняются
+        """
+        x = array('d')
+        y = array('d')
+        repeats_count = 1
+        for x_point, y_point in zip(a_x_points, a_y_points):
+            if x and x_point == x[-1]:
+                repeats_count += 1
+                y[-1] += (y_point - y[-1]) / repeats_count
+            else:
+                x.append(x_point)
+                y.append(y_point)
+                repeats_count = 1
+        return x, y
+
+    def set_points(self, a_x_points: Sequence, a_y_points: Sequence):
+        assert len(a_x_points) == len(a_y_points), "Последивательности должны быть одинаковой длины!"
+        assert len(a_x_points) >= 2, "Размер последовательностей должен быть больше 1"
+
+        for i in range(1, len(a_x_points)):
+            assert a_x_points[i] >= a_x_points[i - 1], "Последовательность X должна быть неубывающая"
+
+        x, y = PyPchip.__merge_repeated_points(a_x_points, a_y_points)
+        assert len(x) >= 2, "Должно быть хотя бы 2 различных значения X"
+        segments_count = len(x) - 1
+        h = [x[k + 1] - x[k] for k in range(segments_count)]
+        delta = [(y[k + 1] - y[k]) / h[k] for k in range(segments_count)]
+
+        if segments_count == 1:
+            derivatives = [delta[0], delta[0]]
+        else:
+            derivatives = [PyPchip.__edge_derivative(h[0], h[1], delta[0], delta[1])]
+            for k in range(1, segments_count):
+                if delta[k - 1] * delta[k] <= 0:
+                    derivatives.append(0.)
+                else:
+                    w1 = 2 * h[k] + h[k - 1]
+                    w2 = h[k] + 2 * h[k - 1]
+                    derivatives.append((w1 + w2) / (w1 / delta[k - 1] + w2 / delta[k]))
+            derivatives.append(PyPchip.__edge_derivative(h[-1], h[-2], delta[-1], delta[-2]))
+
+        self.__x_points = x
+        self.__c0 = array('d', y[:-1])
+        self.__c1 = array('d', derivatives[:-1])
+        self.__c2 = array('d', ((3 * delta[k] - 2 * derivatives[k] - derivatives[k + 1]) / h[k]
+                                for k in range(segments_count)))
+        self.__c3 = array('d', ((derivatives[k] + derivatives[k + 1] - 2 * delta[k]) / (h[k] * h[k])
+                                for k in range(segments_count)))
+        self.__inited = True
+
+    def interpolate(self, a_value: float) -> float:
+        assert self.__inited, "Точки интерполяции не заданы"
+        k = min(max(bisect.bisect_right(self.__x_points, a_value) - 1, 0), len(self.__c0) - 1)
+        t = a_value - self.__x_points[k]
+        return self.__c0[k] + t * (self.__c1[k] + t * (self.__c2[k] + t * self.__c3[k]))
+
+    def interpolate_many(self, a_values: Iterable[float]) -> array:
+        """
+        Интерполирует последовательность значений. С numpy вычисляется векторно
+        :param a_values: Значения X (list, array, numpy.ndarray или любой итерируемый объект)
+        """
+        assert self.__inited, "Точки интерполяции не заданы"
+        numpy = _import_numpy()
+        if numpy is not None:
+            # numpy.asarray не разворачивает генераторы и итераторы
+            if not isinstance(a_values, (Sequence, numpy.ndarray)):
+                a_values = array('d', a_values)
+            values = numpy.asarray(a_values, dtype=float)
+            x_points = numpy.frombuffer(self.__x_points, dtype=float)
+            k = numpy.clip(numpy.searchsorted(x_points, values, side="right") - 1, 0, len(self.__c0) - 1)
+            t = values - x_points[k]
+            result = numpy.frombuffer(self.__c0, dtype=float)[k] + t * (
+                numpy.frombuffer(self.__c1, dtype=float)[k] + t * (
+                    numpy.frombuffer(self.__c2, dtype=float)[k] + t * numpy.frombuffer(self.__c3, dtype=float)[k]))
+            return array('d', result.tobytes())
+
+        x_points, c0, c1, c2, c3 = self.__x_points, self.__c0, self.__c1, self.__c2, self.__c3
+        last_segment = len(c0) - 1
+        bisect_right = bisect.bisect_right
+        result = array('d')
+        for value in a_values:
+            k = min(max(bisect_right(x_points, value) - 1, 0), last_segment)
+            t = value - x_points[k]
+            result.append(c0[k] + t * (c1[k] + t * (c2[k] + t * c3[k])))
+        return result
+
+
 class Pchip:
     """
-    Класс для вычисления интерполяции Эрмита
+    Класс для вычисления интерполяции Эрмита через mxsrclib_dll
     """
+    # Значение по умолчанию на уровне класса, чтобы __del__ работал, даже если __init__ не выполнился
+    __handle = None
+
     def __init__(self):
-        assert mxsrlib_dll.mxsrclib_dll is not None, "mxsrclib_dll не инициализирована !!!"
-        self.mxsrclib_dll = mxsrlib_dll.mxsrclib_dll
+        self.__inited = False
+        self.mxsrclib_dll = mxsrlib_dll.get_mxsrclib_dll()
 
         self.__handle = self.mxsrclib_dll.pchip_create()
-        self.__inited = False
 
     def __del__(self):
-        pass
-        self.mxsrclib_dll.pchip_destroy(self.__handle)
+        # Объект в библиотеке мог не создаться (например, библиотека не загрузилась)
+        if self.__handle is not None:
+            self.mxsrclib_dll.pchip_destroy(self.__handle)
+            self.__handle = None
 
     def set_points(self, a_x_points: Sequence, a_y_points: Sequence):
         assert len(a_x_points) == len(a_y_points), "Последивательности должны быть одинаковой длины!"
@@ -168,20 +607,120 @@ class Pchip:
         for i in range(1, len(a_x_points)):
             assert a_x_points[i] >= a_x_points[i - 1], "Последовательность X должна быть неубывающая"
 
-        x_points = (ctypes.c_double * len(a_x_points))(*a_x_points)
-        y_points = (ctypes.c_double * len(a_y_points))(*a_y_points)
-        self.mxsrclib_dll.pchip_set_points(self.__handle, x_points, y_points, len(a_x_points))
+        x_points = array('d', a_x_points)
+        y_points = array('d', a_y_points)
+        self.mxsrclib_dll.pchip_set_points(
+            self.__handle, ctypes.cast(x_points.buffer_info()[0], ctypes.POINTER(ctypes.c_double)),
+            ctypes.cast(y_points.buffer_info()[0], ctypes.POINTER(ctypes.c_double)), len(x_points))
         self.__inited = True
 
     def interpolate(self, a_value: float):
         assert self.__inited, "Точки интерполяции не заданы"
         return self.mxsrclib_dll.pchip_interpolate(self.__handle, a_value)
 
+    def interpolate_many(self, a_values: Iterable[float]) -> array:
+        """
+        В библиотеке нет функции для нескольких значений, поэтому это цикл по interpolate
+        """
+        assert self.__inited, "Точки интерполяции не заданы"
+        pchip_interpolate = self.mxsrclib_dll.pchip_interpolate
+        return array('d', (pchip_interpolate(self.__handle, value) for value in a_values))
+
+
+class PyParamFilter:
+    """
+    Фильтр параметра mxsrclib без mxsrclib_dll, у каждого экземпляра свое окно. Алгоритм перенесен из
+    библиотеки: add задает текущее значение параметра, tick раз в sampling_time берет его отсчетом в окно из
+    последних size отсчетов, get_value - среднее окна. Отсчеты берутся только между restart и stop, после
+    создания фильтр остановлен
+    """
+    DEFAULT_SIZE = 100
+    DEFAULT_SAMPLING_TIME_S = 0.1
+
+    def __init__(self, a_size: int = DEFAULT_SIZE, a_sampling_time_s: float = DEFAULT_SAMPLING_TIME_S):
+        """
+        :param a_size: Количество отсчетов в окне, 0 - то же, что 1
+        :param a_sampling_time_s: Время между отсчетами, которые берет tick
+        """
+        self.__size = a_size if a_size else 1
+        self.__samples = deque()
+        self.__value = 0.
+        self.__started = False
+        self.__sampling_time_s = a_sampling_time_s
+        self.__next_sample_time = time.perf_counter() + a_sampling_time_s
+
+    def tick(self):
+        # Как в библиотеке, таймер отсчитывает время и когда фильтр остановлен
+        current_time = time.perf_counter()
+        if current_time > self.__next_sample_time:
+            self.__next_sample_time = current_time + self.__sampling_time_s
+            if self.__started:
+                self.__push(self.__value)
+
+    def add(self, a_value: float):
+        self.__value = a_value
+
+    def add_many(self, a_values: Iterable[float]):
+        """
+        Берет a_values отсчетами сразу, как если бы на каждом сработал tick. Для значений, которые уже прочитаны
+        с нужным периодом (например, пачка значений сетевой переменной). В библиотеке такой функции нет
+        """
+        for value in a_values:
+            self.__value = value
+            if self.__started:
+                self.__push(value)
+
+    def get_value(self) -> float:
+        """
+        :return: Среднее отсчетов в окне, если отсчетов нет - 0
+        """
+        return fsum(self.__samples) / len(self.__samples) if self.__samples else 0.
+
+    def is_empty(self) -> bool:
+        return not self.__samples
+
+    def restart(self):
+        """
+        Очищает окно и начинает брать отсчеты
+        """
+        self.__samples.clear()
+        self.__started = True
+
+    def set_sampling_time(self, a_sampling_time: float):
+        """
+        Задает время между отсчетами, следующий отсчет - через a_sampling_time
+        """
+        self.__sampling_time_s = a_sampling_time
+        self.__next_sample_time = time.perf_counter() + a_sampling_time
+
+    def resize(self, a_new_size: int):
+        """
+        Задает количество отсчетов в окне, 0 - то же, что 1. Как и в библиотеке, если отсчетов больше, остаются
+        самые старые
+        """
+        self.__size = a_new_size if a_new_size else 1
+        while len(self.__samples) > self.__size:
+            self.__samples.pop()
+
+    def stop(self):
+        """
+        Перестает брать отсчеты, get_value возвращает среднее на момент остановки
+        """
+        self.__started = False
+
+    def __push(self, a_value: float):
+        if len(self.__samples) >= self.__size:
+            self.__samples.popleft()
+        self.__samples.append(a_value)
+
 
 class ParamFilter:
+    """
+    Фильтр параметра mxsrclib_dll. В библиотеке один фильтр на процесс, поэтому все экземпляры класса
+    работают с одним и тем же фильтром
+    """
     def __init__(self):
-        assert mxsrlib_dll.mxsrclib_dll is not None, "mxsrclib_dll не инициализирована !!!"
-        self.mxsrclib_dll = mxsrlib_dll.mxsrclib_dll
+        self.mxsrclib_dll = mxsrlib_dll.get_mxsrclib_dll()
 
     def tick(self):
         self.mxsrclib_dll.param_filter_tick()
@@ -209,12 +748,13 @@ if __name__ == "__main__":
     from irspy.dlls import mxsrlib_dll
     from array import array
 
-    mxsrclib_dll = mxsrlib_dll.set_up_mxsrclib_dll("dlls/mxsrclib_dll.dll")
+    mxsrlib_dll.select_mxsrclib_dll("dlls/mxsrclib_dll.dll")
 
-    pchip1 = Pchip()
-    pchip1.set_points((1, 2, 3), (4, 5, 6))
-    print(pchip1.interpolate(2.5))
+    for pchip_class in (Pchip, PyPchip):
+        pchip1 = pchip_class()
+        pchip1.set_points((1, 2, 3), (4, 5, 6))
+        print(pchip1.interpolate(2.5))
 
-    pchip2 = Pchip()
-    pchip2.set_points((2.3, 3.124, 4.23), (5.535, 6.25, 7.23))
-    print(pchip2.interpolate(2.5))
+        pchip2 = pchip_class()
+        pchip2.set_points((2.3, 3.124, 4.23), (5.535, 6.25, 7.23))
+        print(pchip2.interpolate(2.5), list(pchip2.interpolate_many(array('d', (2.5, 3., 4.)))))
@@ -1,10 +1,10 @@
 from os.path import dirname
-from typing import Union
 from os import sep
 import ipaddress
 import logging
 import ctypes
 
+from irspy.dlls.lazy_library import LazyLibrary
 from irspy.revisions import Revisions
 
 
@@ -35,14 +35,27 @@ def set_up_driver(a_full_path):
     return pokrov_dll_lib
 
 
-__path = dirname(__file__) + sep + "pokrov_dll.dll"
-_pokrov_dll: [Union, ctypes.CDLL] = set_up_driver(__path)
+_pokrov_dll = LazyLibrary("pokrov_dll", dirname(__file__) + sep + "pokrov_dll.dll", set_up_driver)
+
+
+def get_pokrov_dll():
+    """
+    Возвращает pokrov_dll, при первом вызове загружает ее
+    """
+    return _pokrov_dll.get()
+
+
+def select_pokrov_dll(a_library_or_path):
+    """
+    Выбирает библиотеку, которую будет возвращать get_pokrov_dll. Вызывается до первого get_pokrov_dll
+    :param a_library_or_path: Путь к pokrov_dll или объект с тем же интерфейсом
+    """
+    _pokrov_dll.select(a_library_or_path)
 
 
 class PokrovDrv:
     def __init__(self):
-        global _pokrov_dll
-        self.__pokrov_dll = _pokrov_dll
+        self.__pokrov_dll = get_pokrov_dll()
         self.__pokrov_dll.init()
 
     def connect(self, a_ip: str):
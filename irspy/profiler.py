@@ -0,0 +1,185 @@
+from typing import Callable, Dict, Optional
+from collections import deque
+import functools
+import threading
+import json
+import time
+import os
+
+from irspy.utils import LatencyHistogram
+
+
+# Профилирование включается enable() или переменной окружения IRSPY_PROFILE=1. Пока оно выключено, span()
+# возвращает общий пустой контекстный менеджер, а функции с декоратором profile вызываются напрямую
+__enabled = os.environ.get("IRSPY_PROFILE", "") not in ("", "0")
+# Сколько последних вызовов каждого участка хранится для выгрузки в формате Chrome trace
+__events_capacity = 1000
+__spans: Dict[str, 'SpanStatistics'] = {}
+__spans_lock = threading.Lock()
+__origin_ns = time.perf_counter_ns()
+
+
+def enable(a_enable: bool = True, a_events_capacity: Optional[int] = None):
+    """
+    :param a_enable: Включить профилирование
+    :param a_events_capacity: Размер кольцевого буфера вызовов каждого участка (для участков, созданных позже)
+    """
+    global __enabled, __events_capacity
+    __enabled = a_enable
+    if a_events_capacity is not None:
+        assert a_events_capacity > 0, "Размер буфера должен быть больше 0"
+        __events_capacity = a_events_capacity
+
+
+def is_enabled() -> bool:
+    return __enabled
+
+
+class SpanStatistics:
+    """
+    Статистика одного именованного участка кода: гистограмма длительностей всех вызовов и кольцевой буфер
+    последних вызовов (начало, длительность, поток). Память не растет с количеством вызовов
+    """
+    __slots__ = ("name", "histogram", "events")
+
+    def __init__(self, a_name: str, a_events_capacity: int):
+        self.name = a_name
+        self.histogram = LatencyHistogram()
+        self.events = deque(maxlen=a_events_capacity)
+
+    def record(self, a_start_ns: int, a_duration_ns: int):
+        self.histogram.record_ns(a_duration_ns)
+        self.events.append((a_start_ns, a_duration_ns, threading.get_ident()))
+
+    def reset(self):
+        self.histogram.reset()
+        self.events.clear()
+
+
+def get_span_statistics(a_name: str) -> SpanStatistics:
+    statistics = __spans.get(a_name)
+    if statistics is None:
+        with __spans_lock:
+            statistics = __spans.setdefault(a_name, SpanStatistics(a_name, __events_capacity))
+    return statistics
+
+
+def record(a_name: str, a_start_ns: int, a_duration_ns: int):
+    """
+    Записывает вызов участка, измеренный вручную (time.perf_counter_ns)
+    """
+    get_span_statistics(a_name).record(a_start_ns, a_duration_ns)
+
+
+class Span:
+    """
+    Контекстный менеджер, измеряющий время выполнения блока
+    """
+    __slots__ = ("statistics", "start_ns")
+
+    def __init__(self, a_statistics: SpanStatistics):
+        self.statistics = a_statistics
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, a_exc_type, a_exc_value, a_traceback):
+        self.statistics.record(self.start_ns, time.perf_counter_ns() - self.start_ns)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, a_exc_type, a_exc_value, a_traceback):
+        return False
+
+
+__no_span = _NoSpan()
+
+
+def span(a_name: str):
+    """
+    with profiler.span("name"): ...
+    """
+    if not __enabled:
+        return __no_span
+    return Span(get_span_statistics(a_name))
+
+
+def profile(a_name: Optional[str] = None) -> Callable:
+    """
+    Декоратор, измеряющий время выполнения функции. Включение и выключение профилирования действуют на уже
+    декорированные функции
+    :param a_name: Имя участка, по умолчанию - полное имя функции
+    """
+    def decorator(a_function):
+        name = a_name if a_name is not None else f"{a_function.__module__}.{a_function.__qualname__}"
+
+        @functools.wraps(a_function)
+        def wrapper(*args, **kwargs):
+            if not __enabled:
+                return a_function(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return a_function(*args, **kwargs)
+            finally:
+                record(name, start_ns, time.perf_counter_ns() - start_ns)
+        return wrapper
+    return decorator
+
+
+def get_spans() -> Dict[str, SpanStatistics]:
+    with __spans_lock:
+        return dict(__spans)
+
+
+def reset():
+    for statistics in get_spans().values():
+        statistics.reset()
+
+
+def get_statistics() -> Dict[str, dict]:
+    """
+    :return: {участок: {"count", "mean_us", "min_us", "p50_us", "p90_us", "p99_us", "max_us", "total_ms"}}
+    """
+    statistics = {}
+    for name, span_statistics in sorted(get_spans().items()):
+        histogram = span_statistics.histogram
+        if histogram.count:
+            statistics[name] = histogram.to_dict()
+            statistics[name]["total_ms"] = histogram.total_ns / 1e6
+    return statistics
+
+
+def to_chrome_trace() -> dict:
+    """
+    Последние вызовы всех участков в формате Chrome trace event (chrome://tracing, Perfetto)
+    """
+    pid = os.getpid()
+    events = []
+    for name, span_statistics in get_spans().items():
+        for start_ns, duration_ns, thread_id in list(span_statistics.events):
+            events.append({"name": name, "ph": "X", "ts": (start_ns - __origin_ns) / 1e3,
+                           "dur": duration_ns / 1e3, "pid": pid, "tid": thread_id})
+    events.sort(key=lambda e: e["ts"])
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def dump_chrome_trace(a_path: str):
+    with open(a_path, "w", encoding="utf-8") as file:
+        json.dump(to_chrome_trace(), file, ensure_ascii=False)
+
+
+def dump_text() -> str:
+    lines = [f"{'участок':<48} {'вызовов':>9} {'всего,мс':>10} {'сред,мкс':>9} {'p50,мкс':>9} {'p99,мкс':>9} "
+             f"{'макс,мкс':>9}"]
+    for name, s in get_statistics().items():
+        lines.append(f"{name:<48} {s['count']:>9} {s['total_ms']:>10.2f} {s['mean_us']:>9.1f} {s['p50_us']:>9.1f} "
+                     f"{s['p99_us']:>9.1f} {s['max_us']:>9.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,58 @@
+from PyQt5 import QtWidgets, QtCore, QtGui
+
+from irspy.dlls import instrumentation
+
+
+class DriverStatsWidget(QtWidgets.QWidget):
+    """
+    Таблица статистики вызовов функций библиотек (см. irspy.dlls.instrumentation), обновляется по таймеру.
+    Показывает пустую таблицу, если инструментирование не было включено до загрузки библиотек
+    """
+    HEADERS = ("Библиотека", "Функция", "Вызовов", "Вызовов/с", "Всего, мс", "Среднее, мкс", "p50, мкс",
+               "p99, мкс", "Макс, мкс", "Ошибок")
+    KEYS = ("count", "calls_per_s", "total_ms", "mean_us", "p50_us", "p99_us", "max_us", "errors")
+
+    def __init__(self, a_update_period_ms: int = 1000, a_parent=None):
+        super().__init__(a_parent)
+
+        self.table = QtWidgets.QTableWidget(0, len(DriverStatsWidget.HEADERS), self)
+        self.table.setHorizontalHeaderLabels(DriverStatsWidget.HEADERS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().hide()
+
+        self.reset_button = QtWidgets.QPushButton("Сбросить", self)
+        self.reset_button.clicked.connect(self.reset_button_clicked)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.table)
+        layout.addWidget(self.reset_button, alignment=QtCore.Qt.AlignRight)
+
+        self.update_timer = QtCore.QTimer(self)
+        self.update_timer.timeout.connect(self.update_table)
+        self.update_timer.start(a_update_period_ms)
+        self.update_table()
+
+    def update_table(self):
+        rows = []
+        for library_name, functions in instrumentation.get_statistics().items():
+            for function_name, statistics in functions.items():
+                rows.append((library_name, function_name, statistics))
+
+        self.table.setRowCount(len(rows))
+        for row, (library_name, function_name, statistics) in enumerate(rows):
+            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(library_name))
+            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(function_name))
+            for column, key in enumerate(DriverStatsWidget.KEYS, 2):
+                value = statistics[key]
+                text = str(value) if isinstance(value, int) else f"{value:.1f}"
+                item = QtWidgets.QTableWidgetItem(text)
+                item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def reset_button_clicked(self):
+        instrumentation.reset()
+        self.update_table()
+
+    def closeEvent(self, a_event: QtGui.QCloseEvent) -> None:
+        self.update_timer.stop()
+        a_event.accept()
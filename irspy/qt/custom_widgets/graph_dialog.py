@@ -10,7 +10,7 @@ import pyqtgraph
 
 from irspy.qt.custom_widgets.ui_py.graph_dialog import Ui_graph_dialog as GraphForm
 from irspy.qt.qt_settings_ini_parser import QtSettings
-from irspy import metrology
+from irspy import metrology, profiler
 import irspy.utils as utils
 
 
@@ -208,6 +208,7 @@ class GraphDialog(QtWidgets.QDialog):
         self.calculate_graph_parameters(data_x, data_y, x_min, x_max, y_min, y_max)
         self.update_graph_parameters_table()
 
+    @profiler.profile()
     def calculate_graph_parameters(self, data_x, data_y, x_min, x_max, y_min, y_max):
         self.graph_parameters.reset()
 
@@ -221,41 +222,25 @@ class GraphDialog(QtWidgets.QDialog):
             self.graph_parameters.x_max = data_x_in_range[-1]
             self.graph_parameters.x_range = self.graph_parameters.x_max - self.graph_parameters.x_min
 
-            data_y_in_range = []
-            moving_sko = metrology.MovingSKO()
-
-            for y in data_y[first_x_index:last_x_index]:
-                if y_min <= y <= y_max:
-                    data_y_in_range.append(y)
-
-                    if y > self.graph_parameters.y_max:
-                        self.graph_parameters.y_max = y
-
-                    if y < self.graph_parameters.y_min:
-                        self.graph_parameters.y_min = y
-
-                    moving_sko.add(y)
+            data_y_in_range = [y for y in data_y[first_x_index:last_x_index] if y_min <= y <= y_max]
 
             if data_y_in_range:
-                self.graph_parameters.points_count = len(data_y_in_range)
-                self.graph_parameters.y_average = moving_sko.average()
+                description = metrology.describe(data_y_in_range)
+                self.graph_parameters.points_count = description.count
+                self.graph_parameters.y_min = description.min
+                self.graph_parameters.y_max = description.max
+                self.graph_parameters.y_average = description.mean
 
                 if self.graph_parameters.y_average:
                     abs_average = abs(self.graph_parameters.y_average)
-                    self.graph_parameters.delta_2 = \
-                        abs(self.graph_parameters.y_max - self.graph_parameters.y_min) / abs_average * 100 / 2
-
-                    self.graph_parameters.sko = moving_sko.get()
-                    self.graph_parameters.sko_percents = self.graph_parameters.sko / abs_average * 100
-
-                    self.graph_parameters.student_95 = self.graph_parameters.sko_percents * \
-                        metrology.student_t_inverse_distribution_2x(0.95, len(data_y_in_range))
+                    self.graph_parameters.delta_2 = description.delta_2 / abs_average * 100
 
-                    self.graph_parameters.student_99 = self.graph_parameters.sko_percents * \
-                        metrology.student_t_inverse_distribution_2x(0.99, len(data_y_in_range))
+                    self.graph_parameters.sko = description.sko
+                    self.graph_parameters.sko_percents = description.sko / abs_average * 100
 
-                    self.graph_parameters.student_999 = self.graph_parameters.sko_percents * \
-                        metrology.student_t_inverse_distribution_2x(0.999, len(data_y_in_range))
+                    self.graph_parameters.student_95 = description.student_95 / abs_average * 100
+                    self.graph_parameters.student_99 = description.student_99 / abs_average * 100
+                    self.graph_parameters.student_999 = description.student_999 / abs_average * 100
             else:
                 self.graph_parameters.y_min = 0
                 self.graph_parameters.y_max = 0
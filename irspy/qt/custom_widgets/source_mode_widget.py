@@ -49,6 +49,16 @@ class SourceModeWidget(QtWidgets.QWidget):
 
         self.update_signal_enable_state(self.calibrator.signal_enable)
 
+        # Параметр калибратора -> обработчик его изменения, см. ClbDrv.subscribe
+        self.clb_parameter_handlers = {
+            "signal_type": lambda _: self.show_signal_type(),
+            "amplitude": lambda _: self.show_amplitude(),
+            "frequency": lambda _: self.show_frequency(),
+            "mode": lambda _: self.show_mode(),
+        }
+        for parameter, handler in self.clb_parameter_handlers.items():
+            self.calibrator.subscribe(parameter, handler)
+
         self.clb_check_timer = QTimer()
         self.clb_check_timer.timeout.connect(self.sync_clb_parameters)
         self.clb_check_timer.start(100)
@@ -92,17 +102,7 @@ class SourceModeWidget(QtWidgets.QWidget):
 
     @utils.exception_decorator_print
     def sync_clb_parameters(self):
-        if self.calibrator.signal_type_changed():
-            self.show_signal_type()
-
-        if self.calibrator.amplitude_changed():
-            self.show_amplitude()
-
-        if self.calibrator.frequency_changed():
-            self.show_frequency()
-
-        if self.calibrator.mode_changed():
-            self.show_mode()
+        self.calibrator.notify_changes()
 
     def enable_signal(self, a_signal_enable):
         self.calibrator.signal_enable = a_signal_enable
@@ -236,4 +236,7 @@ class SourceModeWidget(QtWidgets.QWidget):
         self.mode_to_radio[self.mode].setChecked(True)
 
     def closeEvent(self, a_event: QtGui.QCloseEvent) -> None:
+        self.clb_check_timer.stop()
+        for parameter, handler in self.clb_parameter_handlers.items():
+            self.calibrator.unsubscribe(parameter, handler)
         self.calibrator.signal_enable = False
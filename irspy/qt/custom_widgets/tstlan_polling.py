@@ -0,0 +1,113 @@
+from typing import Tuple, Optional
+import logging
+import time
+
+from PyQt5 import QtWidgets
+
+from irspy.clb.acquisition import AcquisitionService
+from irspy.clb.polling import PollingScheduler
+from irspy.clb.clb_dll import ClbDrv
+import irspy.clb.network_variables as nv
+from irspy import profiler
+import irspy.utils as utils
+
+
+class TstlanPollingMixin:
+    """
+    Общий для TstlanWidget и TstlanDialog опрос сетевых переменных: подписки PollingScheduler, чтение значений
+    из снимков AcquisitionService или через PollingScheduler, обновление таблицы и графиков, запись переменных.
+    Класс, к которому добавляется примесь, должен иметь ui.variables_table, ui.upadte_time_spinbox, Column,
+    variables_to_graph, graphs_data, graphs_dialog, start_timestamp и вызвать init_polling в __init__
+    """
+    def init_polling(self, a_variables: nv.NetworkVariables, a_calibrator: ClbDrv,
+                     a_acquisition: Optional[AcquisitionService] = None):
+        """
+        :param a_acquisition: Если задан, значения переменных берутся из его снимков, а не читаются из драйвера
+        в потоке GUI, запись переменных выполняется под его driver_lock
+        """
+        self.netvars = a_variables
+        self.calibrator = a_calibrator
+        self.acquisition = a_acquisition
+        self.snapshot_values: Tuple = ()
+
+        # Опрашиваются только видимые в таблице переменные и переменные, выведенные на графики
+        self.scheduler = PollingScheduler(self.calibrator, self.netvars.get_variables_info())
+
+    def update_subscriptions(self):
+        period_s = self.ui.upadte_time_spinbox.value()
+
+        self.scheduler.unsubscribe_all("table")
+        for i in range(self.ui.variables_table.rowCount()):
+            if not self.ui.variables_table.isRowHidden(i):
+                variable_number = int(self.ui.variables_table.item(i, self.Column.NUMBER).text())
+                self.scheduler.subscribe(variable_number, period_s, "table")
+
+        self.scheduler.unsubscribe_all("graph")
+        for variable_number in self.variables_to_graph.values():
+            self.scheduler.subscribe(variable_number, period_s, "graph")
+
+    @profiler.profile()
+    def update_graph_variables_data(self):
+        timestamp = time.time()
+        if not self.variables_to_graph:
+            self.start_timestamp = timestamp
+
+        for graph_name in self.variables_to_graph.keys():
+            self.graphs_data[graph_name][0].append(timestamp - self.start_timestamp)
+            self.graphs_data[graph_name][1].append(self.get_variable_value(self.variables_to_graph[graph_name]))
+
+        if self.graphs_dialog is not None:
+            self.graphs_dialog.update_graphs(self.graphs_data)
+
+    def get_variable_value(self, a_variable_number: int) -> Optional[float]:
+        if self.acquisition is not None:
+            return self.snapshot_values[a_variable_number] if self.snapshot_values else None
+        return self.scheduler.get_value(a_variable_number)
+
+    def poll_values(self) -> Optional[dict]:
+        """
+        :return: {номер переменной: значение} или None, если калибратор не подключен
+        """
+        if self.acquisition is not None:
+            snapshot = self.acquisition.latest()
+            self.snapshot_values = snapshot.values if snapshot is not None else ()
+            return dict(enumerate(self.snapshot_values)) if self.snapshot_values else None
+        return self.scheduler.poll() if self.netvars.connected() else None
+
+    @profiler.profile()
+    def read_variables(self):
+        self.ui.variables_table.blockSignals(True)
+
+        try:
+            values = self.poll_values()
+            if values is not None:
+                if values:
+                    for visual_row in range(self.ui.variables_table.rowCount()):
+                        row = int(self.ui.variables_table.item(visual_row, self.Column.NUMBER).text())
+
+                        value = values.get(row)
+                        if value is not None:
+                            self.ui.variables_table.item(visual_row, self.Column.VALUE).setText(
+                                utils.float_to_string(round(value, 7)))
+
+                self.update_graph_variables_data()
+        except Exception as err:
+            logging.debug(utils.exception_handler(err))
+
+        self.ui.variables_table.blockSignals(False)
+
+    def write_variable(self, a_item: QtWidgets.QTableWidgetItem):
+        try:
+            if self.netvars.connected():
+                variable_number = int(self.ui.variables_table.item(a_item.row(), self.Column.NUMBER).text())
+                try:
+                    variable_value = utils.parse_input(a_item.text())
+                    if self.acquisition is not None:
+                        with self.acquisition.driver_lock:
+                            self.netvars.write_variable(variable_number, variable_value)
+                    else:
+                        self.netvars.write_variable(variable_number, variable_value)
+                except ValueError:
+                    pass
+        except Exception as err:
+            logging.debug(utils.exception_handler(err))
@@ -1,4 +1,4 @@
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict, List, Optional
 from enum import IntEnum
 from math import floor
 import logging
@@ -9,12 +9,14 @@ from PyQt5 import QtGui, QtWidgets, QtCore
 from irspy.qt.custom_widgets.ui_py.tstlan_widget import Ui_Form as TstlanForm
 from irspy.qt.custom_widgets.tstlan_graph_dialog import TstlanGraphDialog
 from irspy.qt.qt_settings_ini_parser import QtSettings
+from irspy.qt.custom_widgets.tstlan_polling import TstlanPollingMixin
+from irspy.clb.acquisition import AcquisitionService
 from irspy.clb.clb_dll import ClbDrv
 import irspy.clb.network_variables as nv
 import irspy.utils as utils
 
 
-class TstlanWidget(QtWidgets.QWidget):
+class TstlanWidget(TstlanPollingMixin, QtWidgets.QWidget):
     class Column(IntEnum):
         NUMBER = 0
         INDEX = 1
@@ -25,20 +27,24 @@ class TstlanWidget(QtWidgets.QWidget):
         VALUE = 6
 
     def __init__(self, a_variables: nv.NetworkVariables, a_calibrator: ClbDrv,
-                 a_settings: QtSettings, a_parent=None):
+                 a_settings: QtSettings, a_parent=None, a_acquisition: Optional[AcquisitionService] = None):
+        """
+        :param a_acquisition: Если задан, значения переменных берутся из его снимков, а не читаются из драйвера
+        в потоке GUI, запись переменных выполняется под его driver_lock
+        """
         super().__init__(a_parent)
 
         self.ui = TstlanForm()
         self.ui.setupUi(self)
         self.show()
 
-        self.netvars = a_variables
-        self.calibrator = a_calibrator
+        self.init_polling(a_variables, a_calibrator, a_acquisition)
 
         self.settings = a_settings
         self.settings.restore_qwidget_state(self)
 
-        self.variables_to_graph: Dict[str, nv.BufferedVariable] = {}
+        # Имя переменной -> номер переменной
+        self.variables_to_graph: Dict[str, int] = {}
         self.graphs_data: Dict[str, Tuple[List[float], List[float]]] = {}
         self.ui.graphs_button.clicked.connect(self.show_graphs)
         self.start_timestamp = time.time()
@@ -141,9 +147,10 @@ class TstlanWidget(QtWidgets.QWidget):
         variable_info = self.get_variable_info_by_row(a_table_row)
 
         if a_graph_state:
-            variable = nv.BufferedVariable(variable_info, self.calibrator, nv.BufferedVariable.Mode.R)
+            variable_number = int(self.ui.variables_table.item(a_table_row, self.Column.NUMBER).text())
 
-            self.variables_to_graph[variable_info.name] = variable
+            self.variables_to_graph[variable_info.name] = variable_number
+            self.scheduler.subscribe(variable_number, self.ui.upadte_time_spinbox.value(), "graph")
             self.graphs_data[variable_info.name] = [], []
 
             if self.graphs_dialog is not None:
@@ -152,7 +159,7 @@ class TstlanWidget(QtWidgets.QWidget):
             if self.graphs_dialog is not None:
                 self.graphs_dialog.remove_graph(variable_info.name)
 
-            del self.variables_to_graph[variable_info.name]
+            self.scheduler.unsubscribe(self.variables_to_graph.pop(variable_info.name), "graph")
             del self.graphs_data[variable_info.name]
 
     def get_variable_info_by_row(self, a_row):
@@ -177,48 +184,6 @@ class TstlanWidget(QtWidgets.QWidget):
         except Exception as err:
             logging.debug(utils.exception_handler(err))
 
-    def update_graph_variables_data(self):
-        timestamp = time.time()
-        if not self.variables_to_graph:
-            self.start_timestamp = timestamp
-
-        for graph_name in self.variables_to_graph.keys():
-            self.graphs_data[graph_name][0].append(timestamp - self.start_timestamp)
-            self.graphs_data[graph_name][1].append(self.variables_to_graph[graph_name].get())
-
-        if self.graphs_dialog is not None:
-            self.graphs_dialog.update_graphs(self.graphs_data)
-
-    def read_variables(self):
-        self.ui.variables_table.blockSignals(True)
-
-        try:
-            if self.netvars.connected():
-                for visual_row in range(self.ui.variables_table.rowCount()):
-                    row = int(self.ui.variables_table.item(visual_row, self.Column.NUMBER).text())
-
-                    value = self.netvars.read_variable(row)
-                    self.ui.variables_table.item(visual_row, self.Column.VALUE).setText(
-                        utils.float_to_string(round(value, 7)))
-
-                self.update_graph_variables_data()
-        except Exception as err:
-            logging.debug(utils.exception_handler(err))
-
-        self.ui.variables_table.blockSignals(False)
-
-    def write_variable(self, a_item: QtWidgets.QTableWidgetItem):
-        try:
-            if self.netvars.connected():
-                variable_number = int(self.ui.variables_table.item(a_item.row(), self.Column.NUMBER).text())
-                try:
-                    variable_value = utils.parse_input(a_item.text())
-                    self.netvars.write_variable(variable_number, variable_value)
-                except ValueError:
-                    pass
-        except Exception as err:
-            logging.debug(utils.exception_handler(err))
-
     def filter_variables(self):
         filter_text = self.ui.name_filter_edit.text()
         regexp = QtCore.QRegExp(filter_text)
@@ -236,6 +201,8 @@ class TstlanWidget(QtWidgets.QWidget):
                 match = match & marked_cb.isChecked()
             self.ui.variables_table.setRowHidden(i, not match)
 
+        self.update_subscriptions()
+
     def show_marked_toggled(self, a_enable):
         self.filter_variables()
         self.settings.tstlan_show_marks = int(a_enable)
@@ -243,6 +210,7 @@ class TstlanWidget(QtWidgets.QWidget):
     def update_time_changed(self, a_value):
         self.read_variables_timer.start(a_value * 1000)
         self.settings.tstlan_update_time = a_value
+        self.update_subscriptions()
 
     def closeEvent(self, a_event: QtGui.QCloseEvent) -> None:
         self.settings.save_qwidget_state(self.ui.variables_table)
@@ -1,8 +1,9 @@
 import functools
 from linecache import checkcache, getline
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import Iterable
 from enum import IntEnum
+from array import array
 from sys import exc_info
 import traceback
 import logging
@@ -365,21 +366,132 @@ class Timer:
 
 
 class PerfTime:
-    def __init__(self, threshold_s):
+    """
+    Измеряет время между вызовами trace. Время больше порога сохраняется (последние a_max_samples значений для
+    каждого имени) и пишется в лог, все измерения при включенном профилировании записываются в irspy.profiler
+    как участки с именами trace_name
+    """
+    def __init__(self, threshold_s, a_max_samples=1000):
+        # Импорт здесь, потому что irspy.profiler импортирует utils
+        from irspy import profiler
+        self.__profiler = profiler
         self.threshold_s = threshold_s
         self.start_time = 0
-        self.times = defaultdict(list)
+        self.__start_ns = 0
+        self.times = defaultdict(functools.partial(deque, maxlen=a_max_samples))
 
     def start(self):
-        self.start_time = time.perf_counter()
+        self.__start_ns = time.perf_counter_ns()
+        self.start_time = self.__start_ns / 1e9
 
     def trace(self, trace_name):
-        trace_time = time.perf_counter() - self.start_time
+        now_ns = time.perf_counter_ns()
+        trace_time = (now_ns - self.__start_ns) / 1e9
         if trace_time > self.threshold_s:
             self.times[trace_name].append(trace_time)
-            print(trace_name, trace_time)
+            logging.debug(f"{trace_name} {trace_time}")
+        if self.__profiler.is_enabled():
+            self.__profiler.record(trace_name, self.__start_ns, now_ns - self.__start_ns)
 
         self.start()
 
     def get_times(self):
         return self.times
+
+
+class LatencyHistogram:
+    """
+    Гистограмма длительностей с логарифмическими корзинами (как HDR-гистограмма): на каждую степень двойки
+    приходится SUB_BUCKETS корзин, поэтому относительная погрешность процентилей не больше 1 / SUB_BUCKETS
+    при любом диапазоне, а память постоянна. Длительности хранятся в наносекундах
+    """
+    SUB_BUCKETS_BITS = 3
+    SUB_BUCKETS = 1 << SUB_BUCKETS_BITS
+    # Значения меньше этого попадают каждое в свою корзину
+    LINEAR_LIMIT = SUB_BUCKETS * 2
+    BUCKETS_COUNT = (64 - 2) * SUB_BUCKETS
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * LatencyHistogram.BUCKETS_COUNT))
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    @staticmethod
+    def bucket_index(a_value_ns: int) -> int:
+        if a_value_ns < LatencyHistogram.LINEAR_LIMIT:
+            return max(a_value_ns, 0)
+        shift = a_value_ns.bit_length() - 1 - LatencyHistogram.SUB_BUCKETS_BITS
+        return min(shift * LatencyHistogram.SUB_BUCKETS + (a_value_ns >> shift), LatencyHistogram.BUCKETS_COUNT - 1)
+
+    @staticmethod
+    def bucket_bounds(a_index: int):
+        """
+        :return: (нижняя граница, верхняя граница) корзины в наносекундах
+        """
+        if a_index < LatencyHistogram.LINEAR_LIMIT:
+            return a_index, a_index + 1
+        shift = a_index // LatencyHistogram.SUB_BUCKETS - 1
+        mantissa = a_index % LatencyHistogram.SUB_BUCKETS + LatencyHistogram.SUB_BUCKETS
+        return mantissa << shift, (mantissa + 1) << shift
+
+    def record_ns(self, a_value_ns: int):
+        self.counts[self.bucket_index(a_value_ns)] += 1
+        if not self.count or a_value_ns < self.min_ns:
+            self.min_ns = a_value_ns
+        if a_value_ns > self.max_ns:
+            self.max_ns = a_value_ns
+        self.count += 1
+        self.total_ns += a_value_ns
+
+    def record(self, a_value_s: float):
+        self.record_ns(int(a_value_s * 1e9))
+
+    def merge(self, a_other: 'LatencyHistogram'):
+        if not a_other.count:
+            return
+        for index, count in enumerate(a_other.counts):
+            if count:
+                self.counts[index] += count
+        self.min_ns = a_other.min_ns if not self.count else min(self.min_ns, a_other.min_ns)
+        self.max_ns = max(self.max_ns, a_other.max_ns)
+        self.count += a_other.count
+        self.total_ns += a_other.total_ns
+
+    def reset(self):
+        self.counts = array('Q', bytes(8 * LatencyHistogram.BUCKETS_COUNT))
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.
+
+    def percentile_ns(self, a_percent: float) -> float:
+        """
+        :param a_percent: Процент от 0 до 100
+        :return: Значение процентиля (середина корзины, ограниченная min и max)
+        """
+        if not self.count:
+            return 0.
+        rank = max(math.ceil(self.count * a_percent / 100), 1)
+        accumulated = 0
+        for index, count in enumerate(self.counts):
+            accumulated += count
+            if accumulated >= rank:
+                lower, upper = self.bucket_bounds(index)
+                return float(bound((lower + upper) / 2, self.min_ns, self.max_ns))
+        return float(self.max_ns)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_us": self.mean_ns() / 1e3,
+            "min_us": self.min_ns / 1e3,
+            "p50_us": self.percentile_ns(50) / 1e3,
+            "p90_us": self.percentile_ns(90) / 1e3,
+            "p99_us": self.percentile_ns(99) / 1e3,
+            "max_us": self.max_ns / 1e3,
+        }